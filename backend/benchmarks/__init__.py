@@ -0,0 +1 @@
+"""Offline benchmarks for the travel agent graph."""
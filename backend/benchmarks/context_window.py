@@ -0,0 +1,62 @@
+"""Replay a long research session and report prompt-token growth.
+
+Builds a synthetic history (one user request, then research rounds of batched
+tool calls with large results, drafts and reviewer feedback) and reports the
+tokens `research_itinerary` would send on each iteration, with the full history
+and with the message window from `my_agent.utils.context`.
+
+    python -m benchmarks.context_window --rounds 12
+"""
+import argparse
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.context import build_window, count_tokens
+
+
+def _round(i: int, calls: int, result_tokens: int) -> list:
+    tool_calls = [
+        {"name": "tavily_web_search", "args": {"query": f"query {i}-{j}"}, "id": f"call_{i}_{j}"}
+        for j in range(calls)
+    ]
+    messages = [AIMessage(content="", tool_calls=tool_calls, id=f"ai_{i}")]
+    messages += [
+        ToolMessage(content="x" * result_tokens * 4, name="tavily_web_search", tool_call_id=call["id"], id=f"tool_{i}_{j}")
+        for j, call in enumerate(tool_calls)
+    ]
+    if i % 4 == 3:
+        messages.append(AIMessage(content="Day 1: ... " * 400, id=f"draft_{i}"))
+        messages.append(AIMessage(content="FEEDBACK based on last itinerary: ...", id=f"feedback_{i}"))
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--calls", type=int, default=4, help="tool calls per research round")
+    parser.add_argument("--result-tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    configuration = Configuration()
+    history = [HumanMessage(content="7 days in Sri Lanka for 2 adults, $1500, beaches and culture", id="human_0")]
+    report = []
+    for i in range(args.rounds):
+        window = build_window(
+            history,
+            max_tokens=configuration.context_budget("research_itinerary"),
+            keep_last_turns=configuration.context_keep_last_turns,
+        )
+        report.append({
+            "iteration": i + 1,
+            "full_history_tokens": sum(count_tokens(m) for m in history),
+            "windowed_tokens": sum(count_tokens(m) for m in window),
+        })
+        history += _round(i, args.calls, args.result_tokens)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
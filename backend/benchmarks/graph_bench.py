@@ -0,0 +1,341 @@
+"""Reproducible offline benchmark for the compiled graph.
+
+Runs N concurrent simulated conversations through `my_agent.agent.graph` with
+the LLM and every HTTP tool (Google Places, TripAdvisor, Unsplash, Tavily, Exa)
+replaced by recorded fixtures from `benchmarks/fixtures`. Each conversation
+draws its latencies from its own RNG seeded from `--seed` and its index, so
+interleaving does not change which latency a call gets. Exa calls run on
+worker threads and take a latency keyed on their query instead. The rate
+limiter and circuit breakers are bypassed, so no run is throttled or failed by
+state left over from another. The report is JSON: end-to-end latency
+percentiles, per-node time, tool calls, research steps, review rounds and
+token counts, plus every run.
+
+    python -m benchmarks.graph_bench --conversations 20 --llm-latency 0.8 --out report.json
+"""
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+os.environ.setdefault("EXA_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage  # noqa: E402
+
+from my_agent.agent import graph  # noqa: E402
+from my_agent.utils import nodes, tools  # noqa: E402
+from my_agent.utils.compaction import approx_tokens  # noqa: E402
+from my_agent.utils.singleflight import get_single_flight  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@dataclass
+class RunStats:
+    """Counters for one simulated conversation, shared with the fakes through a context variable."""
+
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    reviews: int = 0
+    http_calls: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    latency: Optional["Latency"] = None
+
+
+_run: contextvars.ContextVar[RunStats] = contextvars.ContextVar("benchmark_run")
+
+
+class Latency:
+    """Seeded latency source: base seconds +/- a uniform jitter fraction."""
+
+    def __init__(self, seed: Any, jitter: float):
+        self._random = random.Random(seed)
+        self.jitter = jitter
+
+    def __call__(self, base: float) -> float:
+        return max(0.0, base * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+
+def _latency(base: float) -> float:
+    """Next latency from the current conversation's RNG."""
+    return _run.get().latency(base)
+
+
+def _text(messages: List[Any]) -> str:
+    return "\n".join(str(m.content if isinstance(m, BaseMessage) else m) for m in messages)
+
+
+class FakeChatModel:
+    """Replays `fixtures/llm.json` for every node, mimicking the chat model interface the nodes use."""
+
+    _ids = itertools.count()
+
+    def __init__(self, fixture: dict, base: float, mode: str = "chat", include_raw: bool = False):
+        self.fixture = fixture
+        self.base = base
+        self.mode = mode
+        self.include_raw = include_raw
+
+    def with_structured_output(self, schema: dict, include_raw: bool = False) -> "FakeChatModel":
+        return FakeChatModel(self.fixture, self.base, schema["title"], include_raw)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return FakeChatModel(self.fixture, self.base, "research")
+
+    def _research_step(self, messages: List[Any]) -> int:
+        step = 0
+        for message in messages:
+            if isinstance(message, AIMessage) and str(message.content).startswith("FEEDBACK"):
+                step = 0
+            elif isinstance(message, AIMessage) and message.tool_calls:
+                step += 1
+        return step
+
+    def _respond(self, messages: List[Any]) -> Any:
+        stats = _run.get()
+        if self.mode == "validation_validation_schema":
+            return {"is_valid": True}
+        if self.mode == "user_schema":
+            return dict(self.fixture["user_profile"])
+        if self.mode == "user_profile_update_schema":
+            return {}
+        if self.mode == "Destination":
+            reflections = self.fixture["reflections"]
+            stats.reviews += 1
+            return reflections[min(stats.reviews, len(reflections)) - 1]
+        if self.mode == "research":
+            script = self.fixture["research_script"]
+            step = self._research_step(messages)
+            if step < len(script):
+                return AIMessage(content="", tool_calls=[
+                    {**call, "id": f"call_{next(self._ids)}"} for call in script[step]
+                ])
+            return AIMessage(content=self.fixture["itinerary"])
+        return AIMessage(content=self.fixture["optimized_prompt"])
+
+    def _account(self, messages: List[Any], response: Any) -> Dict[str, int]:
+        stats = _run.get()
+        usage = {
+            "input_tokens": approx_tokens(_text(messages)),
+            "output_tokens": approx_tokens(json.dumps(response, default=str) if isinstance(response, dict) else _text([response])),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        stats.llm_calls += 1
+        stats.input_tokens += usage["input_tokens"]
+        stats.output_tokens += usage["output_tokens"]
+        return usage
+
+    async def ainvoke(self, messages: List[Any], config: Optional[dict] = None) -> Any:
+        await asyncio.sleep(_latency(self.base))
+        response = self._respond(messages)
+        usage = self._account(messages, response)
+        if isinstance(response, AIMessage):
+            response.usage_metadata = usage
+        elif self.include_raw:
+            return {"raw": AIMessage(content="", usage_metadata=usage), "parsed": response, "parsing_error": None}
+        return response
+
+    async def astream(self, messages: List[Any], config: Optional[dict] = None):
+        response = await self.ainvoke(messages, config)
+        message_id = f"run-{next(self._ids)}"
+        if response.tool_calls:
+            yield AIMessageChunk(content="", id=message_id, usage_metadata=response.usage_metadata, tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(response.tool_calls)
+            ])
+            return
+        pieces = re.findall(r".{1,80}", response.content, re.DOTALL)
+        for i, piece in enumerate(pieces):
+            usage = response.usage_metadata if i == len(pieces) - 1 else None
+            yield AIMessageChunk(content=piece, id=message_id, usage_metadata=usage)
+            await asyncio.sleep(0)
+
+
+class FakeHTTP:
+    """Serves `fixtures/http.json` in place of the pooled HTTP session, Tavily client and Exa client."""
+
+    def __init__(self, fixture: dict, seed: int, jitter: float, base: float):
+        self.fixture = fixture
+        self.seed = seed
+        self.jitter = jitter
+        self.base = base
+
+    def _lookup(self, url: str) -> dict:
+        parts = urlsplit(url)
+        key = re.sub(r"/location/\d+/", "/location/{id}/", parts.netloc + parts.path)
+        return self.fixture[key]
+
+    async def request_json(self, method: str, url: str, configuration: Any, **kwargs: Any) -> dict:
+        _run.get().http_calls[urlsplit(url).netloc] += 1
+        await asyncio.sleep(_latency(self.base))
+        return json.loads(json.dumps(self._lookup(url)))
+
+    async def search(self, query: str, **kwargs: Any) -> dict:
+        _run.get().http_calls["api.tavily.com"] += 1
+        await asyncio.sleep(_latency(self.base))
+        return json.loads(json.dumps(self.fixture["api.tavily.com/search"]))
+
+    def search_and_contents(self, query: str, **kwargs: Any) -> dict:
+        # Called on the Exa worker pool, so block like the real client does. Worker
+        # threads do not see the conversation's context, so the latency is keyed
+        # on the query instead of drawn from a shared RNG.
+        time.sleep(Latency(f"{self.seed}:exa:{query}", self.jitter)(self.base))
+        return json.loads(json.dumps(self.fixture["exa"]))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "p99": round(_percentile(values, 99), 4),
+    }
+
+
+async def _bypass_resilience(host: str, attempt: Any, configuration: Any, rate_limit: Any = None) -> Any:
+    """Stands in for `call_with_retries`: one attempt, no rate limiter, no circuit breaker."""
+    return await attempt()
+
+
+async def _conversation(index: int, fixture: dict, configurable: dict, seed: int, jitter: float) -> dict:
+    stats = RunStats(latency=Latency(f"{seed}:{index}", jitter))
+    _run.set(stats)
+    # Exa runs on worker threads, which do not inherit the context variable.
+    exa_calls = 0
+    node_time: Dict[str, float] = defaultdict(float)
+    tool_calls = 0
+    research_steps = 0
+
+    started = last = time.perf_counter()
+    async for update in graph.astream(
+        {"messages": [HumanMessage(content=fixture["conversation"])]},
+        config={"configurable": {**configurable, "thread_id": f"bench-{index}"}},
+        stream_mode="updates",
+    ):
+        now = time.perf_counter()
+        for node, values in update.items():
+            node_time[node] += now - last
+            if node == "research_itinerary":
+                research_steps += 1
+            for message in (values or {}).get("messages", []) if isinstance(values, dict) else []:
+                if isinstance(message, ToolMessage):
+                    tool_calls += 1
+                    exa_calls += message.name == "exa_web_search"
+        last = now
+
+    stats.http_calls["exa"] += exa_calls
+    return {
+        "conversation": index,
+        "latency_s": round(time.perf_counter() - started, 4),
+        "node_time_s": {node: round(seconds, 4) for node, seconds in node_time.items()},
+        "tool_calls": tool_calls,
+        # research_itinerary calls: one per tool round trip plus one per draft.
+        "research_steps": research_steps,
+        "review_rounds": stats.reviews,
+        "llm_calls": stats.llm_calls,
+        "input_tokens": stats.input_tokens,
+        "output_tokens": stats.output_tokens,
+        "http_calls": dict(stats.http_calls),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    llm_fixture = json.loads((FIXTURES / "llm.json").read_text())
+    http_fixture = json.loads((FIXTURES / "http.json").read_text())
+    model = FakeChatModel(llm_fixture, args.llm_latency)
+    http = FakeHTTP(http_fixture, args.seed, args.jitter, args.http_latency)
+
+    originals = (nodes.get_model, tools.request_json, tools.client, tools.exa, tools.call_with_retries)
+    nodes.get_model = lambda config, tier="strong": model
+    tools.request_json, tools.client, tools.exa = http.request_json, http, http
+    tools.call_with_retries = _bypass_resilience
+    configurable = {
+        # Measure the full pipeline; caches would turn every run after the first into a hit.
+        "cache_enabled": False,
+        "itinerary_cache_enabled": False,
+        "place_index_enabled": False,
+        # On by default, as in production. Coalesced HTTP calls are counted once,
+        # against the conversation whose call went upstream.
+        "coalesce_tool_calls": not args.no_coalesce,
+        "speculative_intake": args.speculative,
+        "review_precheck_enabled": not args.no_precheck,
+    }
+    coalesced_before = dict(get_single_flight().stats)
+    try:
+        started = time.perf_counter()
+        runs = await asyncio.gather(*(
+            _conversation(i, llm_fixture, configurable, args.seed, args.jitter) for i in range(args.conversations)
+        ))
+        wall = time.perf_counter() - started
+    finally:
+        nodes.get_model, tools.request_json, tools.client, tools.exa, tools.call_with_retries = originals
+
+    per_node: Dict[str, List[float]] = defaultdict(list)
+    for result in runs:
+        for node, seconds in result["node_time_s"].items():
+            per_node[node].append(seconds)
+
+    return {
+        "settings": vars(args),
+        "summary": {
+            "conversations": len(runs),
+            "wall_time_s": round(wall, 4),
+            "throughput_per_s": round(len(runs) / wall, 3) if wall else 0.0,
+            "latency_s": _distribution([r["latency_s"] for r in runs]),
+            "node_time_s": {node: _distribution(values) for node, values in sorted(per_node.items())},
+            "tool_calls": _distribution([r["tool_calls"] for r in runs]),
+            "research_steps": _distribution([r["research_steps"] for r in runs]),
+            "review_rounds": _distribution([r["review_rounds"] for r in runs]),
+            "input_tokens": _distribution([r["input_tokens"] for r in runs]),
+            "output_tokens": _distribution([r["output_tokens"] for r in runs]),
+            "single_flight": {
+                name: count - coalesced_before[name] for name, count in get_single_flight().stats.items()
+            },
+        },
+        "runs": list(runs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds per LLM call")
+    parser.add_argument("--http-latency", type=float, default=0.2, help="seconds per HTTP tool request")
+    parser.add_argument("--jitter", type=float, default=0.2, help="uniform +/- fraction applied to every latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speculative", action="store_true", help="enable GraphConfig.speculative_intake")
+    parser.add_argument("--no-precheck", action="store_true",
+                        help="send every draft to the LLM reviewer, for before/after review-round comparisons")
+    parser.add_argument("--no-coalesce", action="store_true",
+                        help="disable Configuration.coalesce_tool_calls, for before/after upstream-call comparisons")
+    parser.add_argument("--out", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2, default=str)
+    if args.out:
+        args.out.write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
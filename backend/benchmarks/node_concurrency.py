@@ -0,0 +1,143 @@
+"""Compare thread usage and throughput of sync vs async node execution.
+
+Runs every LLM-backed node from `my_agent.utils.nodes` against a stubbed model
+that sleeps for a fixed latency. The "sync" variant mirrors the old blocking
+`model.invoke` path, where each concurrent run holds an executor thread for the
+whole round trip; the "async" variant awaits `ainvoke` on a single event loop.
+
+    python -m benchmarks.node_concurrency --runs 64 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("EXA_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+from my_agent.utils import nodes  # noqa: E402
+from my_agent.utils.itinerary_cache import ItineraryCache, set_itinerary_cache  # noqa: E402
+from my_agent.utils.state import State  # noqa: E402
+
+
+class StubModel:
+    """Minimal stand-in for a chat model with a fixed response latency."""
+
+    def __init__(self, latency: float, blocking: bool, structured: bool = False, include_raw: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.structured = structured
+        self.include_raw = include_raw
+
+    def with_structured_output(self, schema, include_raw=False):
+        return StubModel(self.latency, self.blocking, structured=True, include_raw=include_raw)
+
+    def bind_tools(self, tools):
+        return StubModel(self.latency, self.blocking)
+
+    async def ainvoke(self, messages, config=None):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        if self.structured:
+            parsed = {"is_valid": True, "is_satisfactory": True, "feedback": "", "llm_response": ""}
+            if self.include_raw:
+                return {"raw": AIMessage(content=""), "parsed": parsed, "parsing_error": None}
+            return parsed
+        return AIMessage(content="Day 1: ...")
+
+
+async def _stub_embed(text: str) -> list:
+    return [1.0, 0.0]
+
+
+def _state() -> State:
+    return State(messages=[HumanMessage(content="7 days in Sri Lanka for 2 adults, $1500")])
+
+
+async def _run_nodes() -> None:
+    state = _state()
+    # Nodes are called outside a graph run, so there is no stream to write days to.
+    config = {"configurable": {"stream_itinerary_days": False}}
+    await nodes.validate_user_response(state, config)
+    await nodes.update_user_profile(state, config)
+    await nodes.optimize_prompt(state, config)
+    await nodes.research_itinerary(state, config)
+    await nodes.review_itinerary(state, config)
+
+
+def _sample_threads(stop: threading.Event, peak: list) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], threading.active_count())
+        time.sleep(0.005)
+
+
+def _measure(label: str, runs: int, latency: float, body) -> dict:
+    stop, peak = threading.Event(), [threading.active_count()]
+    sampler = threading.Thread(target=_sample_threads, args=(stop, peak), daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    body()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    return {
+        "variant": label,
+        "runs": runs,
+        "model_latency_s": latency,
+        "elapsed_s": round(elapsed, 3),
+        "runs_per_s": round(runs / elapsed, 2),
+        "peak_threads": peak[0] - 1,  # exclude the sampler itself
+    }
+
+
+def bench_sync(runs: int, latency: float, workers: int) -> dict:
+    stub = StubModel(latency, blocking=True)
+    nodes.get_model = lambda config, tier="strong": stub
+
+    def body():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: asyncio.run(_run_nodes()), range(runs)))
+
+    return _measure("sync", runs, latency, body)
+
+
+def bench_async(runs: int, latency: float) -> dict:
+    stub = StubModel(latency, blocking=False)
+    nodes.get_model = lambda config, tier="strong": stub
+
+    async def gather():
+        await asyncio.gather(*(_run_nodes() for _ in range(runs)))
+
+    return _measure("async", runs, latency, lambda: asyncio.run(gather()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=16, help="executor threads for the sync variant")
+    args = parser.parse_args()
+
+    original = nodes.get_model
+    # Keep every run a cache miss so each one exercises the full node chain.
+    set_itinerary_cache(ItineraryCache(embed=_stub_embed, threshold=2.0))
+    try:
+        report = [
+            bench_sync(args.runs, args.latency, args.workers),
+            bench_async(args.runs, args.latency),
+        ]
+    finally:
+        nodes.get_model = original
+        set_itinerary_cache(None)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
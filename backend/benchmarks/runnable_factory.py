@@ -0,0 +1,71 @@
+"""Measure the per-node overhead saved by memoizing runnables.
+
+Builds the structured-output and tool-bound runnables used by the nodes, once
+fresh on every call (the old behaviour) and once through
+`my_agent.utils.runnables`. No requests are sent; only construction is timed.
+
+    python -m benchmarks.runnable_factory --iterations 200
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("EXA_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from my_agent.utils import runnables  # noqa: E402
+from my_agent.utils.models import get_model  # noqa: E402
+from my_agent.utils.schemas import REFLECTION_SCHEMA, USER_SCHEMA, VALIDATION_SCHEMA  # noqa: E402
+from my_agent.utils.tools import tools  # noqa: E402
+
+model = get_model(None)
+
+BUILDERS = {
+    "validate_user_response": (
+        lambda: model.with_structured_output(VALIDATION_SCHEMA),
+        lambda: runnables.structured_output(model, VALIDATION_SCHEMA),
+    ),
+    "update_user_profile": (
+        lambda: model.with_structured_output(USER_SCHEMA),
+        lambda: runnables.structured_output(model, USER_SCHEMA),
+    ),
+    "research_itinerary": (
+        lambda: model.bind_tools(tools),
+        lambda: runnables.bind_tools(model, tools),
+    ),
+    "review_itinerary": (
+        lambda: model.with_structured_output(REFLECTION_SCHEMA),
+        lambda: runnables.structured_output(model, REFLECTION_SCHEMA),
+    ),
+}
+
+
+def _per_call_us(build, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    report = []
+    runnables.invalidate()
+    for node, (fresh, memoized) in BUILDERS.items():
+        fresh_us = _per_call_us(fresh, args.iterations)
+        memoized_us = _per_call_us(memoized, args.iterations)
+        report.append({
+            "node": node,
+            "fresh_us_per_call": round(fresh_us, 1),
+            "memoized_us_per_call": round(memoized_us, 1),
+            "saved_us_per_call": round(fresh_us - memoized_us, 1),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
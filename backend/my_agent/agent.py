@@ -1,23 +1,35 @@
 from typing import TypedDict, Literal
 
 from langgraph.graph import StateGraph, END
-from my_agent.utils.nodes import research_itinerary, should_continue, tool_node, validate_user_response, update_user_profile, optimize_prompt, review_itinerary
+from my_agent.utils.nodes import research_itinerary, should_continue, tool_node, validate_user_response, update_user_profile, optimize_prompt, review_itinerary, speculative_intake, route_intake, lookup_cached_itinerary
 from my_agent.utils.state import InputState
 
 
 # Define the config
 class GraphConfig(TypedDict):
+    # Force the model provider for a run; see my_agent.utils.models.
     model_name: Literal["anthropic", "openai"]
+    # Start profile extraction and prompt optimization alongside validation,
+    # discarding their results if the query turns out to be invalid.
+    speculative_intake: bool
 
 # Define a new graph
 workflow = StateGraph(InputState, config_schema=GraphConfig)
 
 # Define the two nodes we will cycle between
 workflow.add_node(validate_user_response)
-workflow.set_entry_point("validate_user_response")
+workflow.add_node(speculative_intake)
+workflow.set_conditional_entry_point(
+    route_intake,
+    {
+        "validate_user_response": "validate_user_response",
+        "speculative_intake": "speculative_intake",
+    },
+)
 
 workflow.add_node(update_user_profile)
 workflow.add_node(optimize_prompt)
+workflow.add_node(lookup_cached_itinerary)
 workflow.add_node(research_itinerary)
 workflow.add_node(review_itinerary)
 workflow.add_node("tool_node", tool_node)
@@ -36,7 +48,7 @@ workflow.add_conditional_edges(
 # This means that after `tools` is called, `agent` node is called next.
 
 workflow.add_edge("update_user_profile", "optimize_prompt")
-workflow.add_edge("optimize_prompt", "research_itinerary")
+workflow.add_edge("optimize_prompt", "lookup_cached_itinerary")
 workflow.add_edge("tool_node", "research_itinerary")
 # workflow.add_edge("user_tool_node", "update_user_profile")
 
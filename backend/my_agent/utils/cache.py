@@ -0,0 +1,339 @@
+"""Response cache for the external travel APIs.
+
+Tool responses are cached under a key built from the tool name, its normalized
+arguments and the Configuration fields that change the response. Lookups hit an
+in-memory LRU tier first and fall back to an on-disk SQLite tier; both tiers are
+size bounded and every entry carries the TTL of the tool that produced it.
+
+Async callers use `aget`/`aset`, which answer memory hits inline and run the
+SQLite tier in a worker thread, so disk reads and commits never block the event
+loop. Disk hits only record their access time in memory; the times are written
+in batches together with the next write. The disk tier keeps a running row
+count, so bounding its size does not scan the table on every write.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.singleflight import get_single_flight
+
+# Disk hits whose access times are written in one statement.
+TOUCH_BATCH_SIZE = 64
+
+
+# Free-text arguments, where case and spacing do not change the answer. Every
+# other argument (URLs, ids, languages) is part of the key exactly as given.
+TEXT_ARGUMENTS = frozenset({"query"})
+
+
+def _normalize(value: Any, casefold: bool = False) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.casefold().split()) if casefold else value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, casefold or k in TEXT_ARGUMENTS) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, casefold) for v in value]
+    return value
+
+
+def make_key(tool: str, arguments: Dict[str, Any], config_fields: Dict[str, Any]) -> str:
+    """Build a stable cache key for a tool call; only `TEXT_ARGUMENTS` are casefolded."""
+    payload = json.dumps(
+        [tool, _normalize(arguments), _normalize(config_fields)],
+        sort_keys=True,
+        default=str,
+    )
+    return f"{tool}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache with per-entry TTL and hit/miss counters.
+
+    `_lock` only guards the in-memory state and is never held across SQLite
+    calls; `_db_lock` serializes use of the connection. The event loop only ever
+    takes `_lock`, so a disk write in progress cannot block it.
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            max_memory_entries: int = 512,
+            max_disk_entries: int = 10_000,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        # Disk-tier bookkeeping not yet written: access times of hits, expired keys.
+        self._touched: Dict[str, float] = {}
+        self._expired: set = set()
+
+        self._db = None
+        # Rows in the disk tier, kept up to date so writes need not count them.
+        self._disk_entries = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._db.commit()
+            (self._disk_entries,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+
+    def _get_memory(self, key: str, now: float) -> Optional[Any]:
+        """Caller holds `_lock`."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return value
+            del self._memory[key]
+        return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[Any]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            with self._lock:
+                self._expired.add(key)
+            return None
+
+        value = json.loads(row[0])
+        with self._lock:
+            self._touched[key] = now
+            flush = len(self._touched) >= TOUCH_BATCH_SIZE
+            self._remember(key, row[1], value)
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+        if flush:
+            self._flush()
+        return value
+
+    def _take_pending(self) -> Tuple[Dict[str, float], set]:
+        """Caller holds `_lock`."""
+        pending = self._touched, self._expired
+        self._touched, self._expired = {}, set()
+        return pending
+
+    def _write_pending(self, touched: Dict[str, float], expired: set) -> None:
+        """Write access times and deletions; the caller holds `_db_lock` and commits."""
+        if touched:
+            self._db.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in touched.items()],
+            )
+        if expired:
+            deleted = self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in expired])
+            self._disk_entries -= deleted.rowcount
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending = self._take_pending()
+        with self._db_lock:
+            if self._db is not None:
+                self._write_pending(*pending)
+                self._db.commit()
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        if value is None:
+            self._miss()
+        return value
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """`get` for async callers: memory hits inline, the disk tier in a worker thread."""
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        if value is None:
+            self._miss()
+        return value
+
+    def _write(self, key: str, value: Any, expires_at: float, now: float) -> None:
+        data = json.dumps(value, default=str)
+        with self._lock:
+            self._expired.discard(key)
+            self._touched.pop(key, None)
+            pending = self._take_pending()
+        with self._db_lock:
+            if self._db is None:
+                return
+            updated = self._db.execute(
+                "UPDATE responses SET value = ?, expires_at = ?, accessed_at = ? WHERE key = ?",
+                (data, expires_at, now, key),
+            )
+            if not updated.rowcount:
+                self._db.execute(
+                    "INSERT INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, data, expires_at, now),
+                )
+                self._disk_entries += 1
+            self._write_pending(*pending)
+            overflow = self._disk_entries - self.max_disk_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self._disk_entries -= overflow
+                with self._lock:
+                    self.stats["evictions"] += overflow
+            self._db.commit()
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable `value` under `key` for `ttl` seconds."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now + ttl, value)
+        if self._db is not None:
+            self._write(key, value, now + ttl, now)
+
+    async def aset(self, key: str, value: Any, ttl: float) -> None:
+        """`set` for async callers: the memory tier is updated before the disk write starts."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now + ttl, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._write, key, value, now + ttl, now)
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        """Caller holds `_lock`."""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._take_pending()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+                self._disk_entries = 0
+
+    def close(self) -> None:
+        self._flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache(configuration: Configuration) -> ResponseCache:
+    """Return the process-wide cache, creating it from `configuration` on first use."""
+    global _cache
+    if _cache is None:
+        path = os.path.join(configuration.cache_dir, "responses.sqlite3") if configuration.cache_dir else None
+        _cache = ResponseCache(
+            path=path,
+            max_memory_entries=configuration.cache_max_memory_entries,
+            max_disk_entries=configuration.cache_max_disk_entries,
+        )
+    return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """Replace the process-wide cache, e.g. with one rooted in a temp directory."""
+    global _cache
+    _cache = cache
+
+
+def credential_hash(values: Iterable[Optional[str]]) -> str:
+    """Short digest of API keys, so keys can be told apart without being stored."""
+    return hashlib.sha256("\0".join(value or "" for value in values).encode()).hexdigest()[:16]
+
+
+def cached_tool(
+        ttl: float,
+        config_fields: Iterable[str] = (),
+        credential_fields: Iterable[str] = ()
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache the JSON result of an async tool taking an injected `config` argument.
+
+    `config_fields` names the Configuration fields that change the upstream
+    response and therefore belong in the key (API keys never do). On a miss,
+    identical calls already in flight share one upstream request (see
+    `my_agent.utils.singleflight`). `credential_fields` names the fields holding
+    the tool's API keys; only calls made with the same keys are coalesced, so
+    one caller's result or error never reaches a caller with other credentials.
+    """
+    config_fields = tuple(config_fields)
+    credential_fields = tuple(credential_fields)
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            configuration = Configuration.from_runnable_config(arguments.pop("config", None))
+            if not configuration.cache_enabled and not configuration.coalesce_tool_calls:
+                return await func(*args, **kwargs)
+
+            cache = get_response_cache(configuration) if configuration.cache_enabled else None
+            key = make_key(
+                func.__name__,
+                arguments,
+                {name: getattr(configuration, name) for name in config_fields},
+            )
+            value = await cache.aget(key) if cache else None
+            if value is not None:
+                return value
+
+            async def fetch() -> Any:
+                value = await func(*args, **kwargs)
+                if cache:
+                    await cache.aset(key, value, ttl)
+                return value
+
+            if configuration.coalesce_tool_calls:
+                credentials = credential_hash(getattr(configuration, name) for name in credential_fields)
+                return await get_single_flight().do(f"{key}:{credentials}", fetch)
+            return await fetch()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,258 @@
+"""Compact tool results before they enter the message history.
+
+Raw responses from Google Places, Unsplash, TripAdvisor and Tavily are large,
+and `research_itinerary` resends the whole history on every iteration. Each
+tool has a reducer that keeps only the fields the itinerary uses. Long text is
+then cut to a token budget. With `keep_full_tool_results`, the full payload is
+kept out of the prompt in a bounded in-memory store, under a reference id that
+the compact result carries; the `read_full_tool_result` tool returns it when
+the model needs a field the reducer dropped. The store is separate from the
+response cache so these payloads never evict cached API responses.
+"""
+import dataclasses
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import ToolMessage
+
+from my_agent.utils.configuration import Configuration
+
+FULL_RESULT_TTL = 24 * 3600
+
+
+class FullResultStore:
+    """LRU of full tool payloads by reference id, bounded in entries and age."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = FULL_RESULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, payload: Any) -> str:
+        """Store `payload` and return its reference id."""
+        ref = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._entries[ref] = (time.monotonic() + self.ttl, payload)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(ref)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._entries[ref]
+                return None
+            self._entries.move_to_end(ref)
+            return payload
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_store: Optional[FullResultStore] = None
+
+
+def get_full_result_store(configuration: Configuration) -> FullResultStore:
+    """Return the process-wide full-result store, creating it from `configuration` on first use."""
+    global _store
+    if _store is None:
+        _store = FullResultStore(configuration.full_tool_results_max_entries)
+    return _store
+
+
+def set_full_result_store(store: Optional[FullResultStore]) -> None:
+    """Replace the process-wide full-result store."""
+    global _store
+    _store = store
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _truncate(text: Any, max_tokens: int) -> Any:
+    if not isinstance(text, str) or approx_tokens(text) <= max_tokens:
+        return text
+    return text[: max_tokens * 4].rstrip() + " …[truncated]"
+
+
+def _jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _jsonable(dataclasses.asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "__dict__"):
+        return _jsonable(vars(value))
+    return str(value)
+
+
+def _google_places(payload: dict, max_tokens: int) -> dict:
+    places = []
+    for place in payload.get("places", []):
+        places.append({
+            "id": place.get("id"),
+            "name": (place.get("displayName") or {}).get("text"),
+            "address": place.get("formattedAddress"),
+            "location": place.get("location"),
+            "rating": place.get("rating"),
+            "user_rating_count": place.get("userRatingCount"),
+            "price_level": place.get("priceLevel"),
+            "website": place.get("websiteUri"),
+            "maps_url": (place.get("googleMapsLinks") or {}).get("placeUri"),
+            "types": place.get("types", [])[:3],
+            "reviews": [
+                _truncate((review.get("text") or {}).get("text"), max_tokens // 4)
+                for review in place.get("reviews", [])[:2]
+            ],
+        })
+    return {"places": places}
+
+
+def _unsplash(payload: dict, max_tokens: int) -> dict:
+    return {"photos": [
+        {
+            "description": photo.get("alt_description") or photo.get("description"),
+            "image_url": (photo.get("urls") or {}).get("regular"),
+            "page_url": (photo.get("links") or {}).get("html"),
+            "photographer": (photo.get("user") or {}).get("name"),
+        }
+        for photo in payload.get("results", [])
+    ]}
+
+
+def _tavily_search(payload: dict, max_tokens: int) -> dict:
+    return {"results": [
+        {
+            "title": result.get("title"),
+            "url": result.get("url"),
+            "content": _truncate(result.get("content"), max_tokens),
+        }
+        for result in payload.get("results", [])
+    ]}
+
+
+def _tavily_extract(payload: dict, max_tokens: int) -> dict:
+    return {
+        "results": [
+            {"url": result.get("url"), "raw_content": _truncate(result.get("raw_content"), max_tokens)}
+            for result in payload.get("results", [])
+        ],
+        "failed_results": payload.get("failed_results", []),
+    }
+
+
+def _tripadvisor_search(payload: dict, max_tokens: int) -> dict:
+    return {"data": [
+        {
+            "location_id": location.get("location_id"),
+            "name": location.get("name"),
+            "address": (location.get("address_obj") or {}).get("address_string"),
+        }
+        for location in payload.get("data", [])
+    ]}
+
+
+def _tripadvisor_details(payload: dict, max_tokens: int) -> dict:
+    return {
+        "location_id": payload.get("location_id"),
+        "name": payload.get("name"),
+        "description": _truncate(payload.get("description"), max_tokens),
+        "address": (payload.get("address_obj") or {}).get("address_string"),
+        "latitude": payload.get("latitude"),
+        "longitude": payload.get("longitude"),
+        "rating": payload.get("rating"),
+        "num_reviews": payload.get("num_reviews"),
+        "price_level": payload.get("price_level"),
+        "web_url": payload.get("web_url"),
+        "website": payload.get("website"),
+        "cuisine": [cuisine.get("localized_name") for cuisine in payload.get("cuisine", [])],
+    }
+
+
+def _tripadvisor_photos(payload: dict, max_tokens: int) -> dict:
+    return {"data": [
+        {
+            "caption": photo.get("caption"),
+            "image_url": ((photo.get("images") or {}).get("large") or {}).get("url"),
+        }
+        for photo in payload.get("data", [])
+    ]}
+
+
+def _exa_search(payload: dict, max_tokens: int) -> dict:
+    return {"results": [
+        {
+            "title": result.get("title"),
+            "url": result.get("url"),
+            "highlights": result.get("highlights"),
+            "text": _truncate(result.get("text"), max_tokens),
+        }
+        for result in payload.get("results", [])
+    ]}
+
+
+REDUCERS: Dict[str, Callable[[dict, int], dict]] = {
+    "query_google_places": _google_places,
+    "search_unsplash_photos": _unsplash,
+    "tavily_web_search": _tavily_search,
+    "tavily_url_extract": _tavily_extract,
+    "tavily_batch_extract": _tavily_extract,
+    "tripadvisor_location_search": _tripadvisor_search,
+    "tripadvisor_location_details": _tripadvisor_details,
+    "tripadvisor_location_photos": _tripadvisor_photos,
+    "exa_web_search": _exa_search,
+}
+
+
+def _fit(compact: Dict[str, Any], max_tokens: int) -> str:
+    """Serialize `compact`, dropping trailing list items until it fits `max_tokens`."""
+    content = json.dumps(compact, ensure_ascii=False)
+    lists: List[list] = [value for value in compact.values() if isinstance(value, list)]
+    while approx_tokens(content) > max_tokens and any(lists):
+        max(lists, key=len).pop()
+        content = json.dumps(compact, ensure_ascii=False)
+    return content
+
+
+def compact_tool_result(
+        name: str,
+        tool_call_id: str,
+        output: Any,
+        configuration: Configuration
+) -> ToolMessage:
+    """Build the ToolMessage for a tool output, compacting it when a reducer exists."""
+    payload = _jsonable(output)
+    raw = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+    reducer = REDUCERS.get(name)
+    if not configuration.compact_tool_results or reducer is None or not isinstance(payload, dict):
+        return ToolMessage(content=raw, name=name, tool_call_id=tool_call_id)
+
+    compact = reducer(payload, configuration.tool_text_max_tokens)
+    ref = None
+    if configuration.keep_full_tool_results:
+        ref = get_full_result_store(configuration).put(payload)
+        compact = {"ref": ref, **compact}
+    content = _fit(compact, configuration.tool_result_max_tokens)
+    return ToolMessage(
+        content=content,
+        name=name,
+        tool_call_id=tool_call_id,
+        artifact={"ref": ref} if ref else None,
+        response_metadata={
+            "compaction": {"raw_tokens": approx_tokens(raw), "compact_tokens": approx_tokens(content)}
+        },
+    )
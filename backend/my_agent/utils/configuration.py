@@ -3,7 +3,7 @@
 from __future__ import annotations
 import os
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 
@@ -13,6 +13,11 @@ RAPID_API_JEY = os.getenv("RAPID_API_JEY")
 TRIP_ADVISOR_API = os.getenv("TRIP_ADVISOR_API")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
+DEFAULT_CONTEXT_MAX_TOKENS = {
+    "research_itinerary": 24_000,
+    "review_itinerary": 12_000,
+}
+
 
 @dataclass(kw_only=True)
 class Configuration:
@@ -25,6 +30,19 @@ class Configuration:
             "Should be in the form: provider/model-name."
         },
     )
+    fast_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
+        default="openai/gpt-4o-mini",
+        metadata={
+            "description": "The name of the cheaper, faster language model used for validation, "
+            "profile extraction and prompt optimization. Should be in the form: provider/model-name."
+        },
+    )
+    temperature: float = field(
+        default=0.5,
+        metadata={
+            "description": "The sampling temperature for every language model call."
+        },
+    )
     google_places_api_key: str = field(
         default=GPLACES_API_KEY
     )
@@ -46,6 +64,343 @@ class Configuration:
             "description": "The maximum number of search results to return for each search query."
         },
     )
+    http_pool_limit: int = field(
+        default=100,
+        metadata={
+            "description": "The maximum number of open connections in each pooled HTTP session."
+        },
+    )
+    http_pool_limit_per_host: int = field(
+        default=20,
+        metadata={
+            "description": "The maximum number of open connections to a single API host."
+        },
+    )
+    http_dns_cache_ttl: int = field(
+        default=300,
+        metadata={
+            "description": "How long, in seconds, resolved API hostnames are cached."
+        },
+    )
+    http_keepalive_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "How long, in seconds, idle keep-alive connections are held open."
+        },
+    )
+    http_connect_timeout: float = field(
+        default=5.0,
+        metadata={
+            "description": "Seconds allowed to open a connection to an external API."
+        },
+    )
+    http_read_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "Seconds allowed between reads of an external API response."
+        },
+    )
+    http_max_retries: int = field(
+        default=3,
+        metadata={
+            "description": "How many times a timed-out, throttled (429) or 5xx external API call is retried."
+        },
+    )
+    http_backoff_base: float = field(
+        default=0.5,
+        metadata={
+            "description": "Base delay, in seconds, of the jittered exponential backoff between retries."
+        },
+    )
+    http_backoff_max: float = field(
+        default=20.0,
+        metadata={
+            "description": "The longest delay, in seconds, waited before a retry, including Retry-After."
+        },
+    )
+    circuit_failure_threshold: int = field(
+        default=5,
+        metadata={
+            "description": "Consecutive failures after which calls to a host are short-circuited."
+        },
+    )
+    circuit_reset_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "Seconds an open circuit waits before letting a probe call through."
+        },
+    )
+    exa_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "How long, in seconds, an Exa search may take before it is abandoned."
+        },
+    )
+    exa_max_workers: int = field(
+        default=4,
+        metadata={
+            "description": "The maximum number of Exa searches running at once on the worker pool."
+        },
+    )
+    tool_concurrency: dict[str, int] = field(
+        default_factory=lambda: {
+            "tavily": 8,
+            "exa": 4,
+            "google_places": 5,
+            "tripadvisor": 5,
+            "unsplash": 3,
+        },
+        metadata={
+            "description": "The maximum number of concurrent tool calls per API provider."
+        },
+    )
+    rate_limits: dict[str, dict[str, float]] = field(
+        default_factory=lambda: {
+            "google_places": {"rate": 10.0, "burst": 20},
+            "tripadvisor": {"rate": 5.0, "burst": 10},
+            "unsplash": {"rate": 1.0, "burst": 10},
+            "tavily": {"rate": 5.0, "burst": 10},
+            "exa": {"rate": 5.0, "burst": 10},
+        },
+        metadata={
+            "description": "Requests per second (rate) and burst size allowed per API provider and key. "
+            "Providers not listed are not rate limited."
+        },
+    )
+    rate_limit_backend: Literal["memory", "sqlite"] = field(
+        default="memory",
+        metadata={
+            "description": "Where token-bucket balances live: per process, or in a SQLite file shared "
+            "by every worker on the host."
+        },
+    )
+    rate_limit_path: str = field(
+        default=".langgraph-data/ratelimit.sqlite3",
+        metadata={
+            "description": "The SQLite file used by the sqlite rate-limit backend."
+        },
+    )
+    rate_limit_max_wait: Optional[float] = field(
+        default=None,
+        metadata={
+            "description": "The longest a call may queue for a rate-limit token before failing. "
+            "None to always wait."
+        },
+    )
+    tool_default_concurrency: int = field(
+        default=4,
+        metadata={
+            "description": "The concurrency limit for tools whose provider has no explicit limit."
+        },
+    )
+    tool_timeout: float = field(
+        default=60.0,
+        metadata={
+            "description": "How long, in seconds, a single tool call may run before it fails."
+        },
+    )
+    compact_tool_results: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether tool outputs are reduced to the fields the itinerary uses before "
+            "they are added to the message history."
+        },
+    )
+    tool_text_max_tokens: int = field(
+        default=400,
+        metadata={
+            "description": "The token budget for each long text field (page content, descriptions) in a tool result."
+        },
+    )
+    tool_result_max_tokens: int = field(
+        default=3000,
+        metadata={
+            "description": "The token budget for a whole compacted tool result."
+        },
+    )
+    keep_full_tool_results: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether the full payload of each compacted tool result is kept in memory, "
+            "under the ref its compact result carries, for the read_full_tool_result tool."
+        },
+    )
+    full_tool_results_max_entries: int = field(
+        default=256,
+        metadata={
+            "description": "The maximum number of full tool payloads kept for read_full_tool_result."
+        },
+    )
+    context_max_tokens: dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_CONTEXT_MAX_TOKENS),
+        metadata={
+            "description": "The message-history token ceiling for each node that resends the conversation. "
+            "Nodes left out keep their default."
+        },
+    )
+    context_keep_last_turns: int = field(
+        default=4,
+        metadata={
+            "description": "The number of most recent turns kept verbatim in the message window."
+        },
+    )
+    prevalidate_user_response: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether queries that state a destination, budget and number of days are "
+            "accepted from pattern matching without calling the LLM validator."
+        },
+    )
+    stream_itinerary_days: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether each drafted itinerary day is emitted as a custom stream event "
+            "as soon as it is complete. Days of drafts the reviewer rejects are retracted."
+        },
+    )
+    review_precheck_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether drafts are checked with rules first, so the LLM reviewer only runs "
+            "when the rules cannot decide."
+        },
+    )
+    review_budget_tolerance: float = field(
+        default=0.1,
+        metadata={
+            "description": "How far, as a fraction, the estimated cost may exceed the budget before "
+            "the pre-check rejects the draft."
+        },
+    )
+    budget_basis: str = field(
+        default="trip",
+        metadata={
+            "description": "What the profile's budget covers: \"trip\" (the whole party for the whole trip), "
+            "\"person\" (one traveller for the whole trip) or \"person_day\" (one traveller per day)."
+        },
+    )
+    fx_rates: dict[str, float] = field(
+        default_factory=lambda: {
+            "USD": 1.0, "LKR": 300.0, "EUR": 0.92, "GBP": 0.79, "INR": 83.5, "AUD": 1.52,
+        },
+        metadata={
+            "description": "Units of each currency per US dollar, used to compare itinerary costs with "
+            "the budget. Overridden by the file at fx_rates_path."
+        },
+    )
+    fx_rates_path: Optional[str] = field(
+        default=".langgraph-data/fx_rates.json",
+        metadata={
+            "description": "JSON file of {currency: units per US dollar} that overrides fx_rates when "
+            "present, so rates can be refreshed without a deploy."
+        },
+    )
+    review_max_iterations: int = field(
+        default=2,
+        metadata={
+            "description": "The maximum number of times a draft is sent back for another research round."
+        },
+    )
+    review_time_budget: Optional[float] = field(
+        default=None,
+        metadata={
+            "description": "Seconds after research starts beyond which the current draft is accepted. "
+            "None for no limit."
+        },
+    )
+    review_token_budget: Optional[int] = field(
+        default=None,
+        metadata={
+            "description": "Input tokens spent by research and review beyond which the current draft "
+            "is accepted. None for no limit."
+        },
+    )
+    itinerary_cache_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether similar requests are answered from previously generated itineraries."
+        },
+    )
+    itinerary_cache_embedding_model: str = field(
+        default="openai/text-embedding-3-small",
+        metadata={
+            "description": "The embedding model used to compare optimized prompts. "
+            "Should be in the form: provider/model-name. The cache stays off when the "
+            "provider is unsupported or has no API key."
+        },
+    )
+    itinerary_cache_threshold: float = field(
+        default=0.93,
+        metadata={
+            "description": "The minimum cosine similarity between optimized prompts for a cache hit."
+        },
+    )
+    itinerary_cache_max_entries: int = field(
+        default=1000,
+        metadata={
+            "description": "The maximum number of itineraries kept in the semantic cache."
+        },
+    )
+    itinerary_cache_ttl: float = field(
+        default=3 * 24 * 3600,
+        metadata={
+            "description": "How long, in seconds, a cached itinerary may be reused."
+        },
+    )
+    cache_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether external API responses are served from the response cache."
+        },
+    )
+    coalesce_tool_calls: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether identical tool calls made while one is already in flight share "
+            "its upstream request."
+        },
+    )
+    cache_dir: Optional[str] = field(
+        default=".langgraph-data/cache",
+        metadata={
+            "description": "Directory for the on-disk response cache. Set to None to keep it in memory only."
+        },
+    )
+    cache_max_memory_entries: int = field(
+        default=512,
+        metadata={
+            "description": "The maximum number of responses kept in the in-memory LRU tier."
+        },
+    )
+    cache_max_disk_entries: int = field(
+        default=10_000,
+        metadata={
+            "description": "The maximum number of responses kept in the on-disk tier."
+        },
+    )
+    place_index_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether places returned by the Google Places and TripAdvisor tools are "
+            "stored in the local place index used by `lookup_places`."
+        },
+    )
+    place_index_path: Optional[str] = field(
+        default=".langgraph-data/places.sqlite3",
+        metadata={
+            "description": "SQLite file of the local place index. Set to None to keep it in memory only."
+        },
+    )
+    place_index_max_age: float = field(
+        default=30 * 24 * 3600,
+        metadata={
+            "description": "Seconds after which an indexed place is refreshed from the APIs by `lookup_places`."
+        },
+    )
+
+    def context_budget(self, node: str) -> int:
+        """The message-history token ceiling for `node`, falling back to its default."""
+        return self.context_max_tokens.get(node, DEFAULT_CONTEXT_MAX_TOKENS[node])
 
     @classmethod
     def from_runnable_config(
@@ -0,0 +1,91 @@
+"""Token-budgeted message window for the research and review nodes.
+
+`research_itinerary` used to send the complete history on every turn, so the
+prompt grew with every tool round trip and reflection cycle. `build_window`
+keeps the last few turns verbatim, shrinks older tool results and drafts to
+short stubs, and then drops the oldest turns until the window fits the node's
+token ceiling. Human messages are never dropped, and a tool call always stays
+paired with its tool results.
+"""
+from collections import OrderedDict
+from typing import List, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from my_agent.utils.compaction import approx_tokens
+
+_token_counts: "OrderedDict[tuple, int]" = OrderedDict()
+_MAX_CACHED_COUNTS = 50_000
+
+ELIDED_TOOL_RESULT = "[Older {name} result elided to save context. Re-run the tool if it is needed again.]"
+ELIDED_DRAFT_TOKENS = 200
+
+
+def count_tokens(message: BaseMessage) -> int:
+    """Approximate token count of `message`, cached per message id."""
+    key = (message.id, len(str(message.content)))
+    count = _token_counts.get(key) if message.id else None
+    if count is None:
+        count = approx_tokens(str(message.content))
+        if isinstance(message, AIMessage) and message.tool_calls:
+            count += approx_tokens(str(message.tool_calls))
+        if message.id:
+            _token_counts[key] = count
+            if len(_token_counts) > _MAX_CACHED_COUNTS:
+                _token_counts.popitem(last=False)
+    else:
+        _token_counts.move_to_end(key)
+    return count
+
+
+def _turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages so an AI message and the tool results answering it stay together."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and turns:
+            turns[-1].append(message)
+        else:
+            turns.append([message])
+    return turns
+
+
+def _shrink(message: BaseMessage) -> BaseMessage:
+    if isinstance(message, ToolMessage):
+        stub = ELIDED_TOOL_RESULT.format(name=message.name or "tool")
+        return message.model_copy(update={"content": stub})
+    if isinstance(message, AIMessage) and isinstance(message.content, str):
+        if approx_tokens(message.content) > ELIDED_DRAFT_TOKENS:
+            content = message.content[: ELIDED_DRAFT_TOKENS * 4].rstrip() + " …[older draft truncated]"
+            return message.model_copy(update={"content": content})
+    return message
+
+
+def build_window(
+        messages: Sequence[BaseMessage],
+        max_tokens: int,
+        keep_last_turns: int
+) -> List[BaseMessage]:
+    """Return the messages to send, fitted to `max_tokens` where possible."""
+    turns = _turns(messages)
+    recent = turns[-keep_last_turns:] if keep_last_turns > 0 else []
+    older = [[_shrink(message) for message in turn] for turn in turns[: len(turns) - len(recent)]]
+
+    def total() -> int:
+        return sum(count_tokens(message) for turn in older + recent for message in turn)
+
+    # Drop the oldest non-human turns first; the recent turns are kept verbatim.
+    while older and total() > max_tokens:
+        droppable = next((i for i, turn in enumerate(older) if not isinstance(turn[0], HumanMessage)), None)
+        if droppable is None:
+            break
+        del older[droppable]
+
+    return [message for turn in older + recent for message in turn]
+
+
+def fit_message(message: BaseMessage, max_tokens: int) -> BaseMessage:
+    """Truncate a single message so it fits `max_tokens`."""
+    if count_tokens(message) <= max_tokens or not isinstance(message.content, str):
+        return message
+    content = message.content[: max_tokens * 4].rstrip() + " …[truncated]"
+    return message.model_copy(update={"content": content})
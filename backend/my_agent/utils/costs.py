@@ -0,0 +1,212 @@
+"""Numeric cost model for drafted itineraries.
+
+Budget checks used to live in the reviewer prompt, which made them slow and
+unreliable. `estimate_costs` works them out from the parsed `ITINERARY_SCHEMA`
+days instead.
+
+Every item's cost ("$12", "$5 per person", "Rs. 1,500", "Free", "$10-15",
+plain numbers) is parsed into an amount range, a currency and a basis (per
+person or for the whole group). Amounts are converted to the budget's currency
+with the FX table (see `get_fx_rates`).
+
+Because costs are often vague, each day gets a lower and an upper bound:
+
+- An item without a stated basis counts once in the lower bound and once per
+  person in the upper bound.
+- A range counts its low end in the lower bound and its high end in the upper.
+- An unpriced item makes the upper bound unbounded, unless the day has a
+  `daily_cost_estimate` to cover it.
+
+All items are summed per day in one vectorized pass. A draft is conclusively
+over budget when even the lower bound exceeds it, and conclusively within
+budget when the upper bound fits. Only the cases in between need the LLM.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.intake import AMOUNT_PATTERN, CURRENCY_CODES, CURRENCY_PATTERN
+
+_MONEY = re.compile(
+    r"(?<![A-Za-z])" + CURRENCY_PATTERN + r"?\s?" + AMOUNT_PATTERN
+    + r"(?:\s*(?:-|–|—|to)\s*" + CURRENCY_PATTERN + r"?\s?" + AMOUNT_PATTERN + r")?"
+    + r"(?:\s*" + CURRENCY_PATTERN + r"(?!\w))?",
+    re.IGNORECASE,
+)
+_FREE = re.compile(r"^\s*(?:(free|none|no charge|included|complimentary)\b|[$€£]?\s?0(?![\d.,]))", re.IGNORECASE)
+_PER_PERSON = re.compile(r"\b(per (person|head|adult|pax|ticket)|pp|each|/\s*(person|pax|pp))\b", re.IGNORECASE)
+_PER_GROUP = re.compile(
+    r"\b(per (group|couple|family|table|car|vehicle|room)|total|for (all|everyone|the group))\b", re.IGNORECASE
+)
+
+Basis = Literal["person", "group", None]
+
+
+@dataclass
+class Cost:
+    """One parsed cost: `low`..`high` in `currency`; None amounts mean the cost is unknown."""
+    low: Optional[float]
+    high: Optional[float]
+    currency: str
+    basis: Basis = None
+
+
+def parse_cost(cost: Any, default_currency: str = "USD") -> Cost:
+    """Parse an `ITINERARY_SCHEMA` cost value (number or string) into a `Cost`."""
+    if cost is None:
+        return Cost(None, None, default_currency)
+    if isinstance(cost, (int, float)):
+        return Cost(float(cost), float(cost), default_currency)
+
+    text = str(cost)
+    if _FREE.match(text):
+        return Cost(0.0, 0.0, default_currency)
+    basis: Basis = "person" if _PER_PERSON.search(text) else "group" if _PER_GROUP.search(text) else None
+    priced, bare = [], []
+    currency = None
+    for match in _MONEY.finditer(text):
+        cur1, amount1, k1, cur2, amount2, k2, cur3 = match.groups()
+        amounts = [float(amount1.replace(",", "")) * (1000 if k1 else 1)]
+        if amount2:
+            amounts.append(float(amount2.replace(",", "")) * (1000 if k2 else 1))
+        symbol = cur1 or cur2 or cur3
+        if symbol and currency is None:
+            currency = CURRENCY_CODES[symbol.lower()]
+        (priced if symbol else bare).extend(amounts)
+    # Bare numbers next to prices are usually not prices ("$5 per person, 2 hours").
+    amounts = priced or bare
+    if not amounts:
+        return Cost(None, None, currency or default_currency, basis)
+    # "$10-15", "$20 adults, $10 kids": the range spans the amounts given.
+    return Cost(min(amounts), max(amounts), currency or default_currency, basis)
+
+
+_file_rates: Dict[str, Tuple[float, Dict[str, float]]] = {}
+
+
+def get_fx_rates(configuration: Configuration) -> Dict[str, float]:
+    """Units of each currency per US dollar.
+
+    `configuration.fx_rates` is overridden by the JSON file at `fx_rates_path`
+    when it exists, so rates can be refreshed without a deploy. The file is only
+    re-read when it changes.
+    """
+    rates = {k.upper(): float(v) for k, v in configuration.fx_rates.items()}
+    path = configuration.fx_rates_path
+    if path and os.path.exists(path):
+        mtime = os.path.getmtime(path)
+        cached = _file_rates.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path) as f:
+                cached = _file_rates[path] = (mtime, {k.upper(): float(v) for k, v in json.load(f).items()})
+        rates.update(cached[1])
+    return rates
+
+
+@dataclass
+class CostEstimate:
+    currency: str
+    people: int
+    limit: Optional[float]
+    day_numbers: List[int]
+    day_low: np.ndarray
+    day_high: np.ndarray
+    unpriced: List[Tuple[int, str]] = field(default_factory=list)
+    unknown_currencies: List[str] = field(default_factory=list)
+
+    @property
+    def total_low(self) -> float:
+        return float(self.day_low.sum())
+
+    @property
+    def total_high(self) -> float:
+        return float(self.day_high.sum())
+
+    def budget_verdict(self, tolerance: float = 0.1) -> Literal["over", "within", "uncertain", "no_budget"]:
+        if not self.limit:
+            return "no_budget"
+        allowed = self.limit * (1 + tolerance)
+        if self.total_low > allowed:
+            return "over"
+        if self.total_high <= allowed:
+            return "within"
+        return "uncertain"
+
+    def expensive_days(self, count: int = 3) -> List[Tuple[int, float]]:
+        """The `count` days with the highest lower-bound cost, most expensive first."""
+        order = np.argsort(-self.day_low, kind="stable")[:count]
+        return [(self.day_numbers[i], float(self.day_low[i])) for i in order]
+
+
+def budget_limit(profile: dict, basis: str = "trip") -> Optional[float]:
+    """The most the whole trip may cost: `budget`, times people and/or days depending on `basis`."""
+    budget = float(profile.get("budget") or 0)
+    if budget <= 0:
+        return None
+    people = max(int(profile.get("number_of_people") or 1), 1)
+    days = max(int(profile.get("number_of_days") or 1), 1)
+    if basis == "person":
+        return budget * people
+    if basis == "person_day":
+        return budget * people * days
+    return budget
+
+
+def estimate_costs(
+        days: Sequence[Dict[str, Any]],
+        profile: dict,
+        rates: Dict[str, float],
+        budget_basis: str = "trip",
+        item_currency: str = "USD",
+) -> CostEstimate:
+    """Per-day lower and upper cost bounds of parsed itinerary `days`, in the budget's currency."""
+    currency = str(profile.get("currency") or "USD").upper()
+    people = max(int(profile.get("number_of_people") or 1), 1)
+    estimate = CostEstimate(
+        currency, people, budget_limit(profile, budget_basis), [day["day_number"] for day in days],
+        np.zeros(len(days)), np.zeros(len(days)),
+    )
+    if currency not in rates:
+        estimate.unknown_currencies.append(currency)
+        estimate.day_high[:] = np.inf
+        return estimate
+
+    # One row per priced item: day index, amount range, basis multipliers, conversion rate.
+    rows: List[Tuple[int, float, float, int, int, float]] = []
+    covered = np.array(["daily_cost_estimate" in day for day in days], dtype=bool)
+    for index, day in enumerate(days):
+        for item in day.get("attractions", []) + day.get("dining", []):
+            cost = parse_cost(item.get("cost"), item_currency)
+            if cost.low is None:
+                estimate.unpriced.append((day["day_number"], item.get("name", "?")))
+                if not covered[index]:
+                    estimate.day_high[index] = np.inf
+                continue
+            if cost.currency not in rates:
+                estimate.unknown_currencies.append(cost.currency)
+                estimate.day_high[index] = np.inf
+                continue
+            low_multiplier = people if cost.basis == "person" else 1
+            high_multiplier = 1 if cost.basis == "group" else people
+            rows.append((index, cost.low, cost.high, low_multiplier, high_multiplier, rates[cost.currency]))
+
+    if rows:
+        index, low, high, low_multiplier, high_multiplier, rate = (np.array(column) for column in zip(*rows))
+        to_budget = rates[currency] / rate
+        estimate.day_low += np.bincount(index, low * low_multiplier * to_budget, minlength=len(days))
+        estimate.day_high += np.bincount(index, high * high_multiplier * to_budget, minlength=len(days))
+
+    # A day's own estimate (in the item currency, basis unknown) bounds it from
+    # below, and stands in for its unpriced items in the upper bound.
+    daily = np.array([float(day.get("daily_cost_estimate") or 0) for day in days]) * (
+        rates[currency] / rates.get(item_currency, rates[currency])
+    )
+    estimate.day_low = np.maximum(estimate.day_low, daily)
+    estimate.day_high = np.where(covered, np.maximum(estimate.day_high, daily * people), estimate.day_high)
+    estimate.unknown_currencies = list(dict.fromkeys(estimate.unknown_currencies))
+    return estimate
@@ -0,0 +1,128 @@
+"""Concurrent tool execution for the research loop.
+
+Replaces the bare `ToolNode(tools)`: every tool call in the last AI message runs
+concurrently, bounded by a semaphore per API provider so a burst of calls does
+not trip the provider's rate limits. Each call has its own timeout, and a call
+that fails becomes an error `ToolMessage` instead of failing the whole batch,
+so the model can see which calls to retry. Successful outputs are compacted
+before they are added to the history (see `my_agent.utils.compaction`). Each
+call is recorded as a "tool" span, including the time spent waiting for its
+provider's semaphore (see `my_agent.utils.metrics`). Places found by the
+Google Places and TripAdvisor tools are added to the local place index (see
+`my_agent.utils.places`).
+"""
+import asyncio
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langchain_core.tools import tool as create_tool
+
+from my_agent.utils import metrics
+from my_agent.utils.compaction import compact_tool_result
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.places import EXTRACTORS, get_place_index
+from my_agent.utils.state import State
+
+# Tools that share an upstream API share a concurrency limit.
+TOOL_PROVIDERS = {
+    "exa_web_search": "exa",
+    "tavily_web_search": "tavily",
+    "tavily_url_extract": "tavily",
+    "tavily_batch_extract": "tavily",
+    "query_google_places": "google_places",
+    "lookup_places": "google_places",
+    "tripadvisor_location_search": "tripadvisor",
+    "tripadvisor_location_details": "tripadvisor",
+    "tripadvisor_location_photos": "tripadvisor",
+    "search_unsplash_photos": "unsplash",
+}
+
+
+class ToolExecutor:
+    """Graph node that runs the tool calls of the last message concurrently."""
+
+    def __init__(self, tools: Sequence[Callable[..., Any]]):
+        self.tools: Dict[str, BaseTool] = {}
+        for tool in tools:
+            tool = tool if isinstance(tool, BaseTool) else create_tool(tool)
+            self.tools[tool.name] = tool
+        self._semaphores: Dict[Tuple[int, str, int], Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+    def _semaphore(self, provider: str, configuration: Configuration) -> asyncio.Semaphore:
+        """The semaphore for `provider` on the running loop, at this configuration's limit.
+
+        Keyed on (event loop, provider, limit), like the sessions in `my_agent.utils.http`,
+        so a changed `tool_concurrency` takes effect and no semaphore outlives its loop.
+        """
+        loop = asyncio.get_running_loop()
+        limit = configuration.tool_concurrency.get(provider, configuration.tool_default_concurrency)
+        key = (id(loop), provider, limit)
+        owner, semaphore = self._semaphores.get(key, (None, None))
+        # A closed loop can hand its id to a new one, so check identity too.
+        if owner is not loop:
+            for stale in [k for k, (other, _) in self._semaphores.items() if other.is_closed()]:
+                del self._semaphores[stale]
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[key] = (loop, semaphore)
+        return semaphore
+
+    @staticmethod
+    async def _index_places(name: str, args: Dict[str, Any], output: Any, configuration: Configuration) -> None:
+        try:
+            await get_place_index(configuration).aingest(name, args, output)
+        except sqlite3.Error:
+            # The index is an optimization; a locked or corrupt file must not fail the call.
+            pass
+
+    async def _run(self, call: ToolCall, config: RunnableConfig, configuration: Configuration) -> ToolMessage:
+        tool = self.tools.get(call["name"])
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: {call['name']} is not a valid tool, try one of [{', '.join(self.tools)}].",
+                name=call["name"],
+                tool_call_id=call["id"],
+                status="error",
+            )
+
+        provider = TOOL_PROVIDERS.get(tool.name, tool.name)
+        with metrics.span("tool", tool.name) as span:
+            deadline = None
+            try:
+                queued = time.perf_counter()
+                async with self._semaphore(provider, configuration):
+                    metrics.record(queue_time=time.perf_counter() - queued)
+                    deadline = asyncio.timeout(configuration.tool_timeout)
+                    async with deadline:
+                        output = await tool.ainvoke(call["args"], config)
+                if configuration.place_index_enabled and tool.name in EXTRACTORS:
+                    await self._index_places(tool.name, call["args"], output, configuration)
+                return compact_tool_result(tool.name, call["id"], output, configuration)
+            except Exception as e:
+                # Only our own deadline means the call timed out; a TimeoutError from
+                # inside the tool (an HTTP or SDK timeout) is reported as it is.
+                if deadline is not None and deadline.expired():
+                    error = f"timed out after {configuration.tool_timeout:g}s"
+                else:
+                    error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+            if span is not None:
+                span.status, span.error = "error", error
+
+        return ToolMessage(
+            content=f"Error: {error}\n Please fix your mistakes or try again later.",
+            name=tool.name,
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    async def __call__(self, state: State, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        configuration = Configuration.from_runnable_config(config)
+        tool_calls = state.messages[-1].tool_calls
+        messages = await asyncio.gather(
+            *(self._run(call, config, configuration) for call in tool_calls)
+        )
+        return {"messages": list(messages)}
@@ -0,0 +1,93 @@
+"""Shared, pooled aiohttp sessions for the HTTP tools.
+
+Every tool used to open its own `aiohttp.ClientSession`, paying a fresh TCP and
+TLS handshake per call. Sessions are now kept in a process-wide registry keyed
+on (event loop, host) so keep-alive connections and the DNS cache are reused
+across tool calls and graph runs.
+"""
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from my_agent.utils import metrics
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.resilience import call_with_retries, http_timeout
+
+_sessions: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+
+
+def _new_session(configuration: Configuration) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=configuration.http_pool_limit,
+        limit_per_host=configuration.http_pool_limit_per_host,
+        ttl_dns_cache=configuration.http_dns_cache_ttl,
+        keepalive_timeout=configuration.http_keepalive_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def get_session(url: str, configuration: Configuration) -> aiohttp.ClientSession:
+    """Borrow the pooled session for the host of `url` on the running loop.
+
+    Pool limits are taken from the configuration of the first call that opens
+    the session for a host; later calls reuse it as-is.
+    """
+    loop = asyncio.get_running_loop()
+    key = (id(loop), urlsplit(url).netloc)
+
+    owner, session = _sessions.get(key, (None, None))
+    # A closed loop can hand its id to a new one, so check identity too.
+    if owner is not loop or session.closed:
+        session = _new_session(configuration)
+        _sessions[key] = (loop, session)
+    return session
+
+
+def _request_size(kwargs: Dict[str, Any]) -> int:
+    if "json" in kwargs:
+        return len(json.dumps(kwargs["json"]).encode())
+    data = kwargs.get("data")
+    return len(data) if isinstance(data, (bytes, str)) else 0
+
+
+async def request_json(
+        method: str,
+        url: str,
+        configuration: Configuration,
+        rate_limit: Optional[Tuple[str, Optional[str]]] = None,
+        **kwargs: Any
+) -> dict:
+    """Send a request through the pooled session and return the decoded JSON body.
+
+    Timeouts, retries and the per-host circuit breaker come from
+    `my_agent.utils.resilience`; `rate_limit=(provider, api_key)` picks the
+    token bucket each attempt draws from.
+    """
+    kwargs.setdefault("timeout", http_timeout(configuration))
+
+    async def attempt() -> dict:
+        session = get_session(url, configuration)
+        async with session.request(method, url, **kwargs) as response:
+            response.raise_for_status()
+            body = await response.read()
+            metrics.record(bytes_out=_request_size(kwargs), bytes_in=len(body))
+            return await response.json()
+
+    return await call_with_retries(urlsplit(url).netloc, attempt, configuration, rate_limit)
+
+
+async def close_sessions() -> None:
+    """Close every pooled session owned by the running loop.
+
+    Called from the server lifespan in `my_agent.webapp` at shutdown, and by
+    scripts before their loop ends, so connectors release their sockets cleanly
+    instead of warning about unclosed sessions at exit.
+    """
+    loop_id = id(asyncio.get_running_loop())
+    for key in [key for key in _sessions if key[0] == loop_id]:
+        _, session = _sessions.pop(key)
+        if not session.closed:
+            await session.close()
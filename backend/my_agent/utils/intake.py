@@ -0,0 +1,132 @@
+"""Rule-based extraction of trip fields from the user's messages.
+
+`validate_user_response` only needs to know whether the destination, budget and
+number of days are present, which is usually obvious from the text. The
+patterns below pull those fields (plus currency and party size) out of the
+human messages, so the LLM validator is only called when something is missing
+or unclear. The extracted fields are kept in state for `update_user_profile`.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+REQUIRED_FIELDS = ("destination", "budget", "number_of_days")
+
+DESTINATIONS = (
+    "Sri Lanka", "Colombo", "Kandy", "Galle", "Ella", "Sigiriya", "Dambulla", "Nuwara Eliya",
+    "Trincomalee", "Jaffna", "Mirissa", "Unawatuna", "Hikkaduwa", "Bentota", "Negombo",
+    "Anuradhapura", "Polonnaruwa", "Yala", "Arugam Bay", "Tangalle", "Haputale", "Pasikudah",
+    "Kalpitiya", "Weligama", "Udawalawe", "Adam's Peak", "Horton Plains", "Batticaloa",
+)
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+}
+_NUMBER = r"(\d+|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")"
+
+CURRENCY_CODES = {
+    "$": "USD", "us$": "USD", "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pound": "GBP", "pounds": "GBP",
+    "rs": "LKR", "rs.": "LKR", "lkr": "LKR", "rupee": "LKR", "rupees": "LKR",
+    "₹": "INR", "inr": "INR", "a$": "AUD", "aud": "AUD",
+}
+# Shared with my_agent.utils.costs. Groups: the currency symbol or word; the
+# amount and an optional thousands multiplier ("2k", "3 thousand", not "kids").
+CURRENCY_PATTERN = r"(us\$|a\$|\$|€|£|₹|rs\.?|usd|eur|gbp|lkr|inr|aud|dollars?|euros?|pounds?|rupees?)"
+AMOUNT_PATTERN = r"(\d[\d,]*(?:\.\d+)?)\s*(k\b|thousand\b)?"
+
+_DESTINATION = re.compile(r"\b(" + "|".join(re.escape(d) for d in DESTINATIONS) + r")\b", re.IGNORECASE)
+_DAYS = re.compile(_NUMBER + r"\s*[- ]?\s*(days?|nights?|weeks?)\b", re.IGNORECASE)
+_DURATION_WORDS = re.compile(r"\b(fortnight|weekend|a week)\b", re.IGNORECASE)
+_DURATION_DAYS = {"fortnight": 14, "weekend": 2, "a week": 7}
+_BUDGET_PREFIX = re.compile(r"(?<![A-Za-z])" + CURRENCY_PATTERN + r"\s?" + AMOUNT_PATTERN, re.IGNORECASE)
+_BUDGET_SUFFIX = re.compile(AMOUNT_PATTERN + r"\s?" + CURRENCY_PATTERN + r"(?!\w)", re.IGNORECASE)
+_BUDGET_BARE = re.compile(
+    r"\bbudget\b\D{0,20}?" + AMOUNT_PATTERN + r"(?!\s*(?:days?|nights?|weeks?|people|adults?|kids?))", re.IGNORECASE
+)
+_ADULTS = re.compile(_NUMBER + r"\s+(adults?|people|persons|pax|travell?ers|of us)\b", re.IGNORECASE)
+_KIDS = re.compile(_NUMBER + r"\s+(kids?|children|child|toddlers?|teens?)\b", re.IGNORECASE)
+_FAMILY = re.compile(r"\bfamily of " + _NUMBER + r"\b", re.IGNORECASE)
+_PARTNER = re.compile(
+    r"\b(?:my|with (?:my|a)) (?:wife|husband|partner|girlfriend|boyfriend|fianc[ée]e?)\b|\bas a couple\b", re.IGNORECASE
+)
+_SOLO = re.compile(r"\b(solo|alone|by myself|just me)\b", re.IGNORECASE)
+
+
+@dataclass
+class Prevalidation:
+    fields: Dict[str, Any] = field(default_factory=dict)
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        """True when every required field was found; otherwise the LLM validator decides."""
+        return not self.missing
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else _NUMBER_WORDS[token.lower()]
+
+
+def _amount(value: str, multiplier: Optional[str]) -> float:
+    amount = float(value.replace(",", ""))
+    return amount * 1000 if multiplier else amount
+
+
+def extract_trip_fields(text: str) -> Dict[str, Any]:
+    """Extract the trip fields stated in `text`, using `USER_SCHEMA` field names."""
+    fields: Dict[str, Any] = {}
+
+    destination = _DESTINATION.search(text)
+    if destination:
+        fields["destination"] = next(d for d in DESTINATIONS if d.lower() == destination.group(1).lower())
+
+    days = _DAYS.search(text)
+    if days:
+        count, unit = _number(days.group(1)), days.group(2).lower()
+        fields["number_of_days"] = count * 7 if unit.startswith("week") else count + 1 if unit.startswith("night") else count
+    else:
+        duration = _DURATION_WORDS.search(text)
+        if duration:
+            fields["number_of_days"] = _DURATION_DAYS[duration.group(1).lower()]
+
+    prefix, suffix = _BUDGET_PREFIX.search(text), _BUDGET_SUFFIX.search(text)
+    if prefix:
+        fields["budget"] = _amount(prefix.group(2), prefix.group(3))
+        fields["currency"] = CURRENCY_CODES[prefix.group(1).lower()]
+    elif suffix:
+        fields["budget"] = _amount(suffix.group(1), suffix.group(2))
+        fields["currency"] = CURRENCY_CODES[suffix.group(3).lower()]
+    else:
+        bare = _BUDGET_BARE.search(text)
+        if bare:
+            fields["budget"] = _amount(bare.group(1), bare.group(2))
+
+    adults, kids, family = _ADULTS.search(text), _KIDS.search(text), _FAMILY.search(text)
+    if kids:
+        fields["number_of_kids"] = _number(kids.group(1))
+        fields["has_kids"] = fields["number_of_kids"] > 0
+    if adults:
+        fields["number_of_adults"] = _number(adults.group(1))
+    elif _PARTNER.search(text):
+        fields["number_of_adults"] = 2
+    elif _SOLO.search(text):
+        fields["number_of_adults"] = 1
+    if family:
+        fields["number_of_people"] = _number(family.group(1))
+    elif "number_of_adults" in fields:
+        fields["number_of_people"] = fields["number_of_adults"] + fields.get("number_of_kids", 0)
+    return fields
+
+
+def prevalidate(messages: Iterable[BaseMessage]) -> Prevalidation:
+    """Extract trip fields from the human messages; later messages override earlier ones."""
+    fields: Dict[str, Any] = {}
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            fields.update(extract_trip_fields(message.text()))
+    return Prevalidation(fields, [name for name in REQUIRED_FIELDS if name not in fields])
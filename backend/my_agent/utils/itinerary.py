@@ -0,0 +1,151 @@
+"""Parse drafted itineraries into `ITINERARY_SCHEMA` day objects.
+
+`research_itinerary` writes the itinerary as markdown, one "Day N" section per
+day with bulleted attractions and dining options in the format shown in
+`GENERATE_ITINERARY_PROMPT`. The helpers here split that markdown into days,
+turn each day into a structured object and validate it against the day item
+schema, so days can be streamed and checked as soon as they are drafted.
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+from my_agent.utils.schemas import ITINERARY_SCHEMA
+
+DAY_SCHEMA = ITINERARY_SCHEMA["properties"]["days"]["items"]
+
+_DAY_HEADER = re.compile(r"^[#*_\s]*Day\s+(\d+)\b(?!\s*(?:total|cost))", re.IGNORECASE | re.MULTILINE)
+_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+\*\*(?P<name>[^*]+?)\*\*\s*[-–—:]*\s*(?P<rest>.*)$")
+_HEADING = re.compile(r"^[\s#*_\-]*(?P<title>[A-Za-z ]+?)[\s*_:]*$")
+_FIELD = re.compile(
+    r"\b(Type|Location|Cost|Rating|Reviews?|Forum Insights|Website|Image|Weather|Tips)\s*:\s*",
+    re.IGNORECASE,
+)
+_DAY_TOTAL = re.compile(
+    r"(?:Day\s+\d+\s+Total|daily\s+cost(?:\s+estimate)?|total\s+for\s+the\s+day)\W*\s*[$€£]?\s*([\d,]+(?:\.\d+)?)",
+    re.IGNORECASE,
+)
+_NUMBER = re.compile(r"^[$€£]?\s*([\d,]+(?:\.\d+)?)$")
+
+_SECTIONS = {
+    "attractions": "attractions", "attraction": "attractions", "activities": "attractions",
+    "sightseeing": "attractions", "dining": "dining", "restaurants": "dining", "meals": "dining",
+    "food": "dining",
+}
+_FIELD_NAMES = {
+    "type": "type", "location": "location", "cost": "cost", "rating": "rating", "review": "reviews",
+    "reviews": "reviews", "forum insights": "forum_insights", "website": "website_url",
+    "image": "image_url", "weather": "weather", "tips": "tips",
+}
+
+
+def has_day_header(text: str) -> bool:
+    """Whether `text`, which must start at a line boundary, contains a "Day N" header."""
+    return _DAY_HEADER.search(text) is not None
+
+
+def split_days(text: str) -> List[Tuple[int, str]]:
+    """Split markdown into (day number, section text) pairs, in order of appearance."""
+    headers = list(_DAY_HEADER.finditer(text))
+    return [
+        (int(match.group(1)), text[match.start(): headers[i + 1].start() if i + 1 < len(headers) else len(text)])
+        for i, match in enumerate(headers)
+    ]
+
+
+def _markdown_value(value: str) -> str:
+    value = value.strip().rstrip(",").strip().strip('"').strip()
+    link = re.fullmatch(r"!?\[[^\]]*\]\(([^)]+)\)", value)
+    return link.group(1) if link else value
+
+
+def _cost(value: str) -> Any:
+    if value.lower() in {"free", "none", "no charge"}:
+        return 0
+    number = _NUMBER.match(value)
+    if number and not value.startswith("$"):
+        return float(number.group(1).replace(",", ""))
+    return value
+
+
+def _parse_item(name: str, rest: str) -> Dict[str, Any]:
+    item: Dict[str, Any] = {"name": name.strip()}
+    matches = list(_FIELD.finditer(rest))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(rest)
+        key = _FIELD_NAMES[match.group(1).lower()]
+        value = _markdown_value(rest[match.end(): end])
+        if key == "cost":
+            item[key] = _cost(value)
+        elif key == "rating":
+            rating = re.match(r"\d+(?:\.\d+)?", value)
+            if rating:
+                item[key] = float(rating.group())
+        elif value:
+            item[key] = value
+    return item
+
+
+def parse_day(day_number: int, section: str) -> Dict[str, Any]:
+    """Turn one day's markdown section into an `ITINERARY_SCHEMA` day object."""
+    day: Dict[str, Any] = {"day_number": day_number, "attractions": [], "dining": []}
+    current = "attractions"
+    for line in section.splitlines()[1:]:
+        item = _ITEM.match(line)
+        heading = _HEADING.match(line)
+        if heading and heading.group("title").strip().lower() in _SECTIONS:
+            current = _SECTIONS[heading.group("title").strip().lower()]
+        elif item and item.group("name").strip().rstrip(":").lower() in _SECTIONS and not item.group("rest"):
+            current = _SECTIONS[item.group("name").strip().rstrip(":").lower()]
+        elif item:
+            day[current].append(_parse_item(item.group("name"), item.group("rest")))
+
+        total = _DAY_TOTAL.search(line)
+        if total:
+            day["daily_cost_estimate"] = float(total.group(1).replace(",", ""))
+    return day
+
+
+def parse_itinerary(text: str) -> List[Dict[str, Any]]:
+    """Parse every day section in `text`."""
+    return [parse_day(number, section) for number, section in split_days(text)]
+
+
+_TYPES = {
+    "object": dict, "array": list, "string": str, "boolean": bool,
+    "integer": int, "number": (int, float),
+}
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Validate `value` against the JSON-schema subset used in `schemas.py`; return error strings."""
+    if "oneOf" in schema:
+        if not any(not validate(value, option, path) for option in schema["oneOf"]):
+            return [f"{path}: does not match any allowed form"]
+        return []
+
+    expected = schema.get("type")
+    if expected and (not isinstance(value, _TYPES[expected]) or (expected != "boolean" and isinstance(value, bool))):
+        return [f"{path}: expected {expected}"]
+
+    errors: List[str] = []
+    if isinstance(value, dict):
+        errors += [f"{path}.{key}: required" for key in schema.get("required", []) if key not in value]
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors += validate(value[key], subschema, f"{path}.{key}")
+    elif isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors += validate(item, schema["items"], f"{path}[{i}]")
+    elif isinstance(value, (int, float)):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: below minimum {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: above maximum {schema['maximum']}")
+    elif isinstance(value, str) and "pattern" in schema and not re.search(schema["pattern"], value):
+        errors.append(f"{path}: does not match {schema['pattern']}")
+    return errors
+
+
+def validate_day(day: Dict[str, Any]) -> List[str]:
+    """Validate a parsed day against the `ITINERARY_SCHEMA` day item schema."""
+    return validate(day, DAY_SCHEMA, f"$.days[{day.get('day_number', '?')}]")
@@ -0,0 +1,147 @@
+"""Semantic cache for whole itineraries.
+
+Many users ask for nearly the same trip. A finished itinerary is stored under
+the normalized `user_profile` (exact match on the fields that change the plan)
+plus an embedding of `optimized_prompt`. A new request whose profile matches
+and whose prompt embedding is within the similarity threshold is answered from
+the cache without running the research loop.
+
+The cache is an optimization only: it is off when no embedding provider is
+configured, and callers treat its failures as misses.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+
+from my_agent.utils.configuration import Configuration
+
+Embed = Callable[[str], Awaitable[List[float]]]
+
+
+@dataclass
+class CachedItinerary:
+    profile_key: str
+    prompt: str
+    itinerary: str
+    created_at: float
+
+
+def profile_key(profile: dict) -> str:
+    """Normalize the profile fields that change the itinerary into a stable key."""
+    budget = float(profile.get("budget") or 0)
+    return json.dumps({
+        "destination": " ".join(str(profile.get("destination", "")).lower().split()),
+        "number_of_days": profile.get("number_of_days"),
+        "number_of_adults": profile.get("number_of_adults"),
+        "number_of_kids": profile.get("number_of_kids"),
+        # Budgets within ~10% of each other share a bucket.
+        "budget": round(np.log1p(budget) / np.log(1.1)) if budget > 0 else 0,
+        "currency": str(profile.get("currency") or "").upper(),
+        "has_disability": bool(profile.get("has_disability")),
+        "has_pets": bool(profile.get("has_pets")),
+        "is_vegetarian": bool(profile.get("is_vegetarian")),
+        "preferences": sorted(str(p).lower().strip() for p in profile.get("preferences") or []),
+    }, sort_keys=True)
+
+
+class ItineraryCache:
+    """In-memory vector index of finished itineraries with TTL, LRU eviction and hit-rate metrics."""
+
+    def __init__(self, embed: Embed, threshold: float = 0.93, max_entries: int = 1000, ttl: float = 3 * 24 * 3600):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, CachedItinerary]" = OrderedDict()
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._next_id = 0
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def hit_rate(self) -> float:
+        return self.stats["hits"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+
+    async def _vector(self, text: str) -> np.ndarray:
+        vector = self._embeddings.get(text)
+        if vector is None:
+            vector = np.asarray(await self.embed(text), dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+            self._embeddings[text] = vector
+            if len(self._embeddings) > self.max_entries:
+                self._embeddings.popitem(last=False)
+        else:
+            self._embeddings.move_to_end(text)
+        return vector
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        for entry_id in [i for i, entry in self._entries.items() if entry.created_at < cutoff]:
+            self._drop(entry_id)
+
+    def _drop(self, entry_id: int) -> None:
+        del self._entries[entry_id]
+        del self._vectors[entry_id]
+        self.stats["evictions"] += 1
+
+    async def lookup(self, profile: dict, prompt: str) -> Optional[CachedItinerary]:
+        """Return the most similar cached itinerary for this profile, if one clears the threshold."""
+        self.stats["lookups"] += 1
+        self._expire()
+        key = profile_key(profile)
+        candidates = [i for i, entry in self._entries.items() if entry.profile_key == key]
+        if candidates:
+            query = await self._vector(prompt)
+            scores = np.stack([self._vectors[i] for i in candidates]) @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                entry_id = candidates[best]
+                self._entries.move_to_end(entry_id)
+                self.stats["hits"] += 1
+                return self._entries[entry_id]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def store(self, profile: dict, prompt: str, itinerary: str) -> None:
+        vector = await self._vector(prompt)
+        entry_id, self._next_id = self._next_id, self._next_id + 1
+        self._entries[entry_id] = CachedItinerary(profile_key(profile), prompt, itinerary, time.time())
+        self._vectors[entry_id] = vector
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+
+_cache: Optional[ItineraryCache] = None
+
+
+def get_itinerary_cache(configuration: Configuration) -> Optional[ItineraryCache]:
+    """Return the process-wide itinerary cache, creating it from `configuration` on first use.
+
+    Returns None, leaving the cache off, when the embedding provider is not
+    supported or has no API key, e.g. in Anthropic-only deployments.
+    """
+    global _cache
+    if _cache is None:
+        provider, _, model = configuration.itinerary_cache_embedding_model.partition("/")
+        if provider != "openai" or not model or not os.environ.get("OPENAI_API_KEY"):
+            return None
+        _cache = ItineraryCache(
+            embed=OpenAIEmbeddings(model=model).aembed_query,
+            threshold=configuration.itinerary_cache_threshold,
+            max_entries=configuration.itinerary_cache_max_entries,
+            ttl=configuration.itinerary_cache_ttl,
+        )
+    return _cache
+
+
+def set_itinerary_cache(cache: Optional[ItineraryCache]) -> None:
+    """Replace the process-wide itinerary cache, e.g. with one using a stub embedder."""
+    global _cache
+    _cache = cache
@@ -0,0 +1,242 @@
+"""Per-node and per-tool latency instrumentation.
+
+Every graph node and every tool call runs inside a `Span` that records wall
+time, time spent queued behind a concurrency limit, retries, HTTP bytes in and
+out, and LLM token usage. Code deeper in the call stack adds to the active span
+through `record` and `record_usage`, which find it via a context variable.
+Finished spans are handed to the registered sinks:
+
+- `MemorySink` keeps recent spans and per-(kind, name) aggregates in process.
+- `PrometheusSink` aggregates counters and histograms and renders the Prometheus
+  text exposition format.
+- `JsonlSink` appends one JSON object per span to a file.
+
+Sinks are registered with `set_sinks`, or from the `METRICS_SINKS` environment
+variable (comma separated: memory, prometheus, jsonl; `METRICS_JSONL_PATH` sets
+the file). With no sinks registered, instrumentation is disabled and a wrapped
+node costs one list check.
+"""
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Protocol, Tuple, TypeVar
+
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    started_at: float
+    parent: Optional[str] = None
+    wall_time: float = 0.0
+    queue_time: float = 0.0
+    retries: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    status: str = "ok"
+    error: Optional[str] = None
+
+
+_COUNTERS = [f.name for f in fields(Span) if f.type in (int, float) and f.name != "started_at"]
+
+
+class Sink(Protocol):
+    def emit(self, span: Span) -> None: ...
+
+
+class MemorySink:
+    """Keeps the last `max_spans` spans and running totals per (kind, name)."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            totals = self._totals[(span.kind, span.name)]
+            totals["count"] += 1
+            totals["errors"] += span.status != "ok"
+            totals["max_wall_time"] = max(totals["max_wall_time"], span.wall_time)
+            for counter in _COUNTERS:
+                totals[counter] += getattr(span, counter)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Totals and mean wall time per `kind:name`."""
+        with self._lock:
+            return {
+                f"{kind}:{name}": {**totals, "mean_wall_time": totals["wall_time"] / totals["count"]}
+                for (kind, name), totals in self._totals.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self._totals.clear()
+
+
+class PrometheusSink:
+    """Aggregates spans into counters and a wall-time histogram for Prometheus scraping."""
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+    def __init__(self, namespace: str = "travel_agent"):
+        self.namespace = namespace
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        labels = (("kind", span.kind), ("name", span.name))
+        with self._lock:
+            # Cumulative bucket counts, then sum and count.
+            histogram = self._histograms.setdefault((span.kind, span.name), [0.0] * (len(self.BUCKETS) + 2))
+            for i, bound in enumerate(self.BUCKETS):
+                histogram[i] += span.wall_time <= bound
+            histogram[-2] += span.wall_time
+            histogram[-1] += 1
+
+            self._counters[("spans_total", labels + (("status", span.status),))] += 1
+            self._counters[("queue_seconds_total", labels)] += span.queue_time
+            self._counters[("retries_total", labels)] += span.retries
+            self._counters[("bytes_total", labels + (("direction", "in"),))] += span.bytes_in
+            self._counters[("bytes_total", labels + (("direction", "out"),))] += span.bytes_out
+            self._counters[("tokens_total", labels + (("direction", "input"),))] += span.input_tokens
+            self._counters[("tokens_total", labels + (("direction", "output"),))] += span.output_tokens
+
+    @staticmethod
+    def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+        return ",".join(f'{key}="{value}"' for key, value in labels)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        prefix = self.namespace
+        lines = [f"# TYPE {prefix}_span_seconds histogram"]
+        with self._lock:
+            for (kind, name), histogram in sorted(self._histograms.items()):
+                labels = self._labels((("kind", kind), ("name", name)))
+                for bound, count in zip(self.BUCKETS, histogram):
+                    lines.append(f'{prefix}_span_seconds_bucket{{{labels},le="{bound}"}} {count:g}')
+                lines.append(f'{prefix}_span_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]:g}')
+                lines.append(f"{prefix}_span_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"{prefix}_span_seconds_count{{{labels}}} {histogram[-1]:g}")
+
+            declared = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric not in declared:
+                    lines.append(f"# TYPE {prefix}_{metric} counter")
+                    declared.add(metric)
+                lines.append(f"{prefix}_{metric}{{{self._labels(labels)}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+class JsonlSink:
+    """Appends each span as one JSON line to `path`."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        line = json.dumps(asdict(span))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _sinks_from_env() -> List[Sink]:
+    factories = {
+        "memory": MemorySink,
+        "prometheus": PrometheusSink,
+        "jsonl": lambda: JsonlSink(os.getenv("METRICS_JSONL_PATH", ".langgraph-data/metrics.jsonl")),
+    }
+    names = [name.strip().lower() for name in os.getenv("METRICS_SINKS", "").split(",") if name.strip()]
+    return [factories[name]() for name in names]
+
+
+_sinks: List[Sink] = _sinks_from_env()
+_current: ContextVar[Optional[Span]] = ContextVar("metrics_span", default=None)
+
+
+def set_sinks(*sinks: Sink) -> None:
+    """Replace the registered sinks; call with no arguments to disable instrumentation."""
+    global _sinks
+    _sinks = list(sinks)
+
+
+def get_sinks() -> List[Sink]:
+    return list(_sinks)
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a span; yields None when instrumentation is disabled."""
+    if not _sinks:
+        yield None
+        return
+
+    parent = _current.get()
+    current = Span(kind=kind, name=name, started_at=time.time(), parent=parent.name if parent else None)
+    token = _current.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.wall_time = time.perf_counter() - started
+        _current.reset(token)
+        for sink in _sinks:
+            sink.emit(current)
+
+
+def record(**amounts: float) -> None:
+    """Add `amounts` (e.g. `bytes_in=512`, `retries=1`) to the active span, if any."""
+    current = _current.get()
+    if current is not None:
+        for key, amount in amounts.items():
+            setattr(current, key, getattr(current, key) + amount)
+
+
+def record_usage(message: Any) -> None:
+    """Add a model response's `usage_metadata` token counts to the active span, if any."""
+    usage = getattr(message, "usage_metadata", None)
+    if usage and _current.get() is not None:
+        record(input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def instrument_node(node: F, name: Optional[str] = None) -> F:
+    """Wrap an async graph node so each run is recorded as a "node" span.
+
+    `functools.wraps` keeps the name, signature and return annotation LangGraph
+    reads to name the node, pass it the config and infer its `Command` targets.
+    """
+    name = name or getattr(node, "__name__", type(node).__name__)
+
+    @functools.wraps(node)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _sinks:
+            return await node(*args, **kwargs)
+        with span("node", name):
+            return await node(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,59 @@
+"""Resolve the chat model for each node from the run configuration.
+
+`Configuration.model` and `Configuration.fast_model` name models as
+``provider/model-name``; `GraphConfig.model_name` can force the provider for a
+run. Each node asks for a tier ("fast" for cheap classification and extraction
+calls, "strong" for research and review), and one pooled client is kept per
+(provider, model, temperature).
+"""
+from functools import lru_cache
+from typing import Literal, Optional, Tuple
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig, ensure_config
+from langchain_openai import ChatOpenAI
+
+from my_agent.utils import runnables
+from my_agent.utils.configuration import Configuration
+
+Tier = Literal["fast", "strong"]
+
+# Used when GraphConfig.model_name selects a provider other than the configured one.
+DEFAULT_MODELS = {
+    "openai": {"fast": "gpt-4o-mini", "strong": "gpt-4o"},
+    "anthropic": {"fast": "claude-3-5-haiku-latest", "strong": "claude-3-7-sonnet-latest"},
+}
+
+
+def resolve_model(config: Optional[RunnableConfig], tier: Tier) -> Tuple[str, str, float]:
+    """Return the (provider, model name, temperature) to use for `tier` in this run."""
+    configuration = Configuration.from_runnable_config(config)
+    spec = configuration.fast_model if tier == "fast" else configuration.model
+    provider, _, name = spec.partition("/")
+
+    override = (ensure_config(config).get("configurable") or {}).get("model_name")
+    if override and override != provider:
+        provider, name = override, DEFAULT_MODELS[override][tier]
+    return provider, name, configuration.temperature
+
+
+@lru_cache(maxsize=None)
+def _load_model(provider: str, name: str, temperature: float) -> BaseChatModel:
+    if provider == "openai":
+        # Streamed responses only report token usage when asked to.
+        return ChatOpenAI(model=name, temperature=temperature, stream_usage=True)
+    if provider == "anthropic":
+        return ChatAnthropic(model=name, temperature=temperature)
+    raise ValueError(f"Unsupported model provider: {provider}")
+
+
+def get_model(config: Optional[RunnableConfig], tier: Tier = "strong") -> BaseChatModel:
+    """Return the pooled chat model for `tier` under this run's configuration."""
+    return _load_model(*resolve_model(config, tier))
+
+
+def reset_models() -> None:
+    """Drop pooled clients and the runnables built from them."""
+    _load_model.cache_clear()
+    runnables.invalidate()
@@ -1,21 +1,45 @@
+import asyncio
+from dataclasses import replace
 from functools import lru_cache
-from langchain_anthropic import ChatAnthropic
-from langchain_openai import ChatOpenAI
 from my_agent.utils.tools import tools
-from langgraph.prebuilt import ToolNode
-from my_agent.utils.schemas import USER_SCHEMA, REFLECTION_SCHEMA
-from my_agent.utils.prompts import VALIDATE_INPUT_PROMPT, GENERATE_ITINERARY_PROMPT, REFLECTION_ITINERARY_PROMPT
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.context import build_window, fit_message
+from my_agent.utils.costs import get_fx_rates
+from my_agent.utils.executor import ToolExecutor
+from my_agent.utils.intake import REQUIRED_FIELDS, Prevalidation, prevalidate
+from my_agent.utils.itinerary import has_day_header, parse_day, split_days, validate_day
+from my_agent.utils.itinerary_cache import get_itinerary_cache
+from my_agent.utils.metrics import instrument_node, record_usage
+from my_agent.utils.models import get_model, resolve_model
+from my_agent.utils.prompt_cache import cacheable_system_message, prompt_cache_usage
+from my_agent.utils.review import pre_check_itinerary
+from my_agent.utils.runnables import bind_tools, structured_output
+from my_agent.utils.schemas import USER_SCHEMA, USER_PROFILE_UPDATE_SCHEMA, REFLECTION_SCHEMA, VALIDATION_SCHEMA
+from my_agent.utils.prompts import VALIDATE_INPUT_PROMPT, GENERATE_ITINERARY_PROMPT, GENERATE_ITINERARY_CONTEXT_PROMPT, REFLECTION_ITINERARY_PROMPT, REFLECTION_ITINERARY_CONTEXT_PROMPT
 import datetime 
-from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
+import logging
+import time
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, message_chunk_to_message
+from langgraph.config import get_stream_writer
 import json
 from langgraph.types import interrupt, Command
 from typing import Literal
 from my_agent.utils.state import State
 
+logger = logging.getLogger(__name__)
 
-model = ChatOpenAI(temperature=0.5, model_name="gpt-4o-mini")
 
-def validate_user_response(state: State, config) -> Command[Literal['__end__', 'update_user_profile']]:
+def _prevalidate(state: State, config) -> Prevalidation:
+    configuration = Configuration.from_runnable_config(config)
+    if not configuration.prevalidate_user_response:
+        return Prevalidation(missing=list(REQUIRED_FIELDS))
+    return prevalidate(state.messages)
+
+async def _check_user_response(state: State, config, prevalidation: Prevalidation) -> dict:
+    # Destination, budget and days were all found in the text, so the query is valid.
+    if prevalidation.is_valid:
+        return {"is_valid": True}
+
     messages = state.messages
 
     system_prompt = VALIDATE_INPUT_PROMPT.format(
@@ -23,33 +47,10 @@ def validate_user_response(state: State, config) -> Command[Literal['__end__', '
     )
 
     messages = [{"role": "system", "content": system_prompt}] + messages
-    model_json = model.with_structured_output({
-            "$schema": "https://json-schema.org/draft/2020-12/schema",
-            "title": "validation_validation_schema",
-            "$id": "https://example.com/product.schema.json",
-            "type": "object",
-            "properties": {
-                "is_valid": {
-                    "type": "boolean",
-                    "description": "Indicates whether the user query is relevant and has atleast mentioned budget and no of people."
-                },
-                "llm_response": {
-                    "type": "string",
-                    "description": "Response incase the user query is invalid or irrelevant."
-                }
-            },
-
-            "required": ["is_valid"]
-        })
-    response = model_json.invoke(messages)
+    model_json = structured_output(get_model(config, "fast"), VALIDATION_SCHEMA)
+    return await model_json.ainvoke(messages)
 
-    # print(response)
-    if response['is_valid']:
-        return Command(
-            goto="update_user_profile", 
-            update={"is_valid": response['is_valid']}
-        )
-    
+def _reject_user_response(response: dict) -> Command[Literal['__end__']]:
     return Command(
         update={
             'messages': [{"type": "ai", "content": response['llm_response']}]
@@ -57,13 +58,96 @@ def validate_user_response(state: State, config) -> Command[Literal['__end__', '
         goto="__end__"
     )
 
-def update_user_profile(state: State):
+@instrument_node
+async def validate_user_response(state: State, config) -> Command[Literal['__end__', 'update_user_profile']]:
+    prevalidation = _prevalidate(state, config)
+    response = await _check_user_response(state, config, prevalidation)
 
-    llm_json = model.with_structured_output(USER_SCHEMA)
-    response = llm_json.invoke(
-        [{
-            "type": "system",
-            "content": f"""
+    # print(response)
+    if response['is_valid']:
+        return Command(
+            goto="update_user_profile", 
+            update={"is_valid": response['is_valid'], "extracted_fields": prevalidation.fields}
+        )
+
+    return _reject_user_response(response)
+
+@instrument_node
+async def speculative_intake(state: State, config) -> Command[Literal['__end__', 'lookup_cached_itinerary']]:
+    """ Validate the query while profile extraction and prompt optimization run speculatively.
+
+    The speculative results are only kept when validation passes; otherwise the
+    in-flight calls are cancelled and the rejection is returned as usual.
+    """
+    prevalidation = _prevalidate(state, config)
+    state = replace(state, extracted_fields=prevalidation.fields)
+    speculative = [
+        asyncio.create_task(update_user_profile(state, config)),
+        asyncio.create_task(optimize_prompt(state, config)),
+    ]
+    try:
+        response = await _check_user_response(state, config, prevalidation)
+        if not response['is_valid']:
+            return _reject_user_response(response)
+
+        profile, prompt = await asyncio.gather(*speculative)
+    finally:
+        for task in speculative:
+            task.cancel()
+        await asyncio.gather(*speculative, return_exceptions=True)
+
+    return Command(
+        goto="lookup_cached_itinerary",
+        update={"is_valid": response['is_valid'], "extracted_fields": prevalidation.fields, **profile, **prompt}
+    )
+
+def route_intake(state: State, config) -> Literal['validate_user_response', 'speculative_intake']:
+    configurable = config.get("configurable", {})
+    if configurable.get("speculative_intake"):
+        return "speculative_intake"
+    return "validate_user_response"
+
+def _new_profile_messages(state: State) -> tuple[list, int]:
+    """ Messages the profile has not been updated from yet, and the new count of human messages.
+
+    The assistant message right before the first new human message is kept, since
+    the user is often answering it ("What is your budget?" / "About $800").
+    """
+    humans = [i for i, msg in enumerate(state.messages) if isinstance(msg, HumanMessage)]
+    if len(humans) <= state.profile_human_messages:
+        return [], len(humans)
+
+    first = humans[state.profile_human_messages]
+    context = state.messages[first - 1: first] if first and isinstance(state.messages[first - 1], AIMessage) else []
+    new = [msg for msg in state.messages[first:] if isinstance(msg, HumanMessage)]
+    return [msg for msg in context if not msg.tool_calls] + new, len(humans)
+
+@instrument_node
+async def update_user_profile(state: State, config):
+    """ Update the user profile from the human messages added since the last update.
+
+    The first update extracts the full `USER_SCHEMA`; later ones ask only for the
+    fields the new messages change and merge them into the existing profile.
+    """
+    messages, human_count = _new_profile_messages(state)
+    if not messages:
+        return {}
+
+    # Intake already pattern-matched every message before the first update.
+    extracted = state.extracted_fields if not state.user_profile else prevalidate(messages).fields
+    if state.user_profile:
+        llm_json = structured_output(get_model(config, "fast"), USER_PROFILE_UPDATE_SCHEMA)
+        instructions = f"""
+                Here is the current user profile:
+                {json.dumps(state.user_profile)}
+
+                Read the new messages and return ONLY the fields they add or change.
+                Leave out every field the new messages do not mention.
+                Do not make any assumptions and be accurate at ALL TIMES.
+                """
+    else:
+        llm_json = structured_output(get_model(config, "fast"), USER_SCHEMA)
+        instructions = f"""
                 Use the message history to update the user profile. 
                 Do not make any assumptions and be accurate at ALL TIMES.
                 
@@ -72,20 +156,34 @@ def update_user_profile(state: State):
 
                 Use the default values for the fields if the user hasn't provided theirs.
                 Assume all people are adults unless mentioned otherwise.
+                If currency not given, assume currency of destination.
+
+                ALSO RUN THE MOCK USER_UPDATE TOOL YOU HAVE ACCESS TO.
+                """
 
+    response = await llm_json.ainvoke(
+        [{
+            "type": "system",
+            "content": f"""{instructions}
                 Make sure to double check if user info doesn't have any typos.
-                If currency not given, assume currency of destination.
 
-                Today is {datetime.datetime.today().date().isoformat()}
+                These fields were already read from the messages by pattern matching.
+                Keep them unless the messages clearly say otherwise:
+                {json.dumps(extracted)}
 
-                ALSO RUN THE MOCK USER_UPDATE TOOL YOU HAVE ACCESS TO.
+                Today is {datetime.datetime.today().date().isoformat()}
                 """
             }
-        ] + state.messages
+        ] + messages
     )
 
+    # Pattern-matched fields fill anything the model left out.
+    update = {**extracted, **{key: value for key, value in response.items() if value is not None}}
+    profile = {**state.user_profile, **update}
     return {
-        "user_profile": response,
+        "user_profile": profile,
+        "profile_human_messages": human_count,
+        "profile_version": state.profile_version + (profile != state.user_profile),
     }
     
 # Define the function that determines whether to continue or not
@@ -99,8 +197,9 @@ def should_continue(state: State):
     else:
         return "continue"
 
-def optimize_prompt(state: State):
-    response = model.invoke([SystemMessage(
+@instrument_node
+async def optimize_prompt(state: State, config):
+    response = await get_model(config, "fast").ainvoke([SystemMessage(
         content=""""
         Optimize the user's query into a comprehensive search plan for Sri Lankan travel information. Follow these steps:
 
@@ -137,66 +236,238 @@ def optimize_prompt(state: State):
         """
     )] + [msg for msg in state.messages if isinstance(msg, HumanMessage)]
     )
+    record_usage(response)
 
     return {
         "optimized_prompt": response.content
     }
 
-def research_itinerary(state: State):
-    messages = state.messages
-
-    system_prompt = GENERATE_ITINERARY_PROMPT.format(
-        USER_ENHANCED_PROMPT=state.optimized_prompt,
-        CURRENT_ITINERARY=state.itinerary,
-        FEEDBACK=state.itinerary_feedback,
-        TODAY=datetime.datetime.today().date()
+@instrument_node
+async def lookup_cached_itinerary(state: State, config) -> Command[Literal['__end__', 'research_itinerary']]:
+    """ Answer from the semantic itinerary cache when a near-identical trip was planned recently."""
+    configuration = Configuration.from_runnable_config(config)
+    # Each request gets a fresh loop budget, even in a thread with earlier requests.
+    research = Command(
+        goto="research_itinerary",
+        update={"research_started_at": time.time(), "research_input_tokens": 0, "iteration_counter": 0},
     )
+    cache = get_itinerary_cache(configuration) if configuration.itinerary_cache_enabled else None
+    if cache is None:
+        return research
+
+    try:
+        cached = await cache.lookup(state.user_profile, state.optimized_prompt)
+    except Exception:
+        # An unreachable embedding API must not stop the run; plan the trip from scratch.
+        logger.warning("Itinerary cache lookup failed; treating it as a miss", exc_info=True)
+        cached = None
+    if cached is None:
+        return research
 
-    model_tools = model.bind_tools(tools)
+    return Command(
+        goto="__end__",
+        update={"messages": [AIMessage(content=cached.itinerary)]}
+    )
 
-    messages = [{
-        "role": "system", "content": system_prompt
-        }] + messages
-    response = model_tools.invoke(messages)
+def _itinerary_day_id(message_id: str, day_number: int) -> str:
+    return f"{message_id}-day-{day_number}"
 
-    return {"messages": [response]}
+def _itinerary_day_event(day: dict, message_id: str) -> dict:
+    errors = validate_day(day)
+    # Shaped as a UI message so the frontend's uiMessageReducer can render it.
+    return {
+        "type": "ui",
+        "id": _itinerary_day_id(message_id, day["day_number"]),
+        "name": "itinerary_day",
+        "props": {"day": day, "valid": not errors, "errors": errors},
+        "metadata": {"message_id": message_id},
+    }
 
-def review_itinerary(
-    state: State
-) -> Command[Literal['__end__', 'research_itinerary']]:
-    """ Reflect on the web search agent output and return feedback."""
+def _retract_itinerary_days(writer, message_id: str, day_numbers) -> None:
+    """ Remove days already pushed to the UI, e.g. from a draft the reviewer rejected."""
+    for number in dict.fromkeys(day_numbers):
+        writer({"type": "remove-ui", "id": _itinerary_day_id(message_id, number)})
+
+async def _stream_itinerary_days(model_tools, messages) -> AIMessage:
+    """ Stream the draft and emit each day as a custom stream event once it is complete.
+
+    A day is complete when the next "Day N" header arrives, or when the stream ends.
+    Headers are only looked for in newly completed lines, and the draft is only
+    split again when one is found. Days of a message that ends in tool calls are
+    retracted, since it is not a draft.
+    """
+    writer = get_stream_writer()
+    aggregate = None
+    text = ""
+    # Start of the first line not yet checked for a day header.
+    checked = 0
+    emitted = []
+    async for chunk in model_tools.astream(messages):
+        aggregate = chunk if aggregate is None else aggregate + chunk
+        text += chunk.text()
+        complete = text.rfind("\n") + 1
+        if complete <= checked:
+            continue
+        found = has_day_header(text[checked:complete])
+        checked = complete
+        if found:
+            for number, section in split_days(text[:complete])[len(emitted):-1]:
+                writer(_itinerary_day_event(parse_day(number, section), aggregate.id))
+                emitted.append(number)
+
+    if aggregate is None:
+        # Nothing was streamed; ask again without streaming.
+        return await model_tools.ainvoke(messages)
+    if aggregate.tool_call_chunks:
+        _retract_itinerary_days(writer, aggregate.id, emitted)
+    else:
+        for number, section in split_days(text)[len(emitted):]:
+            writer(_itinerary_day_event(parse_day(number, section), aggregate.id))
+    return message_chunk_to_message(aggregate)
+
+@instrument_node
+async def research_itinerary(state: State, config):
+    configuration = Configuration.from_runnable_config(config)
+    messages = build_window(
+        state.messages,
+        max_tokens=configuration.context_budget("research_itinerary"),
+        keep_last_turns=configuration.context_keep_last_turns,
+    )
 
-    llm_json = model.with_structured_output(
-        REFLECTION_SCHEMA
+    provider, _, _ = resolve_model(config, "strong")
+    system_prompt = cacheable_system_message(
+        GENERATE_ITINERARY_PROMPT,
+        GENERATE_ITINERARY_CONTEXT_PROMPT.format(
+            USER_ENHANCED_PROMPT=state.optimized_prompt,
+            CURRENT_ITINERARY=state.itinerary,
+            FEEDBACK=state.itinerary_feedback,
+            TODAY=datetime.datetime.today().date()
+        ),
+        provider,
     )
 
-    response = llm_json.invoke(
+    model_tools = bind_tools(get_model(config, "strong"), tools)
+
+    messages = [system_prompt] + messages
+    if configuration.stream_itinerary_days:
+        response = await _stream_itinerary_days(model_tools, messages)
+    else:
+        response = await model_tools.ainvoke(messages)
+    record_usage(response)
+
+    usage = prompt_cache_usage(response)
+    return {
+        "messages": [response],
+        "prompt_cache_usage": usage,
+        "research_input_tokens": state.research_input_tokens + usage["input_tokens"],
+    }
+
+def _loop_budget_spent(state: State, configuration: Configuration, input_tokens: int) -> bool:
+    if state.iteration_counter >= configuration.review_max_iterations:
+        return True
+    if configuration.review_time_budget is not None and state.research_started_at:
+        if time.time() - state.research_started_at >= configuration.review_time_budget:
+            return True
+    if configuration.review_token_budget is not None:
+        return input_tokens >= configuration.review_token_budget
+    return False
+
+async def _llm_review(state: State, config, configuration: Configuration, warnings: str) -> tuple[dict, dict]:
+    provider, _, _ = resolve_model(config, "strong")
+    # include_raw keeps the AIMessage so its cached-token usage can be reported.
+    llm_json = structured_output(get_model(config, "strong"), REFLECTION_SCHEMA, include_raw=True)
+
+    result = await llm_json.ainvoke(
         [
-            SystemMessage(
-                content=REFLECTION_ITINERARY_PROMPT.format(
+            cacheable_system_message(
+                REFLECTION_ITINERARY_PROMPT,
+                REFLECTION_ITINERARY_CONTEXT_PROMPT.format(
                     USER_ENHANCED_PROMPT=state.optimized_prompt,
-                    PREVIOUS_FEEDBACK=state.itinerary_feedback
-            )), 
-            state.messages[-1]
+                    PREVIOUS_FEEDBACK=state.itinerary_feedback,
+                    PRE_CHECK=warnings or "Nothing.",
+                ),
+                provider,
+            ),
+            fit_message(state.messages[-1], configuration.context_budget("review_itinerary"))
         ]
     )
+    if result['parsing_error']:
+        raise result['parsing_error']
+    record_usage(result['raw'])
+    return result['parsed'], prompt_cache_usage(result['raw'])
+
+async def _store_itinerary(configuration: Configuration, state: State, draft: str) -> None:
+    cache = get_itinerary_cache(configuration)
+    if cache is None:
+        return
+    try:
+        await cache.store(state.user_profile, state.optimized_prompt, draft)
+    except Exception:
+        # The draft is already accepted; failing to cache it must not fail the run.
+        logger.warning("Could not store the itinerary in the cache", exc_info=True)
+
+@instrument_node
+async def review_itinerary(
+    state: State,
+    config
+) -> Command[Literal['__end__', 'research_itinerary']]:
+    """ Reflect on the web search agent output and return feedback.
+
+    The rule-based pre-check settles clear passes and failures; the LLM reviewer
+    only runs when the rules find nothing wrong but cannot vouch for the draft.
+    """
+
+    configuration = Configuration.from_runnable_config(config)
+    draft = state.messages[-1].text()
+    usage = {}
+    itinerary = state.itinerary
+
+    if configuration.review_precheck_enabled:
+        check = pre_check_itinerary(
+            draft,
+            state.user_profile,
+            configuration.review_budget_tolerance,
+            get_fx_rates(configuration),
+            configuration.budget_basis,
+        )
+        itinerary = {"days": check.days}
+        if check.verdict == "pass":
+            response = {"is_satisfactory": True, "feedback": ""}
+        elif check.verdict == "fail":
+            response = {"is_satisfactory": False, "feedback": check.feedback}
+        else:
+            response, usage = await _llm_review(state, config, configuration, check.feedback)
+    else:
+        response, usage = await _llm_review(state, config, configuration, "")
 
     counter = state.iteration_counter
+    spent = state.research_input_tokens + usage.get("input_tokens", 0)
+
+    if response['is_satisfactory'] and configuration.itinerary_cache_enabled:
+        await _store_itinerary(configuration, state, draft)
 
-    if response['is_satisfactory'] or counter >= 2:
+    if response['is_satisfactory'] or _loop_budget_spent(state, configuration, spent):
         return Command(
-            goto='__end__'
+            goto='__end__',
+            update={"itinerary": itinerary, "prompt_cache_usage": usage, "research_input_tokens": spent}
         )
     else:
+        if configuration.stream_itinerary_days:
+            _retract_itinerary_days(
+                get_stream_writer(), state.messages[-1].id, [number for number, _ in split_days(draft)]
+            )
         return Command(
             goto='research_itinerary',
             update={
+                "itinerary": itinerary,
                 "itinerary_feedback": response['feedback'],
                 "iteration_counter": counter + 1,
-                "messages": [AIMessage(content=f'FEEDBACK based on last itinerary: {response['feedback']}')]
+                "messages": [AIMessage(content=f'FEEDBACK based on last itinerary: {response['feedback']}')],
+                "prompt_cache_usage": usage,
+                "research_input_tokens": spent,
             }
         )
 
 # Define the function to execute tools
-tool_node = ToolNode(tools)
+tool_node = instrument_node(ToolExecutor(tools), name="tool_node")
 # user_tool_node = ToolNode(update_user_tool)
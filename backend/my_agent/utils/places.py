@@ -0,0 +1,360 @@
+"""Local on-disk index of the places the research loop has already looked up.
+
+Itineraries keep returning to the same few hundred Sri Lankan attractions and
+restaurants, and every run used to rediscover them through Google Places and
+TripAdvisor. Every place in those tools' responses is now upserted into a
+SQLite index. It holds names and aliases, address, coordinates with a geohash,
+rating, price level, photo references, and the Google and TripAdvisor ids.
+Records from both providers for the same place are merged.
+
+`search` answers free-text queries over names, aliases, addresses and place
+types through an FTS5 table (or LIKE when SQLite lacks FTS5), and `near` finds places around a coordinate by geohash prefix.
+Async callers use `asearch`/`aingest`, which run the SQLite work in a worker
+thread, as the response cache does.
+The `lookup_places` tool reads from here first and only calls the APIs on a
+miss or when the match is older than `place_index_max_age`.
+"""
+import asyncio
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from my_agent.utils.configuration import Configuration
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Query words that carry no place information and would make an AND match fail.
+_STOPWORDS = {"in", "at", "near", "a", "an", "and", "the", "of", "best", "top", "sri", "lanka"}
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 8) -> str:
+    """Standard base32 geohash of a coordinate."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits, value, even, out = 0, 0, True, []
+    while len(out) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(out)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+def _normalize_name(name: str) -> str:
+    return " ".join(re.findall(r"\w+", name.lower()))
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _from_google_places(payload: dict, arguments: dict) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": (place.get("displayName") or {}).get("text"),
+            "address": place.get("formattedAddress"),
+            "latitude": (place.get("location") or {}).get("latitude"),
+            "longitude": (place.get("location") or {}).get("longitude"),
+            "rating": place.get("rating"),
+            "rating_count": place.get("userRatingCount"),
+            "price_level": place.get("priceLevel"),
+            "website": place.get("websiteUri"),
+            "types": place.get("types", []),
+            "photos": [photo.get("name") for photo in place.get("photos", []) if photo.get("name")],
+            "google_place_id": place.get("id"),
+        }
+        for place in payload.get("places", [])
+    ]
+
+
+def _from_tripadvisor_search(payload: dict, arguments: dict) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": location.get("name"),
+            "address": (location.get("address_obj") or {}).get("address_string"),
+            "tripadvisor_location_id": location.get("location_id"),
+        }
+        for location in payload.get("data", [])
+        if location.get("location_id")
+    ]
+
+
+def _from_tripadvisor_details(payload: dict, arguments: dict) -> List[Dict[str, Any]]:
+    if not payload.get("location_id") or not payload.get("name"):
+        return []
+    return [{
+        "name": payload.get("name"),
+        "address": (payload.get("address_obj") or {}).get("address_string"),
+        "latitude": _float(payload.get("latitude")),
+        "longitude": _float(payload.get("longitude")),
+        "rating": _float(payload.get("rating")),
+        "rating_count": int(_float(payload.get("num_reviews")) or 0) or None,
+        "price_level": payload.get("price_level"),
+        "website": payload.get("website") or payload.get("web_url"),
+        "types": [cuisine.get("localized_name") for cuisine in payload.get("cuisine", []) if cuisine.get("localized_name")],
+        "tripadvisor_location_id": str(payload["location_id"]),
+    }]
+
+
+def _from_tripadvisor_photos(payload: dict, arguments: dict) -> List[Dict[str, Any]]:
+    photos = [
+        ((photo.get("images") or {}).get("large") or {}).get("url")
+        for photo in payload.get("data", [])
+    ]
+    if not arguments.get("location_id") or not any(photos):
+        return []
+    return [{"tripadvisor_location_id": str(arguments["location_id"]), "photos": [p for p in photos if p]}]
+
+
+EXTRACTORS = {
+    "query_google_places": _from_google_places,
+    "tripadvisor_location_search": _from_tripadvisor_search,
+    "tripadvisor_location_details": _from_tripadvisor_details,
+    "tripadvisor_location_photos": _from_tripadvisor_photos,
+}
+
+_COLUMNS = (
+    "name", "aliases", "address", "latitude", "longitude", "geohash", "rating", "rating_count",
+    "price_level", "website", "types", "photos", "google_place_id", "tripadvisor_location_id", "updated_at",
+)
+_LISTS = ("aliases", "types", "photos")
+
+
+class PlaceIndex:
+    """SQLite place table plus an FTS5 index over names, aliases and addresses."""
+
+    def __init__(self, path: Optional[str] = None):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS places (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    normalized_name TEXT NOT NULL,
+                    aliases TEXT NOT NULL DEFAULT '[]',
+                    address TEXT,
+                    latitude REAL,
+                    longitude REAL,
+                    geohash TEXT,
+                    rating REAL,
+                    rating_count INTEGER,
+                    price_level TEXT,
+                    website TEXT,
+                    types TEXT NOT NULL DEFAULT '[]',
+                    photos TEXT NOT NULL DEFAULT '[]',
+                    google_place_id TEXT UNIQUE,
+                    tripadvisor_location_id TEXT UNIQUE,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS places_geohash ON places (geohash)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS places_name ON places (normalized_name)")
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+                    "name, aliases, address, types, tokenize='unicode61 remove_diacritics 2')"
+                )
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5.
+                self.fts = False
+
+    def _find(self, place: Dict[str, Any]) -> Optional[sqlite3.Row]:
+        for column in ("google_place_id", "tripadvisor_location_id"):
+            if place.get(column):
+                row = self._conn.execute(f"SELECT * FROM places WHERE {column} = ?", (str(place[column]),)).fetchone()
+                if row:
+                    return row
+        if not place.get("name"):
+            return None
+
+        # Same name, and either one side has no coordinates or both are within ~5 km.
+        for row in self._conn.execute(
+                "SELECT * FROM places WHERE normalized_name = ?", (_normalize_name(place["name"]),)
+        ):
+            if place.get("geohash") is None or row["geohash"] is None or row["geohash"][:5] == place["geohash"][:5]:
+                return row
+        return None
+
+    def _upsert(self, place: Dict[str, Any], now: float) -> Optional[int]:
+        if place.get("latitude") is not None and place.get("longitude") is not None:
+            place["geohash"] = geohash_encode(place["latitude"], place["longitude"])
+        existing = self._find(place)
+        if existing is None and not place.get("name"):
+            return None
+
+        merged: Dict[str, Any] = {column: existing[column] for column in _COLUMNS} if existing else {}
+        for column in _LISTS:
+            merged[column] = json.loads(merged[column]) if existing else []
+        for column, value in place.items():
+            if column in _LISTS:
+                merged[column] = list(dict.fromkeys(merged[column] + [v for v in value if v]))
+            elif value is not None:
+                merged[column] = str(value) if column.endswith("_id") else value
+        # A second provider's spelling of the name is kept as an alias.
+        if existing and place.get("name") and _normalize_name(place["name"]) != _normalize_name(existing["name"]):
+            merged["name"] = existing["name"]
+            merged["aliases"] = list(dict.fromkeys(merged["aliases"] + [place["name"]]))
+        merged["updated_at"] = now
+
+        values = {column: merged.get(column) for column in _COLUMNS}
+        for column in _LISTS:
+            values[column] = json.dumps(values[column])
+        values["normalized_name"] = _normalize_name(values["name"])
+        columns = list(values)
+        if existing:
+            place_id = existing["id"]
+            self._conn.execute(
+                f"UPDATE places SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                [values[c] for c in columns] + [place_id],
+            )
+        else:
+            place_id = self._conn.execute(
+                f"INSERT INTO places ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [values[c] for c in columns],
+            ).lastrowid
+        if self.fts:
+            self._conn.execute("DELETE FROM places_fts WHERE rowid = ?", (place_id,))
+            self._conn.execute(
+                "INSERT INTO places_fts (rowid, name, aliases, address, types) VALUES (?, ?, ?, ?, ?)",
+                (
+                    place_id,
+                    values["name"],
+                    " ".join(json.loads(values["aliases"])),
+                    values["address"] or "",
+                    " ".join(json.loads(values["types"])).replace("_", " "),
+                ),
+            )
+        return place_id
+
+    def ingest(self, tool: str, arguments: dict, payload: Any) -> List[Dict[str, Any]]:
+        """Upsert every place in a tool response and return the stored records."""
+        extractor = EXTRACTORS.get(tool)
+        if extractor is None or not isinstance(payload, dict):
+            return []
+        places = extractor(payload, arguments)
+
+        now = time.time()
+        with self._lock, self._conn:
+            ids = [self._upsert(dict(place), now) for place in places]
+        return self.get([place_id for place_id in ids if place_id is not None])
+
+    async def aingest(self, tool: str, arguments: dict, payload: Any) -> List[Dict[str, Any]]:
+        """`ingest` for async callers, run in a worker thread so the transaction never blocks the loop."""
+        return await asyncio.to_thread(self.ingest, tool, arguments, payload)
+
+    def get(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM places WHERE id IN ({', '.join('?' for _ in ids)})", ids
+            ).fetchall()
+        by_id = {row["id"]: self._record(row) for row in rows}
+        return [by_id[place_id] for place_id in ids if place_id in by_id]
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = {column: row[column] for column in _COLUMNS}
+        for column in _LISTS:
+            record[column] = json.loads(record[column])
+        return record
+
+    def search(self, query: str, limit: int = 5, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Places matching every significant word of `query`, best match first."""
+        # Terms are matched as prefixes, so dropping a plural "s" lets "restaurants" match "restaurant".
+        terms = [
+            term[:-1] if len(term) > 3 and term.endswith("s") else term
+            for term in re.findall(r"\w+", query.lower())
+            if term not in _STOPWORDS
+        ]
+        if not terms:
+            return []
+        cutoff = time.time() - max_age if max_age is not None else 0.0
+        with self._lock:
+            if self.fts:
+                rows = self._conn.execute(
+                    "SELECT places.* FROM places_fts JOIN places ON places.id = places_fts.rowid "
+                    "WHERE places_fts MATCH ? AND places.updated_at >= ? "
+                    "ORDER BY bm25(places_fts, 10.0, 5.0, 1.0, 1.0) LIMIT ?",
+                    (" ".join(f'"{term}"*' for term in terms), cutoff, limit),
+                ).fetchall()
+            else:
+                text = "(name || ' ' || aliases || ' ' || coalesce(address, '') || ' ' || types)"
+                rows = self._conn.execute(
+                    f"SELECT * FROM places WHERE {' AND '.join(f'{text} LIKE ?' for _ in terms)} "
+                    "AND updated_at >= ? ORDER BY rating_count DESC LIMIT ?",
+                    [f"%{term}%" for term in terms] + [cutoff, limit],
+                ).fetchall()
+        return [self._record(row) for row in rows]
+
+    async def asearch(self, query: str, limit: int = 5, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """`search` for async callers, run in a worker thread."""
+        return await asyncio.to_thread(self.search, query, limit, max_age)
+
+    def near(self, latitude: float, longitude: float, radius_km: float = 5.0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Places within `radius_km` of a coordinate, nearest first."""
+        # Geohash cell widths: 5 chars ~4.9 km, 4 ~39 km, 3 ~156 km.
+        precision = 5 if radius_km <= 2.5 else 4 if radius_km <= 20 else 3
+        prefix = geohash_encode(latitude, longitude, precision)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM places WHERE geohash IS NOT NULL AND (geohash LIKE ? OR "
+                "abs(latitude - ?) <= ? AND abs(longitude - ?) <= ?)",
+                (prefix + "%", latitude, radius_km / 111.0, longitude, radius_km / 100.0),
+            ).fetchall()
+        scored = [
+            (haversine_km(latitude, longitude, row["latitude"], row["longitude"]), self._record(row))
+            for row in rows
+        ]
+        return [record for distance, record in sorted(scored, key=lambda pair: pair[0]) if distance <= radius_km][:limit]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM places").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_index: Optional[PlaceIndex] = None
+
+
+def get_place_index(configuration: Configuration) -> PlaceIndex:
+    """Return the process-wide place index, opening it from `configuration` on first use."""
+    global _index
+    if _index is None:
+        _index = PlaceIndex(configuration.place_index_path)
+    return _index
+
+
+def set_place_index(index: Optional[PlaceIndex]) -> None:
+    """Replace the process-wide place index, e.g. with an in-memory one."""
+    global _index
+    _index = index
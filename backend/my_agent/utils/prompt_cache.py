@@ -0,0 +1,37 @@
+"""Prompt assembly that keeps the large static instructions cacheable.
+
+OpenAI caches identical prompt prefixes automatically and Anthropic caches up to
+an explicit `cache_control` breakpoint, so both only help when the static text
+comes first and is byte-for-byte identical across requests. System prompts are
+therefore built as the static instructions followed by the per-request context,
+with a cache breakpoint after the static part for Anthropic.
+"""
+from typing import Dict
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+
+def cacheable_system_message(static: str, dynamic: str, provider: str) -> SystemMessage:
+    """Build a system message with `static` as the cacheable prefix."""
+    if provider == "anthropic":
+        return SystemMessage(content=[
+            {"type": "text", "text": static, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": dynamic},
+        ])
+    return SystemMessage(content=static + dynamic)
+
+
+def prompt_cache_usage(message: BaseMessage) -> Dict[str, int]:
+    """Read input and cached-token counts from a model response's usage metadata."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "cache_read_tokens": details.get("cache_read", 0),
+        "cache_creation_tokens": details.get("cache_creation", 0),
+    }
+
+
+def add_usage(left: Dict[str, int], right: Dict[str, int]) -> Dict[str, int]:
+    """State reducer summing token counters across nodes and iterations."""
+    return {key: left.get(key, 0) + right.get(key, 0) for key in {**left, **right}}
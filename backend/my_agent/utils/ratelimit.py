@@ -0,0 +1,161 @@
+"""Client-side token buckets per API provider and key.
+
+The executor's semaphores cap how many calls run at once, but not how many are
+sent per second, and every worker process has its own. Here each
+(provider, API key) pair gets a token bucket refilled at the provider's
+configured rate. Callers wait for a token instead of failing with a 429.
+
+Buckets hand out reservations. Each caller takes the next token at arrival,
+letting the balance go negative, and sleeps until that token is due. Callers
+are therefore served in arrival order, and a burst cannot starve earlier
+waiters. With `rate_limit_backend="sqlite"` the balance lives in a shared SQLite
+file, so every worker on the host draws from the same bucket.
+"""
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from my_agent.utils import metrics
+from my_agent.utils.configuration import Configuration
+
+
+class RateLimitTimeout(Exception):
+    """Raised when the wait for a token would exceed `rate_limit_max_wait`."""
+
+
+class TokenBucket:
+    """In-process bucket holding up to `burst` tokens, refilled at `rate` per second."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take the next token and return the seconds until it is due."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self) -> None:
+        """Return a reserved token that was not used."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose balance is shared through a SQLite file across processes."""
+
+    def __init__(self, path: str, key: str, rate: float, burst: float):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def _update(self, delta: float) -> float:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so concurrent processes serialize here.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (self.key,)).fetchone()
+                tokens, updated = row if row else (self.burst, now)
+                tokens = min(self.burst, tokens + max(now - updated, 0.0) * self.rate) + delta
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (self.key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return tokens
+
+    def reserve(self) -> float:
+        return max(0.0, -self._update(-1) / self.rate)
+
+    def refund(self) -> None:
+        self._update(1)
+
+
+class RateLimiter:
+    """Hands out tokens from one bucket per (provider, API key)."""
+
+    def __init__(self, configuration: Configuration):
+        self.limits = configuration.rate_limits
+        self.backend = configuration.rate_limit_backend
+        self.path = configuration.rate_limit_path
+        self.max_wait = configuration.rate_limit_max_wait
+        self._buckets: Dict[Tuple[str, str], "TokenBucket | SQLiteTokenBucket"] = {}
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "delayed": 0, "waited_seconds": 0.0}
+
+    def _bucket(self, provider: str, api_key: Optional[str]):
+        # Keys are hashed so they never end up in the SQLite file.
+        key = (provider, hashlib.sha256((api_key or "").encode()).hexdigest()[:16])
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                limit = self.limits[provider]
+                if self.backend == "sqlite":
+                    bucket = SQLiteTokenBucket(self.path, ":".join(key), limit["rate"], limit["burst"])
+                else:
+                    bucket = TokenBucket(limit["rate"], limit["burst"])
+                self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, provider: str, api_key: Optional[str] = None) -> None:
+        """Wait, in arrival order, until a request to `provider` may be sent."""
+        if provider not in self.limits:
+            return
+        bucket = self._bucket(provider, api_key)
+        if self.backend == "sqlite":
+            wait = await asyncio.to_thread(bucket.reserve)
+        else:
+            wait = bucket.reserve()
+
+        if self.max_wait is not None and wait > self.max_wait:
+            bucket.refund()
+            raise RateLimitTimeout(f"{provider} rate limit: next slot in {wait:.1f}s")
+
+        self.stats["acquired"] += 1
+        if wait > 0:
+            self.stats["delayed"] += 1
+            self.stats["waited_seconds"] += wait
+            metrics.record(queue_time=wait)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.refund()
+                raise
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter(configuration: Configuration) -> RateLimiter:
+    """Return the process-wide rate limiter, creating it from `configuration` on first use."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(configuration)
+    return _limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Replace the process-wide rate limiter, e.g. with one using different limits."""
+    global _limiter
+    _limiter = limiter
@@ -0,0 +1,216 @@
+"""Retries, backoff, circuit breaking and fallbacks for the external travel APIs.
+
+Every upstream call made by `tools.py` (through `request_json`, or the Tavily
+and Exa SDK clients) goes through `call_with_retries`:
+
+- Each attempt has connect and read timeouts (see `http_timeout`).
+- Timeouts, connection errors and 408/425/429/5xx responses are retried with
+  full-jitter exponential backoff. A `Retry-After` header takes precedence
+  over the computed delay; one longer than `http_backoff_max` is not waited out.
+- A circuit breaker per host opens after `circuit_failure_threshold`
+  consecutive retryable failures. While it is open, calls fail immediately
+  with `CircuitOpenError`. After `circuit_reset_timeout` seconds one probe call
+  is let through (half-open): success closes the circuit, failure reopens it.
+
+When a tool still fails, `with_fallback` hands the same arguments to an
+alternative source (e.g. Exa for Tavily). Because `request_json` takes a plain
+URL, all of this can be exercised against a local fake HTTP server.
+"""
+import asyncio
+import email.utils
+import functools
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import aiohttp
+
+from my_agent.utils import metrics
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.ratelimit import get_rate_limiter
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} is failing; circuit open for another {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise `CircuitOpenError` unless a call may go through now."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+        raise CircuitOpenError(self.host, retry_in)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """Give up a half-open probe slot without a verdict, e.g. when the call was cancelled."""
+        self._probing = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(host: str, configuration: Configuration) -> CircuitBreaker:
+    """Return the process-wide breaker for `host`, created from `configuration` on first use."""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(
+            host, configuration.circuit_failure_threshold, configuration.circuit_reset_timeout
+        )
+    return breaker
+
+
+def reset_breakers() -> None:
+    _breakers.clear()
+
+
+def http_timeout(configuration: Configuration) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(
+        sock_connect=configuration.http_connect_timeout,
+        sock_read=configuration.http_read_timeout,
+    )
+
+
+def _status(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, aiohttp.ClientConnectionError)):
+        return True
+    return _status(error) in RETRYABLE_STATUSES
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by the `Retry-After` header of a failed response, if any."""
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        # Malformed header: fall back to the computed backoff.
+        return None
+    return max(when.timestamp() - time.time(), 0.0) if when else None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, requested: Optional[float] = None) -> Optional[float]:
+    """Full-jitter exponential delay before retry `attempt`; None if `Retry-After` exceeds `cap`."""
+    if requested is not None:
+        return requested if requested <= cap else None
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def call_with_retries(
+        host: str,
+        attempt: Callable[[], Awaitable[T]],
+        configuration: Configuration,
+        rate_limit: Optional[Tuple[str, Optional[str]]] = None
+) -> T:
+    """Run `attempt` behind the breaker for `host`, retrying transient failures.
+
+    With `rate_limit=(provider, api_key)`, every attempt first waits for a token
+    from that provider's bucket (see `my_agent.utils.ratelimit`).
+    """
+    breaker = get_breaker(host, configuration)
+    for number in range(configuration.http_max_retries + 1):
+        if rate_limit is not None:
+            await get_rate_limiter(configuration).acquire(*rate_limit)
+        breaker.before_call()
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                # The host answered, it just rejected this request.
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(
+                number, configuration.http_backoff_base, configuration.http_backoff_max, retry_after(e)
+            )
+            if number == configuration.http_max_retries or delay is None:
+                raise
+            metrics.record(retries=1)
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+    raise AssertionError("unreachable")
+
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def with_fallback(fallback: Callable[..., Awaitable[Any]]) -> Callable[[F], F]:
+    """Call `fallback` with the same arguments when the decorated tool raises.
+
+    The fallback must return the decorated tool's result shape. If it fails
+    too, the original error is raised.
+    """
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as primary:
+                try:
+                    return await fallback(*args, **kwargs)
+                except Exception:
+                    raise primary
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
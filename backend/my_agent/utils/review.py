@@ -0,0 +1,100 @@
+"""Rule-based pre-check for drafted itineraries.
+
+`review_itinerary` used to ask the LLM to review every draft. Most rejections
+are mechanical, though: the wrong number of days, items missing required
+fields, or costs that clearly overshoot the budget. `pre_check_itinerary`
+catches those from the parsed draft and `user_profile` alone:
+
+- "fail": a hard problem; the draft goes back to research with rule feedback.
+- "pass": every rule holds and nothing needs judgement; the draft is accepted.
+- "ambiguous": no hard problem, but something the rules cannot settle (e.g.
+  costs that may be per person, missing prices); the LLM reviewer decides.
+
+The budget rules use the cost bounds from `my_agent.utils.costs`, so a draft is
+only sent to the LLM over its budget when the bounds straddle the limit.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional
+
+from my_agent.utils.costs import CostEstimate, estimate_costs
+from my_agent.utils.itinerary import parse_itinerary, validate_day
+
+
+@dataclass
+class PreCheck:
+    verdict: Literal["fail", "pass", "ambiguous"]
+    days: List[Dict[str, Any]]
+    problems: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    estimated_cost: Optional[float] = None
+    costs: Optional[CostEstimate] = None
+
+    @property
+    def feedback(self) -> str:
+        return " ".join(self.problems + self.warnings)
+
+
+def _money(amount: float, currency: str) -> str:
+    return f"${amount:,.0f}" if currency == "USD" else f"{amount:,.0f} {currency}"
+
+
+def _check_budget(check: PreCheck, costs: CostEstimate, tolerance: float) -> None:
+    verdict = costs.budget_verdict(tolerance)
+    if verdict == "over":
+        days = ", ".join(f"day {number} ({_money(cost, costs.currency)})" for number, cost in costs.expensive_days())
+        check.problems.append(
+            f"The itinerary costs at least {_money(costs.total_low, costs.currency)}, over the budget of "
+            f"{_money(costs.limit, costs.currency)}. The most expensive days are {days}."
+        )
+    elif verdict == "uncertain":
+        if costs.unknown_currencies:
+            reason = f"there is no exchange rate for {', '.join(costs.unknown_currencies)}"
+        elif costs.unpriced and costs.total_high == float("inf"):
+            reason = "some items have no cost: " + ", ".join(f"{name} (day {number})" for number, name in costs.unpriced)
+        else:
+            reason = f"it is unclear which prices are per person for the {costs.people} travellers"
+        check.warnings.append(
+            f"The itinerary costs {_money(costs.total_low, costs.currency)} or more against a budget of "
+            f"{_money(costs.limit, costs.currency)}, but the total cannot be verified: {reason}."
+        )
+
+
+def pre_check_itinerary(
+        text: str,
+        profile: dict,
+        tolerance: float = 0.1,
+        fx_rates: Optional[Dict[str, float]] = None,
+        budget_basis: str = "trip",
+) -> PreCheck:
+    """Check a drafted itinerary against `ITINERARY_SCHEMA` and the user's profile.
+
+    `fx_rates` (units per US dollar, see `my_agent.utils.costs.get_fx_rates`)
+    converts item costs into the budget's currency.
+    """
+    days = parse_itinerary(text)
+    if not days:
+        return PreCheck("ambiguous", days, warnings=["The draft has no recognisable 'Day N' sections."])
+
+    check = PreCheck("pass", days)
+
+    expected = profile.get("number_of_days")
+    numbers = [day["day_number"] for day in days]
+    if expected and sorted(set(numbers)) != list(range(1, expected + 1)):
+        check.problems.append(f"The itinerary covers days {numbers} but the trip is {expected} days long.")
+
+    for day in days:
+        missing = [error for error in validate_day(day) if error.endswith("required")]
+        if missing:
+            check.problems.append(f"Day {day['day_number']} is missing required fields: {', '.join(missing)}.")
+        if not day["attractions"] and not day["dining"]:
+            check.problems.append(f"Day {day['day_number']} has no attractions or dining.")
+
+    check.costs = estimate_costs(days, profile, fx_rates or {"USD": 1.0}, budget_basis)
+    check.estimated_cost = check.costs.total_low
+    _check_budget(check, check.costs, tolerance)
+
+    if check.problems:
+        check.verdict = "fail"
+    elif check.warnings:
+        check.verdict = "ambiguous"
+    return check
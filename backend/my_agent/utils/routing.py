@@ -0,0 +1,180 @@
+"""Deterministic day grouping and visiting order for itinerary stops.
+
+The itinerary prompt asks for attractions and dining that are geographically
+feasible. Left to the model, that was a guess, and the reviewer kept sending
+itineraries back for days that zig-zag across the island. `plan_days` works
+it out from the coordinates the place tools return:
+
+- Distances come from a haversine matrix computed in one vectorized pass.
+- Stops are clustered into days by proximity, using capacitated k-medoids so
+  no day gets more than its share of stops.
+- Days are ordered so that each day starts near where the previous one ended.
+- Stops within a day are ordered with nearest neighbour, then improved by 2-opt.
+
+The result is a proposed day plan that the model fills in with times, dining
+and details.
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_matrix(
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        other_latitudes: Optional[Sequence[float]] = None,
+        other_longitudes: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """Great-circle distances in km between every pair of points (rows: first set, columns: second)."""
+    lat1, lon1 = np.radians(np.asarray(latitudes, dtype=float)), np.radians(np.asarray(longitudes, dtype=float))
+    if other_latitudes is None:
+        lat2, lon2 = lat1, lon1
+    else:
+        lat2 = np.radians(np.asarray(other_latitudes, dtype=float))
+        lon2 = np.radians(np.asarray(other_longitudes, dtype=float))
+    dlat = lat2[None, :] - lat1[:, None]
+    dlon = lon2[None, :] - lon1[:, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1)[:, None] * np.cos(lat2)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _assign(distances: np.ndarray, medoids: np.ndarray, capacity: int) -> np.ndarray:
+    """Assign every point to a medoid, closest pairs first, with at most `capacity` points per medoid."""
+    to_medoid = distances[:, medoids]
+    labels = np.full(len(distances), -1)
+    sizes = np.zeros(len(medoids), dtype=int)
+    for flat in np.argsort(to_medoid, axis=None, kind="stable"):
+        point, cluster = divmod(int(flat), len(medoids))
+        if labels[point] == -1 and sizes[cluster] < capacity:
+            labels[point] = cluster
+            sizes[cluster] += 1
+    return labels
+
+
+def cluster_days(distances: np.ndarray, number_of_days: int, max_iterations: int = 20) -> np.ndarray:
+    """Cluster points into at most `number_of_days` balanced groups of nearby points; returns a label per point."""
+    n = len(distances)
+    k = max(1, min(number_of_days, n))
+
+    # Farthest-point initialisation: start at the most outlying point, then keep
+    # adding the point farthest from every medoid chosen so far. Stops that share
+    # coordinates (a hotel and its restaurant) never get medoids of their own, so
+    # there are at most as many groups as distinct locations.
+    medoids = [int(np.argmax(distances.sum(axis=1)))]
+    while len(medoids) < k:
+        gaps = distances[:, medoids].min(axis=1)
+        farthest = int(np.argmax(gaps))
+        if gaps[farthest] <= 0:
+            break
+        medoids.append(farthest)
+    medoids = np.array(medoids)
+    k = len(medoids)
+    capacity = math.ceil(n / k)
+
+    labels = _assign(distances, medoids, capacity)
+    for _ in range(max_iterations):
+        updated = medoids.copy()
+        for cluster in range(k):
+            members = np.flatnonzero(labels == cluster)
+            if not len(members):
+                # Zero-distance ties can leave a group empty; keep its medoid.
+                continue
+            updated[cluster] = members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+        labels = _assign(distances, medoids, capacity)
+    return labels
+
+
+def order_stops(distances: np.ndarray, start: Optional[int] = None) -> List[int]:
+    """Short open path through every point: nearest neighbour, then 2-opt.
+
+    With `start`, the path begins at that point; otherwise both ends are free.
+    """
+    n = len(distances)
+    if n <= 2:
+        order = list(range(n))
+        return order if start is None or start == 0 else order[::-1]
+
+    current = int(np.argmax(distances.sum(axis=1))) if start is None else start
+    visited = np.zeros(n, dtype=bool)
+    path = [current]
+    visited[current] = True
+    for _ in range(n - 1):
+        current = int(np.argmin(np.where(visited, np.inf, distances[current])))
+        path.append(current)
+        visited[current] = True
+
+    # A dummy node at zero distance from every point turns the open path into
+    # a closed tour, so the standard 2-opt move also covers reversing either end.
+    # With a fixed start only the end gets a dummy, and position 0 never moves.
+    dummy = n
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = distances
+    path = np.array(path + [dummy] if start is not None else [dummy] + path + [dummy])
+    for _ in range(n * n):
+        a, b = path[:-1], path[1:]
+        edges = padded[a, b]
+        delta = padded[np.ix_(a, a)] + padded[np.ix_(b, b)] - edges[:, None] - edges[None, :]
+        delta[np.tril_indices(len(a))] = 0.0
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[i, j] >= -1e-9:
+            break
+        path[i + 1:j + 1] = path[i + 1:j + 1][::-1].copy()
+    return [int(point) for point in path if point != dummy]
+
+
+def plan_days(
+        stops: Sequence[Dict[str, Any]],
+        number_of_days: int,
+        start: Optional[Tuple[float, float]] = None,
+) -> List[Dict[str, Any]]:
+    """Group `stops` (dicts with "latitude" and "longitude") into days and order each day.
+
+    `start` is where the trip begins, e.g. the airport; the first day is the one
+    nearest to it. Returns one entry per day with its stops in visiting order,
+    the leg distances and the day's total travel in km. Days beyond the number
+    of distinct stop locations are returned empty.
+    """
+    if number_of_days < 1:
+        raise ValueError("number_of_days must be at least 1")
+    days: List[Dict[str, Any]] = [
+        {"day_number": number, "stops": [], "legs_km": [], "travel_km": 0.0}
+        for number in range(1, number_of_days + 1)
+    ]
+    if not stops:
+        return days
+
+    latitudes = np.array([stop["latitude"] for stop in stops], dtype=float)
+    longitudes = np.array([stop["longitude"] for stop in stops], dtype=float)
+    distances = haversine_matrix(latitudes, longitudes)
+    labels = cluster_days(distances, number_of_days)
+    clusters = [np.flatnonzero(labels == cluster) for cluster in range(labels.max() + 1)]
+    clusters = [members for members in clusters if len(members)]
+
+    # Order the days as a route through the cluster centres.
+    centres = np.array([[latitudes[members].mean(), longitudes[members].mean()] for members in clusters])
+    centre_distances = haversine_matrix(centres[:, 0], centres[:, 1])
+    first = None
+    if start is not None:
+        first = int(np.argmin(haversine_matrix([start[0]], [start[1]], centres[:, 0], centres[:, 1])[0]))
+    day_order = order_stops(centre_distances, start=first)
+
+    previous = start
+    for day, cluster in zip(days, day_order):
+        members = clusters[cluster]
+        local = distances[np.ix_(members, members)]
+        entry = None
+        if previous is not None:
+            entry = int(np.argmin(haversine_matrix([previous[0]], [previous[1]], latitudes[members], longitudes[members])[0]))
+        order = members[order_stops(local, start=entry)]
+        legs = distances[order[:-1], order[1:]]
+        day["stops"] = [stops[index] for index in order]
+        day["legs_km"] = [round(float(leg), 1) for leg in legs]
+        day["travel_km"] = round(float(legs.sum()), 1)
+        previous = (latitudes[order[-1]], longitudes[order[-1]])
+    return days
@@ -0,0 +1,52 @@
+"""Memoized structured-output and tool-bound runnables.
+
+`with_structured_output` and `bind_tools` convert the schema or every tool
+signature and docstring each time they are called, which the nodes used to do
+on every invocation. The factories below build each runnable once per
+(model, schema) or (model, toolset) and hand back the same instance afterwards.
+"""
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+
+_runnables: Dict[Tuple[int, str, Hashable], Tuple[BaseChatModel, Runnable]] = {}
+_lock = threading.Lock()
+
+
+def _memoize(model: BaseChatModel, kind: str, key: Hashable, build: Callable[[], Runnable]) -> Runnable:
+    cache_key = (id(model), kind, key)
+    with _lock:
+        entry = _runnables.get(cache_key)
+        # Ids are recycled once a model is garbage collected, so check identity.
+        if entry is not None and entry[0] is model:
+            return entry[1]
+
+    runnable = build()
+    with _lock:
+        _runnables[cache_key] = (model, runnable)
+    return runnable
+
+
+def structured_output(model: BaseChatModel, schema: dict, **kwargs: Any) -> Runnable:
+    """Return `model.with_structured_output(schema)`, built once per model and schema."""
+    key = json.dumps([schema, kwargs], sort_keys=True, default=str)
+    return _memoize(model, "structured", key, lambda: model.with_structured_output(schema, **kwargs))
+
+
+def bind_tools(model: BaseChatModel, tools: Sequence[Any], **kwargs: Any) -> Runnable:
+    """Return `model.bind_tools(tools)`, built once per model and toolset."""
+    key = (tuple(id(tool) for tool in tools), json.dumps(kwargs, sort_keys=True, default=str))
+    return _memoize(model, "tools", key, lambda: model.bind_tools(tools, **kwargs))
+
+
+def invalidate(model: Optional[BaseChatModel] = None) -> None:
+    """Drop memoized runnables for `model`, or for every model when omitted."""
+    with _lock:
+        if model is None:
+            _runnables.clear()
+            return
+        for key in [key for key, (owner, _) in _runnables.items() if owner is model]:
+            del _runnables[key]
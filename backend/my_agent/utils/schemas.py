@@ -1,5 +1,23 @@
 """Schemas."""
 
+VALIDATION_SCHEMA = {
+  "$schema": "https://json-schema.org/draft/2020-12/schema",
+  "title": "validation_validation_schema",
+  "$id": "https://example.com/product.schema.json",
+  "type": "object",
+  "properties": {
+    "is_valid": {
+      "type": "boolean",
+      "description": "Indicates whether the user query is relevant and has atleast mentioned budget and no of people."
+    },
+    "llm_response": {
+      "type": "string",
+      "description": "Response incase the user query is invalid or irrelevant."
+    }
+  },
+  "required": ["is_valid"]
+}
+
 REFLECTION_SCHEMA={
   "$schema": "http://json-schema.org/draft-07/schema#",
   "title": "Destination",
@@ -190,3 +208,15 @@ USER_SCHEMA = {
   },
   "required": ["number_of_people", "budget", "number_of_days", "destination"]
 }
+
+# Partial profile update: the `USER_SCHEMA` fields without defaults or required
+# keys, so the model can return only what the latest messages change.
+USER_PROFILE_UPDATE_SCHEMA = {
+  **USER_SCHEMA,
+  "title": "user_profile_update_schema",
+  "properties": {
+    name: {key: value for key, value in prop.items() if key != "default"}
+    for name, prop in USER_SCHEMA["properties"].items()
+  },
+  "required": []
+}
@@ -0,0 +1,61 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+Concurrent graph runs often ask for the same place or search within
+milliseconds of each other, before the first response has reached the response
+cache. `SingleFlight.do` runs the first call for a key as its own task; identical
+calls that arrive while it is in flight await that task instead of going
+upstream again.
+
+Waiters await the shared task through `asyncio.shield`. A cancelled waiter
+therefore only stops waiting; the upstream request keeps running for the
+others, and its result still reaches the cache.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key, per event loop."""
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+        self.stats = {"calls": 0, "upstream": 0, "saved": 0}
+
+    def _forget(self, key: Tuple[int, str], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of `call()`, sharing it with identical calls already in flight."""
+        loop = asyncio.get_running_loop()
+        # Tasks cannot be awaited across event loops, so in-flight calls are per loop.
+        inflight_key = (id(loop), key)
+        self.stats["calls"] += 1
+
+        task = self._inflight.get(inflight_key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(call())
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda done: self._forget(inflight_key, done))
+            self.stats["upstream"] += 1
+        else:
+            self.stats["saved"] += 1
+        return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
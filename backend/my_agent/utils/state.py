@@ -3,6 +3,7 @@ from langchain_core.messages import BaseMessage
 from typing import TypedDict, Annotated, Sequence
 from pydantic import Field
 from dataclasses import dataclass, field
+from my_agent.utils.prompt_cache import add_usage
 
 @dataclass
 class InputState():
@@ -12,8 +13,21 @@ class InputState():
 class State(InputState):
     is_valid: bool = field(default=False)
     user_profile: dict = field(default_factory=dict)
+    # Bumped whenever user_profile changes.
+    profile_version: int = field(default=0)
+    # Human messages already folded into user_profile.
+    profile_human_messages: int = field(default=0)
+    # Trip fields pattern-matched from the human messages; see my_agent.utils.intake.
+    extracted_fields: dict = field(default_factory=dict)
     optimized_prompt: str = field(default="")
     user_accomodation: dict = field(default_factory=dict)
     itinerary: dict = field(default_factory=dict)
     itinerary_feedback: str = field(default="")
     iteration_counter: int = field(default=0)
+    # When the research loop started, for the review time budget.
+    research_started_at: float = field(default=0.0)
+    # Input tokens spent by the current request's research loop, for the review
+    # token budget. Reset with research_started_at, unlike prompt_cache_usage.
+    research_input_tokens: int = field(default=0)
+    # Input and cached prompt-token counts summed over the run.
+    prompt_cache_usage: Annotated[dict, add_usage] = field(default_factory=dict)
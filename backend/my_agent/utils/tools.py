@@ -5,10 +5,13 @@ It includes a basic Tavily search function (as an example)
 These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
+import asyncio
+import functools
 import os
-from typing import Any, Callable, List, Optional, cast
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, cast
 
-import aiohttp
 import requests
 from exa_py import Exa
 from langchain_community.tools import GooglePlacesTool
@@ -18,11 +21,83 @@ from langchain_core.tools import InjectedToolArg, tool
 from tavily import TavilyClient, AsyncTavilyClient
 from typing_extensions import Annotated
 
+from my_agent.utils.cache import cached_tool, get_response_cache, make_key
+from my_agent.utils.compaction import get_full_result_store
 from my_agent.utils.configuration import Configuration
+from my_agent.utils.http import request_json
+from my_agent.utils.places import EXTRACTORS, get_place_index
+from my_agent.utils.resilience import call_with_retries, with_fallback
+from my_agent.utils.routing import plan_days
 
 exa = Exa(api_key=os.environ["EXA_API_KEY"])
 client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
+
+# Fallbacks, used by `with_fallback` once a tool's own retries are exhausted.
+# Each returns the result shape of the tool it stands in for, so compaction and
+# the prompt see the same fields. Where there is no alternative source, the
+# fallback returns an empty result so the research loop can carry on.
+
+def _get(item: Any, name: str) -> Any:
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+async def _unsplash_unavailable(query: str, per_page: int, config: RunnableConfig) -> dict:
+    return {"total": 0, "total_pages": 0, "results": []}
+
+async def _places_from_tripadvisor(query: str, config: RunnableConfig) -> dict:
+    response = await tripadvisor_location_search.__wrapped__(query, config=config)
+    return {"places": [
+        {
+            "id": f"tripadvisor:{location.get('location_id')}",
+            "displayName": {"text": location.get("name")},
+            "formattedAddress": (location.get("address_obj") or {}).get("address_string"),
+        }
+        for location in response.get("data", [])
+    ]}
+
+async def _tripadvisor_from_places(query: str, config: RunnableConfig) -> dict:
+    response = await query_google_places.__wrapped__(query, config=config)
+    return {"data": [
+        {
+            "location_id": None,
+            "name": (place.get("displayName") or {}).get("text"),
+            "address_obj": {"address_string": place.get("formattedAddress")},
+        }
+        for place in response.get("places", [])
+    ]}
+
+async def _tripadvisor_details_unavailable(location_id: int, config: RunnableConfig, language: str = "en") -> dict:
+    return {"location_id": str(location_id)}
+
+async def _tripadvisor_photos_unavailable(
+        location_id: int,
+        config: RunnableConfig,
+        language: str = "en",
+        limit: Optional[int] = None,
+) -> dict:
+    return {"data": []}
+
+async def _search_with_exa(query: str, config: RunnableConfig) -> dict:
+    response = await _exa_search(query, Configuration.from_runnable_config(config))
+    return {"query": query, "results": [
+        {"title": _get(result, "title"), "url": _get(result, "url"), "content": _get(result, "text")}
+        for result in _get(response, "results") or []
+    ]}
+
+async def _search_with_tavily(query: str, config: RunnableConfig) -> dict:
+    response = await _tavily_search(query, Configuration.from_runnable_config(config))
+    return {"results": [
+        {"title": result.get("title"), "url": result.get("url"), "text": result.get("content"), "highlights": []}
+        for result in response.get("results", [])
+    ]}
+
+async def _extract_with_exa(url: str, config: RunnableConfig, extract_depth: str = "advanced") -> dict:
+    urls = [u.strip() for u in url.split(",") if u.strip()]
+    return await _exa_contents(urls, Configuration.from_runnable_config(config))
+
+
+@with_fallback(_unsplash_unavailable)
+@cached_tool(ttl=24 * 3600, credential_fields=["unsplash_api_key"])
 async def search_unsplash_photos(
         query: str,
         per_page: int,
@@ -53,28 +128,27 @@ async def search_unsplash_photos(
     - Returns the first page of results with default sorting.
     - Be mindful of rate limits when making requests to the Unsplash API.
     """
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-
-        # Build URL with query parameters
-        url = "https://api.unsplash.com/search/photos"
-        params = {
-            "query": query,
-            "orientation": "landscape",
-            "per_page": 10,
-            "page":10,
-            "order_by": "latest"
-        }
+    configuration = Configuration.from_runnable_config(config)
 
-        headers = {
-            "Authorization": f"Client-ID {configuration.unsplash_api_key}",
-            "Accept-Version": "v1"
-        }
-        
-        async with session.get(url, headers=headers, params=params) as response:
-            response.raise_for_status()
-            return await response.json()
+    # Build URL with query parameters
+    url = "https://api.unsplash.com/search/photos"
+    params = {
+        "query": query,
+        "orientation": "landscape",
+        "per_page": 10,
+        "page":10,
+        "order_by": "latest"
+    }
 
+    headers = {
+        "Authorization": f"Client-ID {configuration.unsplash_api_key}",
+        "Accept-Version": "v1"
+    }
+
+    return await request_json("GET", url, configuration, rate_limit=("unsplash", configuration.unsplash_api_key), headers=headers, params=params)
+
+@with_fallback(_places_from_tripadvisor)
+@cached_tool(ttl=7 * 24 * 3600, credential_fields=["google_places_api_key"])
 async def query_google_places(
         query: str,
         config: Annotated[RunnableConfig, InjectedToolArg]
@@ -119,26 +193,106 @@ async def query_google_places(
     - The search includes detailed attributes for each place, including user ratings, pricing details, 
       website URLs, and more.
     """  # noqa: D202, D212, D401
-    async with aiohttp.ClientSession() as session:
+    configuration = Configuration.from_runnable_config(config)
+
+    url = "https://places.googleapis.com/v1/places:searchText"
+    headers = {
+        'X-Goog-Api-Key': configuration.google_places_api_key,
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "X-Goog-FieldMask": "places.attributions,places.id,places.displayName,places.googleMapsLinks,places.formattedAddress,places.businessStatus,places.types,places.location,places.internationalPhoneNumber,places.rating,places.priceLevel,places.priceRange,places.websiteUri,places.userRatingCount,places.websiteUri,places.goodForChildren,places.liveMusic,places.paymentOptions,places.servesBeer,places.servesVegetarianFood,places.reviews"
+    }
+    data = {
+        "textQuery": query,
+        "pageSize": 5
+    }
 
-        configuration = Configuration.from_runnable_config(config)
+    return await request_json("POST", url, configuration, rate_limit=("google_places", configuration.google_places_api_key), headers=headers, json=data)
 
-        url = "https://places.googleapis.com/v1/places:searchText"
-        headers = {
-            'X-Goog-Api-Key': configuration.google_places_api_key,
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "X-Goog-FieldMask": "places.attributions,places.id,places.displayName,places.googleMapsLinks,places.formattedAddress,places.businessStatus,places.types,places.location,places.internationalPhoneNumber,places.rating,places.priceLevel,places.priceRange,places.websiteUri,places.userRatingCount,places.websiteUri,places.goodForChildren,places.liveMusic,places.paymentOptions,places.servesBeer,places.servesVegetarianFood,places.reviews"
-        }
-        data = {
-            "textQuery": query,
-            "pageSize": 5
-        }
+async def lookup_places(
+        query: str,
+        config: Annotated[RunnableConfig, InjectedToolArg]
+) -> dict:
+    """Find attractions, restaurants or hotels by name or description.
 
-        async with session.post(url, headers=headers, json=data) as response:
-            response.raise_for_status()
-            return await response.json()         
+    Answers from the local index of places found in earlier research when it has
+    a recent match, and searches Google Places (indexing the results) otherwise.
+
+    Parameters:
+    - query (str): A place name or description, e.g. "Temple of the Tooth Kandy" or "restaurants Ella".
+
+    Returns:
+    - dict: {"source": "index" | "google_places", "places": [...]}, each place with its name, aliases,
+      address, coordinates, rating, price level, types, photo references and Google/TripAdvisor ids.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    if configuration.place_index_enabled:
+        try:
+            places = await get_place_index(configuration).asearch(query, max_age=configuration.place_index_max_age)
+        except sqlite3.Error:
+            places = []
+        if places:
+            return {"source": "index", "places": places}
+
+    response = await query_google_places(query, config=config)
+    places = EXTRACTORS["query_google_places"](response, {"query": query})
+    if configuration.place_index_enabled:
+        try:
+            places = await get_place_index(configuration).aingest("query_google_places", {"query": query}, response)
+        except sqlite3.Error:
+            pass
+    return {"source": "google_places", "places": places}
+
+async def plan_route(
+        places: List[str],
+        number_of_days: int,
+        config: Annotated[RunnableConfig, InjectedToolArg],
+        start: Optional[str] = None,
+) -> dict:
+    """Group places into days by proximity and order each day's visits to minimise travel.
+
+    Call this once the attractions are chosen, and build the daily schedule on the
+    returned plan: which places go on which day, and in what order to visit them.
+
+    Parameters:
+    - places (List[str]): Names of the attractions (and optionally restaurants or hotels) to visit,
+      e.g. ["Sigiriya Rock Fortress", "Temple of the Tooth Kandy"].
+    - number_of_days (int): The number of days of the trip.
+    - start (str, optional): Where the trip starts, e.g. "Bandaranaike International Airport".
+
+    Returns:
+    - dict: {"days": [{"day_number", "stops", "legs_km", "travel_km"}], "total_travel_km": ...,
+      "unresolved": [...]}, where "unresolved" lists the places whose location could not be found.
+    """
+    names = list(dict.fromkeys(places + ([start] if start else [])))
+    lookups = await asyncio.gather(
+        *(lookup_places(name, config=config) for name in names), return_exceptions=True
+    )
+    located: Dict[str, Dict[str, Any]] = {}
+    for name, lookup in zip(names, lookups):
+        if isinstance(lookup, BaseException):
+            continue
+        match = next((place for place in lookup["places"] if place.get("latitude") is not None), None)
+        if match is not None:
+            located[name] = {
+                "name": name,
+                "place": match["name"],
+                "address": match.get("address"),
+                "latitude": match["latitude"],
+                "longitude": match["longitude"],
+            }
+
+    origin = located.get(start) if start else None
+    stops = [located[name] for name in dict.fromkeys(places) if name in located]
+    days = plan_days(stops, number_of_days, start=(origin["latitude"], origin["longitude"]) if origin else None)
+    return {
+        "days": days,
+        "total_travel_km": round(sum(day["travel_km"] for day in days), 1),
+        "unresolved": [name for name in names if name not in located],
+    }
 
+@with_fallback(_tripadvisor_from_places)
+@cached_tool(ttl=7 * 24 * 3600, credential_fields=["tripadvisor_api_key"])
 async def tripadvisor_location_search(
         query: str,
         config: Annotated[RunnableConfig, InjectedToolArg]
@@ -159,25 +313,24 @@ async def tripadvisor_location_search(
     - dict: The API response as a dictionary containing a list of locations with detailed information.
       The data includes the location name, ID, address, and other metadata.
     """
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-        
-        base_url = "https://api.content.tripadvisor.com/api/v1/location/search"
-        params = {
-            "searchQuery": query,
-            "language": "en",
-            "key": configuration.tripadvisor_api_key
-        }
-        
-        headers = {
-            "accept": "application/json",
-            "Referer": "https://randomballs.com"
-        }
+    configuration = Configuration.from_runnable_config(config)
 
-        async with session.get(base_url, params=params, headers=headers) as response:
-            response.raise_for_status()
-            return await response.json()
+    base_url = "https://api.content.tripadvisor.com/api/v1/location/search"
+    params = {
+        "searchQuery": query,
+        "language": "en",
+        "key": configuration.tripadvisor_api_key
+    }
 
+    headers = {
+        "accept": "application/json",
+        "Referer": "https://randomballs.com"
+    }
+
+    return await request_json("GET", base_url, configuration, rate_limit=("tripadvisor", configuration.tripadvisor_api_key), params=params, headers=headers)
+
+@with_fallback(_tripadvisor_details_unavailable)
+@cached_tool(ttl=7 * 24 * 3600, credential_fields=["tripadvisor_api_key"])
 async def tripadvisor_location_details(
         location_id: int,
         config: Annotated[RunnableConfig, InjectedToolArg],
@@ -199,26 +352,25 @@ async def tripadvisor_location_details(
     Returns:
     - dict: Complete location details including name, description, address, rating, etc.
     """
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-        
-        base_url = f"https://api.content.tripadvisor.com/api/v1/location/{location_id}/details"
-        
-        params = {
-            "key": configuration.tripadvisor_api_key,
-            "language": language,
-            "currency": currency
-        }
-        
-        headers = {
-            "accept": "application/json",
-            "Referer": "https://randomballs.com"
-        }
+    configuration = Configuration.from_runnable_config(config)
 
-        async with session.get(base_url, params=params, headers=headers) as response:
-            response.raise_for_status()
-            return await response.json()
+    base_url = f"https://api.content.tripadvisor.com/api/v1/location/{location_id}/details"
 
+    params = {
+        "key": configuration.tripadvisor_api_key,
+        "language": language,
+        "currency": currency
+    }
+
+    headers = {
+        "accept": "application/json",
+        "Referer": "https://randomballs.com"
+    }
+
+    return await request_json("GET", base_url, configuration, rate_limit=("tripadvisor", configuration.tripadvisor_api_key), params=params, headers=headers)
+
+@with_fallback(_tripadvisor_photos_unavailable)
+@cached_tool(ttl=7 * 24 * 3600, credential_fields=["tripadvisor_api_key"])
 async def tripadvisor_location_photos(
         location_id: int,
         config: Annotated[RunnableConfig, InjectedToolArg],
@@ -244,32 +396,31 @@ async def tripadvisor_location_photos(
     Returns:
     - dict: Photo data with URLs in various sizes and metadata
     """
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-        
-        base_url = f"https://api.content.tripadvisor.com/api/v1/location/{location_id}/photos"
-        
-        params = {
-            "key": configuration.tripadvisor_api_key,
-            "language": language
-        }
-        
-        if limit is not None:
-            params["limit"] = limit
-        if offset is not None:
-            params["offset"] = offset
-        if source is not None:
-            params["source"] = source
-        
-        headers = {
-            "accept": "application/json",
-            "Referer": "https://randomballs.com"
-        }
+    configuration = Configuration.from_runnable_config(config)
+
+    base_url = f"https://api.content.tripadvisor.com/api/v1/location/{location_id}/photos"
+
+    params = {
+        "key": configuration.tripadvisor_api_key,
+        "language": language
+    }
+
+    if limit is not None:
+        params["limit"] = limit
+    if offset is not None:
+        params["offset"] = offset
+    if source is not None:
+        params["source"] = source
+
+    headers = {
+        "accept": "application/json",
+        "Referer": "https://randomballs.com"
+    }
 
-        async with session.get(base_url, params=params, headers=headers) as response:
-            response.raise_for_status()
-            return await response.json()       
+    return await request_json("GET", base_url, configuration, rate_limit=("tripadvisor", configuration.tripadvisor_api_key), params=params, headers=headers)
 
+@with_fallback(_search_with_exa)
+@cached_tool(ttl=24 * 3600, config_fields=["max_search_results"], credential_fields=["tavily_api_key"])
 async def tavily_web_search(
     query: str,
     config: Annotated[RunnableConfig, InjectedToolArg]
@@ -311,14 +462,20 @@ async def tavily_web_search(
     """  # noqa: D202, D212, D401
 
     configuration = Configuration.from_runnable_config(config)
-
-    response = await client.search(
-        query=query,
-        search='advanced',
-        max_results=configuration.max_search_results,
-        time_range='year',
+    return await _tavily_search(query, configuration)
+
+async def _tavily_search(query: str, configuration: Configuration) -> dict:
+    return await call_with_retries(
+        "api.tavily.com",
+        lambda: client.search(
+            query=query,
+            search='advanced',
+            max_results=configuration.max_search_results,
+            time_range='year',
+        ),
+        configuration,
+        rate_limit=("tavily", configuration.tavily_api_key),
     )
-    return response
 
 # async def tavily_url_extract(
 #     urls: str,
@@ -377,6 +534,8 @@ async def tavily_web_search(
 #     )
 #     return response
 
+@with_fallback(_extract_with_exa)
+@cached_tool(ttl=3 * 24 * 3600, credential_fields=["tavily_api_key"])
 async def tavily_url_extract(
         url: str,
         config: Annotated[RunnableConfig, InjectedToolArg],
@@ -406,31 +565,179 @@ async def tavily_url_extract(
     - Basic extraction returns main content, while full extraction includes more detailed content.
     - Be mindful of rate limits when making requests to the Tavily API.
     """
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-        
+    configuration = Configuration.from_runnable_config(config)
 
-        # Build request payload
-        payload = {
-            "urls": url,
-            "extract_depth": 'advanced'
-        }
-        
-        headers = {
-            "Authorization": f"Bearer {configuration.tavily_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        url = "https://api.tavily.com/extract"
-        
-        async with session.post(url, json=payload, headers=headers) as response:
-            response.raise_for_status()
-            return await response.json()
+    # Build request payload
+    payload = {
+        "urls": url,
+        "extract_depth": 'advanced'
+    }
+
+    headers = {
+        "Authorization": f"Bearer {configuration.tavily_api_key}",
+        "Content-Type": "application/json"
+    }
+
+    url = "https://api.tavily.com/extract"
+
+    return await request_json("POST", url, configuration, rate_limit=("tavily", configuration.tavily_api_key), json=payload, headers=headers)
+
+TAVILY_EXTRACT_MAX_URLS = 20
+
+async def tavily_batch_extract(
+        urls: List[str],
+        config: Annotated[RunnableConfig, InjectedToolArg],
+) -> dict:
+    """
+    Extracts the main text content of MANY URLs in a single call using the Tavily API.
+
+    Pass every URL you want to read at once instead of calling an extractor per URL.
+    Duplicate URLs are dropped, pages extracted recently are served from the cache,
+    and the rest are fetched in chunks of at most 20 URLs per request.
+
+    Parameters:
+    - urls (list[str]): The URLs to extract content from.
+    - config (RunnableConfig): Configuration settings used to authenticate the API request.
+      This includes the API key for the Tavily API.
+
+    Returns:
+    - dict: One merged result with the keys:
+      - results: a list of {"url", "raw_content"} for every page that was extracted.
+      - failed_results: a list of {"url", "error"} for every page that could not be extracted.
+
+    Example:
+    >>> tavily_batch_extract(["https://www.example.com/article", "https://www.example.com/blog-post"])
+    {
+        "results": [
+            {"url": "https://www.example.com/article", "raw_content": "This is the main content..."},
+            {"url": "https://www.example.com/blog-post", "raw_content": "Content from the blog post..."}
+        ],
+        "failed_results": []
+    }
+    """
+    configuration = Configuration.from_runnable_config(config)
+    cache = get_response_cache(configuration) if configuration.cache_enabled else None
+
+    extracted: dict = {}
+    pending: List[str] = []
+    for url in dict.fromkeys(url.strip() for url in urls if url.strip()):
+        hit = await cache.aget(make_key("tavily_extract_page", {"url": url}, {})) if cache else None
+        if hit is not None:
+            extracted[url] = hit
+        else:
+            pending.append(url)
+
+    headers = {
+        "Authorization": f"Bearer {configuration.tavily_api_key}",
+        "Content-Type": "application/json"
+    }
+    chunks = [
+        pending[i:i + TAVILY_EXTRACT_MAX_URLS]
+        for i in range(0, len(pending), TAVILY_EXTRACT_MAX_URLS)
+    ]
+    responses = await asyncio.gather(
+        *(
+            request_json(
+                "POST",
+                "https://api.tavily.com/extract",
+                configuration,
+                rate_limit=("tavily", configuration.tavily_api_key),
+                json={"urls": chunk, "extract_depth": "advanced"},
+                headers=headers,
+            )
+            for chunk in chunks
+        ),
+        return_exceptions=True,
+    )
+
+    failed_results = []
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, BaseException):
+            # Tavily is unavailable for this chunk; fall back to Exa's page contents.
+            try:
+                response = await _exa_contents(chunk, configuration)
+            except Exception:
+                failed_results.extend({"url": url, "error": str(response)} for url in chunk)
+                continue
+        for result in response.get("results", []):
+            page = {"url": result["url"], "raw_content": result.get("raw_content", "")}
+            extracted[result["url"]] = page
+            if cache:
+                await cache.aset(make_key("tavily_extract_page", {"url": result["url"]}, {}), page, 3 * 24 * 3600)
+        failed_results.extend(
+            {"url": failed.get("url"), "error": failed.get("error")}
+            for failed in response.get("failed_results", [])
+        )
+
+    return {"results": list(extracted.values()), "failed_results": failed_results}
         
-async def exa_web_search(query: str):
-    """Search for webpages based on the query and retrieve their contents."""
-    return exa.search_and_contents(
+_exa_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_exa_executor(configuration: Configuration) -> ThreadPoolExecutor:
+    global _exa_executor
+    if _exa_executor is None:
+        _exa_executor = ThreadPoolExecutor(
+            max_workers=configuration.exa_max_workers, thread_name_prefix="exa"
+        )
+    return _exa_executor
+
+async def _run_exa(configuration: Configuration, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # The Exa client is synchronous, so run it on a bounded pool instead of the
+    # event loop. Cancelling or timing out releases the caller immediately; a
+    # call still queued on the pool is dropped, one already running finishes
+    # in the background.
+    loop = asyncio.get_running_loop()
+
+    def attempt() -> Awaitable[Any]:
+        future = loop.run_in_executor(
+            _get_exa_executor(configuration), functools.partial(method, *args, **kwargs)
+        )
+        return asyncio.wait_for(future, timeout=configuration.exa_timeout)
+
+    return await call_with_retries("api.exa.ai", attempt, configuration, rate_limit=("exa", os.getenv("EXA_API_KEY")))
+
+async def _exa_search(query: str, configuration: Configuration) -> Any:
+    return await _run_exa(
+        configuration, exa.search_and_contents,
         query, use_autoprompt=True, num_results=10, text=True, highlights=True
     )
 
-tools: List[Callable[..., Any]] = [exa_web_search, tavily_web_search, query_google_places, search_unsplash_photos, tavily_url_extract]
+async def _exa_contents(urls: List[str], configuration: Configuration) -> dict:
+    """Page contents from Exa, in the `tavily_batch_extract` result shape."""
+    response = await _run_exa(configuration, exa.get_contents, urls, text=True)
+    results = [
+        {"url": _get(result, "url"), "raw_content": _get(result, "text") or ""}
+        for result in _get(response, "results") or []
+    ]
+    found = {result["url"] for result in results}
+    return {
+        "results": results,
+        "failed_results": [{"url": url, "error": "not found"} for url in urls if url not in found],
+    }
+
+@with_fallback(_search_with_tavily)
+async def exa_web_search(
+        query: str,
+        config: Annotated[RunnableConfig, InjectedToolArg]
+):
+    """Search for webpages based on the query and retrieve their contents."""
+    configuration = Configuration.from_runnable_config(config)
+    return await _exa_search(query, configuration)
+
+async def read_full_tool_result(
+        ref: str,
+        config: Annotated[RunnableConfig, InjectedToolArg]
+) -> Any:
+    """Return the full, uncompacted output of an earlier tool call.
+
+    Tool results are shortened before they reach you; each shortened result
+    carries a "ref". Use this only when you need a detail the shortened result
+    left out, such as the full text of a page or all reviews of a place.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    payload = get_full_result_store(configuration).get(ref)
+    if payload is None:
+        raise ValueError(f"No stored result for ref {ref!r}; it may have expired. Call the original tool again.")
+    return payload
+
+tools: List[Callable[..., Any]] = [exa_web_search, tavily_web_search, lookup_places, plan_route, query_google_places, search_unsplash_photos, tavily_batch_extract, read_full_tool_result]
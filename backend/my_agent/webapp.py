@@ -0,0 +1,20 @@
+"""HTTP app mounted alongside the LangGraph server routes (see `langgraph.json`).
+
+It adds no routes of its own. Its lifespan closes the pooled aiohttp sessions
+from `my_agent.utils.http` when the server shuts down, so their connectors
+release sockets cleanly instead of warning about unclosed client sessions.
+"""
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from my_agent.utils.http import close_sessions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_sessions()
+
+
+app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,85 @@
+"""Two-tier response cache in `my_agent.utils.cache`."""
+import asyncio
+import time
+
+import pytest
+
+from my_agent.utils.cache import TOUCH_BATCH_SIZE, ResponseCache, make_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_memory_entries=2, max_disk_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_only_free_text_arguments_are_casefolded():
+    assert make_key("search", {"query": " Kandy  Temples"}, {}) == make_key("search", {"query": "kandy temples"}, {})
+    assert make_key("extract", {"url": "https://x.lk/A"}, {}) != make_key("extract", {"url": "https://x.lk/a"}, {})
+
+
+def test_memory_then_disk_hits(cache):
+    for key in "abc":
+        cache.set(key, {"key": key}, ttl=60)
+
+    assert cache.get("c") == {"key": "c"}
+    # "a" fell out of the two-entry memory tier but is still on disk.
+    assert cache.get("a") == {"key": "a"}
+    assert cache.stats["memory_hits"] == 1 and cache.stats["disk_hits"] == 1
+
+
+def test_expired_entries_miss(cache):
+    cache.set("a", 1, ttl=-1)
+
+    assert cache.get("a") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_disk_tier_is_bounded_by_a_running_count(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path, max_memory_entries=1, max_disk_entries=3)
+    for key in "abcde":
+        cache.set(key, key, ttl=60)
+    cache.set("e", "e again", ttl=60)
+    cache.close()
+
+    reopened = ResponseCache(path, max_memory_entries=1, max_disk_entries=3)
+    assert reopened._disk_entries == 3
+    assert [reopened.get(key) for key in "abcde"] == [None, None, "c", "d", "e again"]
+    reopened.close()
+
+
+def test_disk_hits_are_written_in_batches(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_memory_entries=1)
+    keys = [str(i) for i in range(TOUCH_BATCH_SIZE)]
+    for key in keys:
+        cache.set(key, key, ttl=60)
+    cache._memory.clear()
+    for key in keys[:-1]:
+        assert cache.get(key) == key
+
+    assert len(cache._touched) == TOUCH_BATCH_SIZE - 1
+    cache.get(keys[-1])
+    assert not cache._touched
+    cache.close()
+
+
+def test_a_disk_write_in_progress_does_not_block_the_loop(cache):
+    cache.set("warm", 1, ttl=60)
+
+    async def main():
+        # Hold the connection as a slow commit in a worker thread would.
+        with cache._db_lock:
+            write = asyncio.create_task(cache.aset("new", 2, ttl=60))
+            await asyncio.sleep(0.01)
+            started = time.perf_counter()
+            assert await cache.aget("warm") == 1
+            assert await cache.aget("new") == 2
+            elapsed = time.perf_counter() - started
+        await write
+        return elapsed
+
+    assert asyncio.run(main()) < 0.05
+    cache._memory.clear()
+    assert cache.get("new") == 2
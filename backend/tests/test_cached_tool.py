@@ -0,0 +1,48 @@
+"""`cached_tool` coalescing of identical in-flight calls."""
+import asyncio
+
+from langchain_core.runnables import RunnableConfig
+
+from my_agent.utils.cache import cached_tool
+
+CALLS = []
+
+
+@cached_tool(ttl=60, credential_fields=["tavily_api_key"])
+async def search(query: str, config: RunnableConfig) -> dict:
+    CALLS.append(config["configurable"].get("tavily_api_key"))
+    await asyncio.sleep(0.01)
+    if config["configurable"].get("tavily_api_key") == "revoked":
+        raise PermissionError("401 Unauthorized")
+    return {"query": query}
+
+
+def _config(api_key: str) -> dict:
+    return {"configurable": {"tavily_api_key": api_key, "cache_enabled": False, "coalesce_tool_calls": True}}
+
+
+def test_calls_with_the_same_credentials_are_coalesced():
+    CALLS.clear()
+
+    async def main():
+        return await asyncio.gather(*(search("Kandy", config=_config("a")) for _ in range(3)))
+
+    assert asyncio.run(main()) == [{"query": "Kandy"}] * 3
+    assert CALLS == ["a"]
+
+
+def test_calls_with_other_credentials_never_share_a_result_or_error():
+    CALLS.clear()
+
+    async def main():
+        return await asyncio.gather(
+            search("Kandy", config=_config("revoked")),
+            search("Kandy", config=_config("valid")),
+            return_exceptions=True,
+        )
+
+    revoked, valid = asyncio.run(main())
+
+    assert isinstance(revoked, PermissionError)
+    assert valid == {"query": "Kandy"}
+    assert sorted(CALLS) == ["revoked", "valid"]
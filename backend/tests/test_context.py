@@ -0,0 +1,43 @@
+"""Token-budgeted message window in `my_agent.utils.context`."""
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from my_agent.utils.context import build_window, fit_message
+
+
+def _history():
+    return [
+        HumanMessage(content="Plan 3 days in Kandy", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[{"name": "exa_web_search", "args": {"query": "kandy"}, "id": "c1"}]),
+        ToolMessage(content="x" * 4000, tool_call_id="c1", name="exa_web_search", id="t1"),
+        AIMessage(content="Day 1 " * 400, id="a2"),
+        HumanMessage(content="Make it cheaper", id="h2"),
+        AIMessage(content="", id="a3", tool_calls=[{"name": "lookup_places", "args": {"query": "kandy"}, "id": "c2"}]),
+        ToolMessage(content="y" * 400, tool_call_id="c2", name="lookup_places", id="t2"),
+    ]
+
+
+def test_recent_turns_are_kept_and_older_ones_shrunk():
+    window = build_window(_history(), max_tokens=100_000, keep_last_turns=2)
+
+    assert [message.id for message in window] == ["h1", "a1", "t1", "a2", "h2", "a3", "t2"]
+    assert window[2].content.startswith("[Older exa_web_search result elided")
+    assert window[3].content.endswith("…[older draft truncated]")
+    assert window[6].content == "y" * 400
+
+
+def test_oldest_turns_are_dropped_but_human_messages_stay():
+    window = build_window(_history(), max_tokens=150, keep_last_turns=1)
+
+    ids = [message.id for message in window]
+    assert "h1" in ids and "h2" in ids
+    assert "a2" not in ids
+    # A tool call is never separated from its result.
+    assert ("a1" in ids) == ("t1" in ids)
+    assert ids[-2:] == ["a3", "t2"]
+
+
+def test_fit_message_truncates():
+    message = AIMessage(content="z" * 1000, id="big")
+
+    assert fit_message(message, 1000) is message
+    assert len(fit_message(message, 10).content) < 60
@@ -0,0 +1,73 @@
+"""Cost parsing and per-day budget bounds in `my_agent.utils.costs`."""
+import math
+
+import pytest
+
+from my_agent.utils.costs import budget_limit, estimate_costs, parse_cost
+
+RATES = {"USD": 1.0, "LKR": 300.0}
+
+
+@pytest.mark.parametrize("text, low, high, currency, basis", [
+    ("$12", 12.0, 12.0, "USD", None),
+    ("$5 per person", 5.0, 5.0, "USD", "person"),
+    ("Rs. 1,500", 1500.0, 1500.0, "LKR", None),
+    ("Free", 0.0, 0.0, "USD", None),
+    ("$10-15", 10.0, 15.0, "USD", None),
+    ("$2k total", 2000.0, 2000.0, "USD", "group"),
+    ("$3 kids, $5 adults", 3.0, 5.0, "USD", None),
+    ("$5 per person, 2 hours", 5.0, 5.0, "USD", "person"),
+    ("$0.50", 0.5, 0.5, "USD", None),
+])
+def test_parse_cost(text, low, high, currency, basis):
+    cost = parse_cost(text)
+
+    assert (cost.low, cost.high, cost.currency, cost.basis) == (low, high, currency, basis)
+
+
+def test_unpriced_cost():
+    assert parse_cost("varies").low is None
+
+
+def test_budget_limit_basis():
+    profile = {"budget": 100, "number_of_people": 2, "number_of_days": 3}
+
+    assert budget_limit(profile) == 100
+    assert budget_limit(profile, "person") == 200
+    assert budget_limit(profile, "person_day") == 600
+    assert budget_limit({"budget": 0}) is None
+
+
+def test_estimate_bounds_and_verdicts():
+    days = [
+        {"day_number": 1, "attractions": [{"name": "Temple", "cost": "$10 per person"}], "dining": [{"name": "Lunch", "cost": "$20"}]},
+        {"day_number": 2, "attractions": [{"name": "Safari", "cost": "Rs. 30,000 total"}], "dining": []},
+    ]
+    profile = {"budget": 200, "currency": "USD", "number_of_people": 2}
+
+    estimate = estimate_costs(days, profile, RATES)
+
+    # Day 1: 10 x 2 people, plus 20 once (low) or per person (high). Day 2: 100 for the group.
+    assert list(estimate.day_low) == [40.0, 100.0]
+    assert list(estimate.day_high) == [60.0, 100.0]
+    assert estimate.budget_verdict() == "within"
+    assert estimate_costs(days, {**profile, "budget": 100}, RATES).budget_verdict() == "over"
+    assert estimate_costs(days, {**profile, "budget": 140}, RATES).budget_verdict() == "uncertain"
+    assert estimate.expensive_days(1) == [(2, 100.0)]
+
+
+def test_unpriced_items_are_covered_by_the_daily_estimate():
+    days = [{"day_number": 1, "attractions": [{"name": "Hike", "cost": "ask locally"}], "dining": []}]
+    profile = {"budget": 100, "currency": "USD", "number_of_people": 1}
+
+    assert math.isinf(estimate_costs(days, profile, RATES).total_high)
+    covered = estimate_costs([{**days[0], "daily_cost_estimate": 30}], profile, RATES)
+    assert covered.total_high == 30.0
+    assert covered.unpriced == [(1, "Hike")]
+
+
+def test_unknown_currency_is_unbounded():
+    estimate = estimate_costs([{"day_number": 1, "attractions": [], "dining": []}], {"budget": 10, "currency": "XYZ"}, RATES)
+
+    assert estimate.unknown_currencies == ["XYZ"]
+    assert estimate.budget_verdict() == "uncertain"
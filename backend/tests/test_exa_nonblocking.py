@@ -0,0 +1,117 @@
+"""`exa_web_search` must not block the event loop while the Exa client works.
+
+The Exa SDK is synchronous. These tests replace it with a client that sleeps
+in `time.sleep` and check that a ticker coroutine keeps running meanwhile, and
+that the timeout and cancellation paths release the caller promptly.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("EXA_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+
+from my_agent.utils import ratelimit, resilience, tools  # noqa: E402
+from my_agent.utils.configuration import Configuration  # noqa: E402
+
+BLOCKING_SECONDS = 0.5
+TICK_SECONDS = 0.01
+
+
+class SlowExa:
+    """Stands in for `exa_py.Exa`, blocking the calling thread like the real client."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.finished = 0
+
+    def search_and_contents(self, query, **kwargs):
+        time.sleep(self.seconds)
+        self.finished += 1
+        return {"results": [{"title": query, "url": "https://example.com", "text": "ok"}]}
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(tools, "_exa_executor", None)
+    resilience.reset_breakers()
+    ratelimit.set_rate_limiter(None)
+    yield
+    if tools._exa_executor is not None:
+        tools._exa_executor.shutdown(wait=True)
+    resilience.reset_breakers()
+    ratelimit.set_rate_limiter(None)
+
+
+def _configuration(**overrides) -> Configuration:
+    return Configuration(**{"http_max_retries": 0, "exa_max_workers": 2, **overrides})
+
+
+async def _ticker(ticks: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        ticks.append(time.perf_counter())
+        await asyncio.sleep(TICK_SECONDS)
+
+
+async def _with_ticker(call):
+    ticks: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(ticks, stop))
+    started = time.perf_counter()
+    try:
+        return await call(), ticks, time.perf_counter() - started
+    finally:
+        stop.set()
+        await ticker
+
+
+def test_other_coroutines_run_while_exa_is_in_flight(monkeypatch):
+    exa = SlowExa(BLOCKING_SECONDS)
+    monkeypatch.setattr(tools, "exa", exa)
+
+    result, ticks, elapsed = asyncio.run(_with_ticker(lambda: tools._exa_search("Kandy", _configuration())))
+
+    assert result["results"][0]["title"] == "Kandy"
+    assert elapsed >= BLOCKING_SECONDS
+    # A blocked loop would tick once before the call and once after it.
+    assert len(ticks) >= BLOCKING_SECONDS / TICK_SECONDS / 2
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < BLOCKING_SECONDS / 2
+
+
+def test_timeout_releases_the_caller(monkeypatch):
+    monkeypatch.setattr(tools, "exa", SlowExa(BLOCKING_SECONDS))
+    configuration = _configuration(exa_timeout=0.1)
+
+    async def call():
+        with pytest.raises(asyncio.TimeoutError):
+            await tools._exa_search("Galle", configuration)
+
+    _, ticks, elapsed = asyncio.run(_with_ticker(call))
+
+    assert elapsed < BLOCKING_SECONDS
+    assert len(ticks) > 1
+
+
+def test_cancellation_releases_the_caller_and_the_breaker(monkeypatch):
+    exa = SlowExa(BLOCKING_SECONDS)
+    monkeypatch.setattr(tools, "exa", exa)
+    configuration = _configuration()
+
+    async def call():
+        task = asyncio.create_task(tools._exa_search("Ella", configuration))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    _, ticks, elapsed = asyncio.run(_with_ticker(call))
+
+    assert elapsed < BLOCKING_SECONDS
+    assert len(ticks) > 1
+    breaker = resilience.get_breaker("api.exa.ai", configuration)
+    assert breaker.state == "closed" and breaker.failures == 0
+    # The call already running on the pool finishes in the background.
+    tools._exa_executor.shutdown(wait=True)
+    assert exa.finished == 1
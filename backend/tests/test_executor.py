@@ -0,0 +1,67 @@
+"""Concurrent tool execution in `my_agent.utils.executor`."""
+import asyncio
+import os
+
+os.environ.setdefault("EXA_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from my_agent.utils.executor import ToolExecutor  # noqa: E402
+from my_agent.utils.state import State  # noqa: E402
+
+
+async def sleepy(seconds: float) -> str:
+    """Sleep for `seconds`."""
+    await asyncio.sleep(seconds)
+    return "rested"
+
+
+async def upstream_timeout(url: str) -> str:
+    """Fail like an HTTP client whose own read timeout expired."""
+    raise asyncio.TimeoutError()
+
+
+def _run(executor, calls, **configurable):
+    state = State(messages=[AIMessage(content="", tool_calls=[
+        {"name": name, "args": args, "id": f"call-{i}"} for i, (name, args) in enumerate(calls)
+    ])])
+    config = {"configurable": {"place_index_enabled": False, "compact_tool_results": False, **configurable}}
+    return asyncio.run(executor(state, config))["messages"]
+
+
+def test_only_the_executor_deadline_is_reported_as_a_timeout():
+    executor = ToolExecutor([sleepy, upstream_timeout])
+
+    slow, upstream = _run(
+        executor, [("sleepy", {"seconds": 1}), ("upstream_timeout", {"url": "https://x"})], tool_timeout=0.05
+    )
+
+    assert slow.status == "error" and "timed out after 0.05s" in slow.content
+    assert upstream.status == "error" and "TimeoutError" in upstream.content
+    assert "timed out after" not in upstream.content
+
+
+def test_calls_run_concurrently_up_to_the_provider_limit():
+    executor = ToolExecutor([sleepy])
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        state = State(messages=[AIMessage(content="", tool_calls=[
+            {"name": "sleepy", "args": {"seconds": 0.05}, "id": f"call-{i}"} for i in range(4)
+        ])])
+        config = {"configurable": {"tool_concurrency": {"sleepy": 2}, "place_index_enabled": False}}
+        messages = (await executor(state, config))["messages"]
+        return messages, loop.time() - started
+
+    messages, elapsed = asyncio.run(main())
+
+    assert [message.content for message in messages] == ["rested"] * 4
+    assert 0.1 <= elapsed < 0.2
+
+
+def test_unknown_tools_become_error_messages():
+    (message,) = _run(ToolExecutor([sleepy]), [("missing", {})])
+
+    assert message.status == "error" and "not a valid tool" in message.content
@@ -0,0 +1,32 @@
+"""Pooled aiohttp sessions in `my_agent.utils.http`."""
+import asyncio
+
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.http import get_session
+from my_agent.webapp import app, lifespan
+
+
+def test_sessions_are_pooled_per_host():
+    configuration = Configuration()
+
+    async def main():
+        first = get_session("https://api.tavily.com/search", configuration)
+        again = get_session("https://api.tavily.com/extract", configuration)
+        other = get_session("https://api.unsplash.com/search/photos", configuration)
+        async with lifespan(app):
+            pass
+        return first, again, other
+
+    first, again, other = asyncio.run(main())
+
+    assert first is again and first is not other
+
+
+def test_server_shutdown_closes_pooled_sessions():
+    async def main():
+        session = get_session("https://places.googleapis.com/v1/places:searchText", Configuration())
+        async with lifespan(app):
+            assert not session.closed
+        return session
+
+    assert asyncio.run(main()).closed
@@ -0,0 +1,63 @@
+"""Rule-based trip field extraction in `my_agent.utils.intake`."""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from my_agent.utils.intake import extract_trip_fields, prevalidate
+
+
+@pytest.mark.parametrize("text, budget, currency", [
+    ("budget $1500 kept flexible", 1500.0, "USD"),
+    ("budget of $3 kids", 3.0, "USD"),
+    ("we have $2k to spend", 2000.0, "USD"),
+    ("around 3 thousand euros", 3000.0, "EUR"),
+    ("Rs. 150,000 in total", 150000.0, "LKR"),
+    ("1,200 GBP", 1200.0, "GBP"),
+])
+def test_budget_and_currency(text, budget, currency):
+    fields = extract_trip_fields(text)
+
+    assert fields["budget"] == budget
+    assert fields["currency"] == currency
+
+
+def test_bare_budget_ignores_counts():
+    assert extract_trip_fields("budget 900, 2 adults")["budget"] == 900.0
+    assert "budget" not in extract_trip_fields("a budget trip for 4 people")
+
+
+@pytest.mark.parametrize("text, days", [
+    ("5 days in Kandy", 5),
+    ("four nights in Ella", 5),
+    ("2 weeks around the island", 14),
+    ("a weekend in Galle", 2),
+])
+def test_number_of_days(text, days):
+    assert extract_trip_fields(text)["number_of_days"] == days
+
+
+def test_party_size():
+    fields = extract_trip_fields("2 adults and 3 kids")
+
+    assert fields["number_of_adults"] == 2
+    assert fields["number_of_kids"] == 3
+    assert fields["number_of_people"] == 5
+    assert extract_trip_fields("with my wife")["number_of_people"] == 2
+
+
+def test_prevalidate_reads_only_human_messages_and_later_ones_win():
+    result = prevalidate([
+        HumanMessage(content="5 days in Kandy for $800"),
+        AIMessage(content="How about 10 days in Galle?"),
+        HumanMessage(content="actually make it 7 days"),
+    ])
+
+    assert result.is_valid
+    assert result.fields["destination"] == "Kandy"
+    assert result.fields["number_of_days"] == 7
+
+
+def test_prevalidate_reports_missing_fields():
+    result = prevalidate([HumanMessage(content="I want to visit Ella")])
+
+    assert not result.is_valid
+    assert result.missing == ["budget", "number_of_days"]
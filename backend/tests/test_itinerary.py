@@ -0,0 +1,44 @@
+"""Markdown itinerary parsing in `my_agent.utils.itinerary`."""
+from my_agent.utils.itinerary import has_day_header, parse_itinerary, split_days, validate_day
+
+DRAFT = """# Your Sri Lanka trip
+
+## Day 1: Kandy
+**Attractions**
+- **Temple of the Tooth** - Type: Temple, Location: Kandy, Cost: $10, Rating: 4.7/5
+**Dining**
+- **Empire Cafe** - Cost: Free
+Day 1 Total: $45
+
+## Day 2: Ella
+- **Nine Arch Bridge** - Cost: 0
+"""
+
+
+def test_split_days():
+    days = split_days(DRAFT)
+
+    assert [number for number, _ in days] == [1, 2]
+    assert days[0][1].strip().startswith("## Day 1")
+    assert "Day 1 Total" in days[0][1]
+
+
+def test_has_day_header_ignores_day_totals():
+    assert has_day_header("### **Day 3** - Galle\n")
+    assert not has_day_header("Day 1 Total: $45\n")
+    assert not has_day_header("Spend a day in Galle\n")
+
+
+def test_parse_itinerary():
+    day1, day2 = parse_itinerary(DRAFT)
+
+    assert day1["attractions"] == [
+        {"name": "Temple of the Tooth", "type": "Temple", "location": "Kandy", "cost": "$10", "rating": 4.7}
+    ]
+    assert day1["dining"] == [{"name": "Empire Cafe", "cost": 0}]
+    assert day1["daily_cost_estimate"] == 45.0
+    assert day2["attractions"] == [{"name": "Nine Arch Bridge", "cost": 0.0}]
+
+
+def test_validate_day_reports_missing_fields():
+    assert validate_day({"day_number": 1}) != []
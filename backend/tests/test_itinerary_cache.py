@@ -0,0 +1,85 @@
+"""The semantic itinerary cache must never fail a run.
+
+A missing key, a network error or an Anthropic-only deployment turns the cache
+off or into a miss instead of raising out of the graph.
+"""
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("EXA_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from my_agent.utils import nodes  # noqa: E402
+from my_agent.utils.configuration import Configuration  # noqa: E402
+from my_agent.utils.itinerary_cache import ItineraryCache, get_itinerary_cache, set_itinerary_cache  # noqa: E402
+from my_agent.utils.state import State  # noqa: E402
+
+PROFILE = {"destination": "Kandy", "number_of_days": 3, "budget": 500, "currency": "USD"}
+CONFIG = {"configurable": {}}
+
+
+async def _embed(text: str):
+    return [1.0, float(len(text))]
+
+
+async def _unreachable(text: str):
+    raise ConnectionError("embedding API unreachable")
+
+
+@pytest.fixture(autouse=True)
+def isolated():
+    set_itinerary_cache(None)
+    yield
+    set_itinerary_cache(None)
+
+
+def _state() -> State:
+    return State(messages=[HumanMessage(content="3 days in Kandy")], user_profile=PROFILE, optimized_prompt="Kandy culture")
+
+
+def test_cache_is_off_without_an_embedder(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert get_itinerary_cache(Configuration()) is None
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    assert get_itinerary_cache(Configuration(itinerary_cache_embedding_model="anthropic/none")) is None
+
+
+def test_lookup_without_an_embedder_runs_research(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    command = asyncio.run(nodes.lookup_cached_itinerary(_state(), CONFIG))
+
+    assert command.goto == "research_itinerary"
+
+
+def test_lookup_error_is_a_miss():
+    cache = ItineraryCache(embed=_embed)
+    asyncio.run(cache.store(PROFILE, "a different prompt", "cached itinerary"))
+    # A matching profile makes the lookup embed the new prompt, which now fails.
+    cache.embed = _unreachable
+    set_itinerary_cache(cache)
+
+    command = asyncio.run(nodes.lookup_cached_itinerary(_state(), CONFIG))
+
+    assert command.goto == "research_itinerary"
+
+
+def test_lookup_hit_ends_the_run():
+    cache = ItineraryCache(embed=_embed, threshold=0.5)
+    set_itinerary_cache(cache)
+    asyncio.run(cache.store(PROFILE, "Kandy culture", "cached itinerary"))
+
+    command = asyncio.run(nodes.lookup_cached_itinerary(_state(), CONFIG))
+
+    assert command.goto == "__end__"
+    assert command.update["messages"][0].content == "cached itinerary"
+
+
+def test_store_error_is_swallowed():
+    set_itinerary_cache(ItineraryCache(embed=_unreachable))
+
+    asyncio.run(nodes._store_itinerary(Configuration(), _state(), "accepted draft"))
@@ -0,0 +1,111 @@
+"""Day-by-day itinerary streaming from `research_itinerary`.
+
+A fake model streams a draft in small chunks; the events the node writes are
+collected instead of going to the LangGraph stream.
+"""
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("EXA_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage  # noqa: E402
+
+from my_agent.utils import nodes  # noqa: E402
+from my_agent.utils.review import PreCheck  # noqa: E402
+from my_agent.utils.state import State  # noqa: E402
+
+DRAFT = (
+    "Here is your trip.\n"
+    "## Day 1: Kandy\n- **Temple of the Tooth** - Cost: $10\n"
+    "## Day 2: Ella\n- **Nine Arch Bridge** - Cost: Free\n"
+    "## Day 3: Galle\n- **Galle Fort** - Cost: Free\n"
+)
+
+
+class FakeModel:
+    def __init__(self, chunks, fallback=None):
+        self.chunks = chunks
+        self.fallback = fallback
+        self.invoked = 0
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def ainvoke(self, messages):
+        self.invoked += 1
+        return self.fallback
+
+
+def _chunks(text: str, size: int = 7, **kwargs):
+    pieces = [text[i:i + size] for i in range(0, len(text), size)]
+    return [AIMessageChunk(content=piece, id="draft-1") for piece in pieces] + [
+        AIMessageChunk(content="", id="draft-1", **kwargs)
+    ]
+
+
+@pytest.fixture
+def events(monkeypatch):
+    events = []
+    monkeypatch.setattr(nodes, "get_stream_writer", lambda: events.append)
+    return events
+
+
+def test_days_are_emitted_once_each_in_order(events):
+    message = asyncio.run(nodes._stream_itinerary_days(FakeModel(_chunks(DRAFT)), []))
+
+    assert message.content == DRAFT
+    assert [event["type"] for event in events] == ["ui"] * 3
+    assert [event["id"] for event in events] == ["draft-1-day-1", "draft-1-day-2", "draft-1-day-3"]
+    assert events[0]["props"]["day"]["attractions"][0]["name"] == "Temple of the Tooth"
+
+
+def test_a_day_is_emitted_as_soon_as_the_next_header_line_completes(events):
+    seen = []
+
+    class Recording(FakeModel):
+        async def astream(self, messages):
+            for chunk in self.chunks:
+                seen.append(len(events))
+                yield chunk
+
+    asyncio.run(nodes._stream_itinerary_days(Recording(_chunks(DRAFT, size=1)), []))
+
+    # Day 1 is out before Day 3 starts streaming.
+    assert seen[DRAFT.index("## Day 3")] == 1
+
+
+def test_days_are_retracted_when_the_message_ends_in_tool_calls(events):
+    chunks = _chunks(DRAFT, tool_call_chunks=[{"name": "plan_route", "args": "{}", "id": "call-1", "index": 0}])
+
+    message = asyncio.run(nodes._stream_itinerary_days(FakeModel(chunks), []))
+
+    assert message.tool_calls
+    emitted = [event["id"] for event in events if event["type"] == "ui"]
+    removed = [event["id"] for event in events if event["type"] == "remove-ui"]
+    assert emitted == ["draft-1-day-1", "draft-1-day-2"]
+    assert removed == emitted
+
+
+def test_an_empty_stream_falls_back_to_invoke(events):
+    model = FakeModel([], fallback=AIMessage(content="Day 1", id="draft-2"))
+
+    message = asyncio.run(nodes._stream_itinerary_days(model, []))
+
+    assert model.invoked == 1
+    assert message.content == "Day 1"
+
+
+def test_rejected_drafts_are_retracted(events, monkeypatch):
+    monkeypatch.setattr(nodes, "pre_check_itinerary", lambda *args: PreCheck("fail", [], problems=["Too expensive."]))
+    state = State(messages=[HumanMessage(content="3 days"), AIMessage(content=DRAFT, id="draft-1")])
+
+    command = asyncio.run(nodes.review_itinerary(state, {"configurable": {"itinerary_cache_enabled": False}}))
+
+    assert command.goto == "research_itinerary"
+    assert [event["id"] for event in events if event["type"] == "remove-ui"] == [
+        "draft-1-day-1", "draft-1-day-2", "draft-1-day-3",
+    ]
@@ -0,0 +1,80 @@
+"""Local place index in `my_agent.utils.places`."""
+import asyncio
+
+import pytest
+
+from my_agent.utils.places import PlaceIndex, geohash_encode
+
+GOOGLE = {"places": [
+    {
+        "id": "g-tooth",
+        "displayName": {"text": "Temple of the Sacred Tooth Relic"},
+        "formattedAddress": "Sri Dalada Veediya, Kandy",
+        "location": {"latitude": 7.2936, "longitude": 80.6413},
+        "rating": 4.6,
+        "userRatingCount": 40000,
+        "types": ["buddhist_temple", "tourist_attraction"],
+    },
+    {
+        "id": "g-lake",
+        "displayName": {"text": "Kandy Lake"},
+        "formattedAddress": "Kandy",
+        "location": {"latitude": 7.2920, "longitude": 80.6430},
+        "types": ["lake"],
+    },
+]}
+TRIPADVISOR = {
+    "location_id": 311, "name": "Temple of the Sacred Tooth Relic", "latitude": "7.2937", "longitude": "80.6412",
+    "rating": "4.5", "num_reviews": "9000", "address_obj": {"address_string": "Kandy 20000 Sri Lanka"},
+}
+
+
+@pytest.fixture
+def index():
+    index = PlaceIndex()
+    yield index
+    index.close()
+
+
+def test_geohash_encode():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_providers_are_merged_into_one_record(index):
+    index.ingest("query_google_places", {"query": "kandy"}, GOOGLE)
+    index.ingest("tripadvisor_location_details", {"location_id": 311}, TRIPADVISOR)
+
+    assert len(index) == 2
+    (temple,) = index.search("sacred tooth")
+    assert temple["google_place_id"] == "g-tooth"
+    assert temple["tripadvisor_location_id"] == "311"
+
+
+def test_search_ignores_stopwords_and_plurals(index):
+    index.ingest("query_google_places", {"query": "kandy"}, GOOGLE)
+
+    assert index.search("best temples in Kandy")[0]["name"] == "Temple of the Sacred Tooth Relic"
+    assert index.search("the of") == []
+    assert index.search("tooth", max_age=-1) == []
+
+
+def test_near(index):
+    index.ingest("query_google_places", {"query": "kandy"}, GOOGLE)
+
+    assert [place["name"] for place in index.near(7.2921, 80.6431, radius_km=1)] == [
+        "Kandy Lake", "Temple of the Sacred Tooth Relic",
+    ]
+    assert index.near(6.9, 79.8, radius_km=5) == []
+
+
+def test_async_calls_run_off_the_loop(index):
+    async def main():
+        await index.aingest("query_google_places", {"query": "kandy"}, GOOGLE)
+        # Held by a slow transaction elsewhere: the loop keeps running.
+        with index._lock:
+            search = asyncio.create_task(index.asearch("lake"))
+            await asyncio.sleep(0.01)
+            assert not search.done()
+        return await search
+
+    assert [place["name"] for place in asyncio.run(main())] == ["Kandy Lake"]
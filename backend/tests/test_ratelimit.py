@@ -0,0 +1,68 @@
+"""Token buckets in `my_agent.utils.ratelimit`."""
+import asyncio
+
+import pytest
+
+from my_agent.utils import ratelimit
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.ratelimit import RateLimiter, RateLimitTimeout, SQLiteTokenBucket, TokenBucket
+
+
+def _limiter(**overrides) -> RateLimiter:
+    return RateLimiter(Configuration(**{"rate_limits": {"tavily": {"rate": 10.0, "burst": 2}}, **overrides}))
+
+
+def test_bucket_allows_a_burst_then_spaces_reservations(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: 100.0)
+    bucket = TokenBucket(rate=10.0, burst=2)
+
+    assert [round(bucket.reserve(), 3) for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    bucket.refund()
+    assert round(bucket.reserve(), 3) == 0.2
+
+
+def test_sqlite_buckets_share_one_balance(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    first = SQLiteTokenBucket(path, "tavily:key", rate=0.001, burst=1)
+    second = SQLiteTokenBucket(path, "tavily:key", rate=0.001, burst=1)
+
+    assert first.reserve() == 0.0
+    assert second.reserve() > 0
+
+
+def test_acquire_waits_and_is_keyed_by_api_key():
+    limiter = _limiter()
+
+    async def main():
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(limiter.acquire("tavily", "a") for _ in range(3)))
+        elapsed = asyncio.get_running_loop().time() - started
+        # A different key has its own full bucket.
+        await limiter.acquire("tavily", "b")
+        return elapsed
+
+    assert asyncio.run(main()) >= 0.09
+    assert limiter.stats["acquired"] == 4 and limiter.stats["delayed"] == 1
+
+
+def test_unlimited_providers_pass_through():
+    limiter = _limiter()
+
+    asyncio.run(limiter.acquire("exa"))
+
+    assert limiter.stats["acquired"] == 0
+
+
+def test_waits_beyond_the_maximum_raise_and_refund():
+    limiter = _limiter(rate_limit_max_wait=0.05)
+
+    async def main():
+        await limiter.acquire("tavily")
+        await limiter.acquire("tavily")
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire("tavily")
+        with pytest.raises(RateLimitTimeout):
+            await limiter.acquire("tavily")
+
+    asyncio.run(main())
+    assert limiter.stats["acquired"] == 2
@@ -0,0 +1,187 @@
+"""Retries, `Retry-After` handling and circuit breaking against a fake HTTP server.
+
+`request_json` takes a plain URL, so each test points it at a local aiohttp
+server that answers from a script of (status, headers) responses.
+"""
+import asyncio
+import random
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from my_agent.utils import resilience
+from my_agent.utils.configuration import Configuration
+from my_agent.utils.http import close_sessions, request_json
+from my_agent.utils.resilience import CircuitBreaker, CircuitOpenError, backoff_delay, retry_after
+
+
+@pytest.fixture(autouse=True)
+def isolated():
+    resilience.reset_breakers()
+    yield
+    resilience.reset_breakers()
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Backoff delays actually waited, in order."""
+    delays = []
+    compute = resilience.backoff_delay
+
+    def recording(*args, **kwargs):
+        delay = compute(*args, **kwargs)
+        if delay is not None:
+            delays.append(delay)
+        return delay
+
+    monkeypatch.setattr(resilience, "backoff_delay", recording)
+    return delays
+
+
+def _configuration(**overrides) -> Configuration:
+    return Configuration(**{
+        "http_max_retries": 3,
+        "http_backoff_base": 0.01,
+        "http_backoff_max": 0.05,
+        "circuit_failure_threshold": 5,
+        "circuit_reset_timeout": 30.0,
+        **overrides,
+    })
+
+
+def _serve(script, configuration, calls=1):
+    """Run `calls` requests against a server answering from `script`; return outcomes and hit count."""
+    hits = []
+
+    async def handler(request):
+        status, headers = script[min(len(hits), len(script) - 1)]
+        hits.append(request.path)
+        return web.json_response({"ok": status < 400}, status=status, headers=headers)
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        async with TestServer(app) as server:
+            url = str(server.make_url("/"))
+            outcomes = []
+            try:
+                for _ in range(calls):
+                    try:
+                        outcomes.append(await request_json("GET", url, configuration))
+                    except Exception as e:
+                        outcomes.append(e)
+            finally:
+                await close_sessions()
+            return outcomes
+
+    return asyncio.run(main()), len(hits)
+
+
+def test_backoff_is_full_jitter_up_to_the_cap():
+    random.seed(0)
+    for attempt in range(12):
+        bound = min(1.0, 0.1 * 2 ** attempt)
+        samples = [backoff_delay(attempt, 0.1, 1.0) for _ in range(200)]
+        assert all(0 <= delay <= bound for delay in samples)
+        assert max(samples) > bound / 2
+
+
+def test_transient_failures_are_retried(delays):
+    (result,), hits = _serve([(503, {}), (502, {}), (200, {})], _configuration())
+
+    assert result == {"ok": True}
+    assert hits == 3
+    assert len(delays) == 2 and all(0 <= delay <= 0.05 for delay in delays)
+
+
+def test_retries_stop_at_the_limit(delays):
+    (error,), hits = _serve([(503, {})], _configuration(http_max_retries=2))
+
+    assert isinstance(error, aiohttp.ClientResponseError) and error.status == 503
+    assert hits == 3
+
+
+def test_client_errors_are_not_retried():
+    configuration = _configuration()
+    (error,), hits = _serve([(404, {})], configuration)
+
+    assert error.status == 404
+    assert hits == 1
+    assert resilience.get_breaker(error.request_info.url.raw_authority, configuration).state == "closed"
+
+
+def test_retry_after_within_the_cap_is_honoured(delays):
+    (result,), hits = _serve([(429, {"Retry-After": "0.02"}), (200, {})], _configuration())
+
+    assert result == {"ok": True}
+    assert delays == [0.02]
+
+
+def test_retry_after_above_the_cap_raises_without_retrying(delays):
+    (error,), hits = _serve([(429, {"Retry-After": "120"}), (200, {})], _configuration())
+
+    assert error.status == 429
+    assert hits == 1
+    assert delays == []
+
+
+@pytest.mark.parametrize("value", ["soon", "Mon, 99 Foo 2024", "-"])
+def test_malformed_retry_after_falls_back_to_backoff(value, delays):
+    (result,), hits = _serve([(503, {"Retry-After": value}), (200, {})], _configuration())
+
+    assert result == {"ok": True}
+    assert hits == 2
+    assert 0 <= delays[0] <= 0.01
+
+
+def test_retry_after_parsing():
+    class Failure(Exception):
+        def __init__(self, value):
+            self.headers = {"Retry-After": value}
+
+    assert retry_after(Failure("3")) == 3.0
+    assert retry_after(Failure("Wed, 21 Oct 2015 07:28:00 GMT")) == 0.0
+    assert retry_after(Failure("soon")) is None
+    assert retry_after(Exception()) is None
+
+
+def test_breaker_opens_then_probes_then_closes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("api.example", failure_threshold=2, reset_timeout=10)
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] += 10
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    # Only one probe at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] += 10
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_open_circuit_fails_fast_without_calling_the_host():
+    configuration = _configuration(http_max_retries=0, circuit_failure_threshold=2)
+    outcomes, hits = _serve([(503, {})], configuration, calls=4)
+
+    assert [type(outcome) for outcome in outcomes] == [
+        aiohttp.ClientResponseError, aiohttp.ClientResponseError, CircuitOpenError, CircuitOpenError,
+    ]
+    assert hits == 2
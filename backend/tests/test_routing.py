@@ -0,0 +1,60 @@
+"""Day grouping and stop ordering in `my_agent.utils.routing`."""
+import random
+
+import numpy as np
+import pytest
+
+from my_agent.utils.routing import cluster_days, haversine_matrix, order_stops, plan_days
+
+KANDY = {"latitude": 7.29, "longitude": 80.63}
+COLOMBO = {"latitude": 6.9, "longitude": 79.8}
+GALLE = {"latitude": 6.03, "longitude": 80.22}
+
+
+def _stops(day):
+    return [(stop["latitude"], stop["longitude"]) for stop in day["stops"]]
+
+
+def test_stops_sharing_coordinates_stay_together():
+    days = plan_days([KANDY] * 2 + [COLOMBO] * 2, 3)
+
+    assert [len(day["stops"]) for day in days] == [2, 2, 0]
+    assert all(len(set(_stops(day))) <= 1 for day in days)
+
+
+def test_repeated_coordinates_never_leave_a_group_empty():
+    rng = random.Random(0)
+    locations = [KANDY, COLOMBO, GALLE, {"latitude": 6.95, "longitude": 80.78}]
+    for _ in range(500):
+        stops = [rng.choice(locations) for _ in range(rng.randint(1, 12))]
+        number_of_days = rng.randint(1, 6)
+        days = plan_days(stops, number_of_days)
+        assert sorted(_stops({"stops": stops})) == sorted(s for day in days for s in _stops(day))
+
+
+def test_cluster_days_is_balanced():
+    latitudes = [7.29, 7.30, 7.31, 6.90, 6.91, 6.92]
+    longitudes = [80.63, 80.64, 80.62, 79.80, 79.81, 79.82]
+    labels = cluster_days(haversine_matrix(latitudes, longitudes), 2)
+
+    assert sorted(np.bincount(labels)) == [3, 3]
+    assert len(set(labels[:3])) == 1 and len(set(labels[3:])) == 1
+
+
+def test_order_stops_starts_at_start_and_visits_all():
+    latitudes = [0.0, 0.0, 0.0, 0.0]
+    longitudes = [0.0, 3.0, 1.0, 2.0]
+    order = order_stops(haversine_matrix(latitudes, longitudes), start=0)
+
+    assert order == [0, 2, 3, 1]
+
+
+def test_first_day_is_nearest_the_start():
+    days = plan_days([KANDY, GALLE, COLOMBO], 3, start=(6.9, 79.8))
+
+    assert _stops(days[0]) == [(COLOMBO["latitude"], COLOMBO["longitude"])]
+
+
+def test_rejects_zero_days():
+    with pytest.raises(ValueError):
+        plan_days([KANDY], 0)
@@ -0,0 +1,64 @@
+"""Coalescing of identical in-flight calls in `my_agent.utils.singleflight`."""
+import asyncio
+
+import pytest
+
+from my_agent.utils.singleflight import SingleFlight
+
+
+def test_identical_calls_share_one_upstream_call():
+    group = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    async def main():
+        return await asyncio.gather(*(group.do("key", fetch) for _ in range(5)), group.do("other", fetch))
+
+    results = asyncio.run(main())
+
+    assert results == [{"ok": True}] * 6
+    assert len(calls) == 2
+    assert group.stats == {"calls": 6, "upstream": 2, "saved": 4}
+    assert group.in_flight == 0
+
+
+def test_errors_are_shared_and_not_remembered():
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        results = await asyncio.gather(group.do("key", fail), group.do("key", fail), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert group.in_flight == 0
+
+    asyncio.run(main())
+    assert group.stats["upstream"] == 1
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_call():
+    group = SingleFlight()
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        finished.append(1)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(group.do("key", fetch))
+        second = asyncio.create_task(group.do("key", fetch))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert finished == [1]
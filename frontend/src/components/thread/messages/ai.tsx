@@ -16,6 +16,7 @@ import { CopyIcon, RefreshCcw, CheckIcon } from "lucide-react";
 import { useState } from "react";
 import { Button } from "../../ui/button";
 import { TooltipIconButton } from "../tooltip-icon-button";
+import { ItineraryDayCard, type ItineraryDayProps } from "./itinerary-day";
 
 function CustomComponent({   
   message,
@@ -32,14 +33,21 @@ function CustomComponent({
   if (!customComponents?.length) return null;
   return (
     <Fragment key={message.id}>
-      {customComponents.map((customComponent) => (
-        <LoadExternalComponent
-          key={customComponent.id}
-          stream={thread}
-          message={customComponent}
-          meta={{ ui: customComponent }}
-        />
-      ))}
+      {customComponents.map((customComponent) =>
+        customComponent.name === "itinerary_day" ? (
+          <ItineraryDayCard
+            key={customComponent.id}
+            {...(customComponent.props as ItineraryDayProps)}
+          />
+        ) : (
+          <LoadExternalComponent
+            key={customComponent.id}
+            stream={thread}
+            message={customComponent}
+            meta={{ ui: customComponent }}
+          />
+        ),
+      )}
     </Fragment>
   );
 }
@@ -0,0 +1,74 @@
+type ItineraryItem = {
+  name: string;
+  type?: string;
+  location?: string;
+  cost?: number | string;
+  rating?: number;
+};
+
+export type ItineraryDay = {
+  day_number: number;
+  attractions: ItineraryItem[];
+  dining: ItineraryItem[];
+  daily_cost_estimate?: number;
+};
+
+export type ItineraryDayProps = {
+  day: ItineraryDay;
+  valid: boolean;
+  errors: string[];
+};
+
+function formatCost(cost: ItineraryItem["cost"]) {
+  if (cost === undefined) return null;
+  if (typeof cost === "number") return cost === 0 ? "Free" : `$${cost}`;
+  return cost;
+}
+
+function ItemList({ title, items }: { title: string; items: ItineraryItem[] }) {
+  if (!items.length) return null;
+  return (
+    <div>
+      <h4 className="text-sm font-semibold uppercase tracking-wide">{title}</h4>
+      <ul className="mt-1 space-y-1 text-sm">
+        {items.map((item, idx) => (
+          <li key={idx}>
+            <span className="font-medium">{item.name}</span>
+            {[item.type, item.location, formatCost(item.cost), item.rating]
+              .filter((value) => value !== undefined && value !== null)
+              .map((value, valueIdx) => (
+                <span key={valueIdx} className="opacity-80">
+                  {" · "}
+                  {value}
+                </span>
+              ))}
+          </li>
+        ))}
+      </ul>
+    </div>
+  );
+}
+
+// Rendered progressively from the "itinerary_day" custom stream events the
+// research node emits as each day of the draft is completed.
+export function ItineraryDayCard({ day, valid, errors }: ItineraryDayProps) {
+  return (
+    <div className="py-2 px-4 bg-[#FFF5E1] text-[#006A4E] rounded-lg border-4 border-[#D2691E] shadow-[4px_4px_0px_0px_#000] space-y-2">
+      <div className="flex items-center justify-between">
+        <h3 className="font-semibold">Day {day.day_number}</h3>
+        {day.daily_cost_estimate !== undefined && (
+          <span className="text-sm font-medium">
+            ~${day.daily_cost_estimate}
+          </span>
+        )}
+      </div>
+      <ItemList title="Attractions" items={day.attractions} />
+      <ItemList title="Dining" items={day.dining} />
+      {!valid && (
+        <p className="text-xs opacity-70" title={errors.join("\n")}>
+          Some details for this day are still incomplete.
+        </p>
+      )}
+    </div>
+  );
+}
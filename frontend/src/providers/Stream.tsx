@@ -81,6 +81,8 @@ const StreamSession = ({
     apiKey: apiKey ?? undefined,
     assistantId,
     threadId: threadId ?? null,
+    // Custom events are UI messages, e.g. the "itinerary_day" cards emitted
+    // while the itinerary is drafted; they render under their parent message.
     onCustomEvent: (event, options) => {
       options.mutate((prev) => {
         const ui = uiMessageReducer(prev.ui ?? [], event);